@@ -0,0 +1,249 @@
+#!/usr/local/bin/python3.8
+
+
+# benchmark.py
+
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from dropsync_shift_rename.inventory import Inventory  # noqa: E402
+from dropsync_shift_rename.journal import DELETE_OP, RENAME_OP, perform_operation  # noqa: E402
+from dropsync_shift_rename.metadata import CaptureDates  # noqa: E402
+from dropsync_shift_rename.names import NameIndex  # noqa: E402
+from dropsync_shift_rename.rules import RENAME_RULES  # noqa: E402
+from dropsync_shift_rename.transfer import move_file  # noqa: E402
+from generate_tree import generate_tree, media_templates  # noqa: E402
+
+# Initializations
+DEFAULT_SIZES: tuple = (1000, 10000, 100000)
+DEFAULT_MEAN_SIZE_KB: float = 2
+# (Maximum number of files converted by the conversion stages, which would
+# otherwise take hours for the largest trees; their throughput is what matters)
+DEFAULT_MAX_CONVERSIONS: int = 200
+# (Relative slowdown compared with the baseline above which a stage is
+# reported as a regression)
+DEFAULT_TOLERANCE: float = 0.2
+# (Stages shorter than this duration in [s] are never reported as regressions,
+# their timings being mostly noise)
+MIN_REGRESSION_SECONDS: float = 0.05
+STAGES: tuple = ('inventory', 'rename', 'webp_conversion', 'audio_conversion', 'move', 'cleanup')
+# (Folders whose files are renamed by the rename stage, by source)
+RENAME_FOLDERS: dict = {
+    'WhatsApp': ('WhatsApp/WhatsApp Images', 'WhatsApp/WhatsApp Video', 'WhatsApp/WhatsApp Audio',
+                 'WhatsApp/WhatsApp Voice Notes', 'WhatsApp/WhatsApp Animated Gifs'),
+    'Telegram': ('Telegram/Telegram Images',),
+    'Snapchat': ('Snapchat',),
+    'MusicDownload': ('MusicDownload',),
+    'VidMate': ('VidMate/download',),
+    'Instander': ('Instander',),
+    'StorySaver': ('StorySaver',),
+}
+
+
+def bench_inventory(root_path: str, library_path: str) -> int:
+    inventory = Inventory(root_path)
+    inventory.total_size()
+
+    return len(inventory.files(root_path, recursive=True, include_hidden=True))
+
+
+def bench_rename(root_path: str, library_path: str) -> int:
+    inventory = Inventory(root_path)
+    capture_dates = CaptureDates(inventory.stat)
+    nb_files = 0
+    for source, folders in RENAME_FOLDERS.items():
+        file_paths = [file_path for folder in folders
+                      for file_path in inventory.files(os.path.join(root_path, folder), recursive=True)]
+        capture_dates.prefetch(file_paths)
+        rename_plan = RENAME_RULES[source].plan(file_paths, capture_dates.formatted)
+        for file_path, file_path_new in rename_plan.renames:
+            perform_operation(RENAME_OP, file_path, file_path_new)
+        nb_files += len(rename_plan.renames)
+
+    return nb_files
+
+
+def _bench_conversion(root_path: str, extensions: tuple, function_name: str, max_conversions: int) -> int:
+    # (Imported here since the conversions need Pillow)
+    from dropsync_shift_rename import conversion
+    file_paths = Inventory(root_path).files(root_path, extensions, recursive=True)[:max_conversions]
+    results = list(getattr(conversion, function_name)(file_paths))
+    for result in results:
+        if result.ok:
+            perform_operation(DELETE_OP, result.src)
+
+    return sum(result.ok for result in results)
+
+
+def bench_webp_conversion(root_path: str, library_path: str, max_conversions: int) -> int:
+    return _bench_conversion(root_path, ('.webp',), 'convert_webp_images', max_conversions)
+
+
+def bench_audio_conversion(root_path: str, library_path: str, max_conversions: int) -> int:
+    if shutil.which('ffmpeg') is None:
+        raise ImportError('ffmpeg not found')
+    return _bench_conversion(root_path, ('.opus', '.m4a'), 'convert_audio_files', max_conversions)
+
+
+def bench_move(root_path: str, library_path: str) -> int:
+    inventory = Inventory(root_path)
+    name_index = NameIndex()
+    library_device = os.stat(library_path).st_dev
+    nb_files = 0
+    for file_path in inventory.files(root_path, ('.jpg', '.mp4', '.png', '.mp3'), recursive=True):
+        file_name = name_index.claim(library_path, os.path.basename(file_path))
+        nb_files += move_file(file_path, os.path.join(library_path, file_name), library_device).ok
+
+    return nb_files
+
+
+def bench_cleanup(root_path: str, library_path: str) -> int:
+    inventory = Inventory(root_path)
+    nb_files = len(inventory.files(root_path, recursive=True, include_hidden=True))
+    for child_path in inventory.children(root_path, include_hidden=True):
+        perform_operation(DELETE_OP, child_path)
+
+    return nb_files
+
+
+def run_benchmark(nb_files: int, work_path: str, mean_size_kb: float, max_conversions: int,
+                  templates: dict, stages: tuple = STAGES) -> dict:
+    """
+    Generates a synthetic tree and times the stages of the program on it, in
+    the order in which the program runs them (each stage working on the tree
+    left by the previous ones).
+
+    Args:
+        nb_files (int): Number of files of the tree.
+        work_path (str): Path of the folder in which the tree is generated.
+        mean_size_kb (float): Mean size in [kB] of a picture.
+        max_conversions (int): Maximum number of files converted per
+                               conversion stage.
+        templates (dict): Media templates (cf. "generate_tree.media_templates").
+        stages (tuple): Names of the stages to time.
+
+    Returns:
+        timings (dict): Dict mapping the stage names to dicts containing their
+        duration in [s] ("seconds") and number of handled files ("files"), or
+        the reason why they have been skipped ("skipped").
+    """
+
+    root_path = os.path.join(work_path, f'DropsyncFiles_{nb_files}')
+    library_path = os.path.join(work_path, f'CameraUploads_{nb_files}')
+    shutil.rmtree(root_path, ignore_errors=True)
+    shutil.rmtree(library_path, ignore_errors=True)
+    os.makedirs(library_path)
+    generate_tree(root_path, nb_files, mean_size_kb, templates=templates)
+    functions = {
+        'inventory': bench_inventory,
+        'rename': bench_rename,
+        'webp_conversion': lambda r, l: bench_webp_conversion(r, l, max_conversions),
+        'audio_conversion': lambda r, l: bench_audio_conversion(r, l, max_conversions),
+        'move': bench_move,
+        'cleanup': bench_cleanup,
+    }
+    timings = {}
+    try:
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            start = time.perf_counter()
+            try:
+                nb_handled_files = functions[stage](root_path, library_path)
+            except ImportError as e:
+                timings[stage] = {'skipped': str(e)}
+                continue
+            timings[stage] = {'seconds': time.perf_counter() - start, 'files': nb_handled_files}
+    finally:
+        shutil.rmtree(root_path, ignore_errors=True)
+        shutil.rmtree(library_path, ignore_errors=True)
+
+    return timings
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compares benchmark results with baseline results.
+
+    Args:
+        results (dict): The results (by number of files, then by stage).
+        baseline (dict): The baseline results.
+        tolerance (float): Relative slowdown above which a stage regressed.
+
+    Returns:
+        regressions (list): List containing the (number of files, stage,
+        baseline duration, duration) tuples of the stages that regressed.
+    """
+
+    slower_stages = []
+    for nb_files, timings in results.items():
+        for stage, timing in timings.items():
+            baseline_timing = baseline.get(nb_files, {}).get(stage, {})
+            if 'seconds' not in timing or 'seconds' not in baseline_timing:
+                continue
+            if timing['seconds'] > max(baseline_timing['seconds'] * (1 + tolerance), MIN_REGRESSION_SECONDS):
+                slower_stages.append((nb_files, stage, baseline_timing['seconds'], timing['seconds']))
+
+    return slower_stages
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Times the stages of "dropsync_shift_rename" (inventory, renames,\
+        conversions, moves and cleanup) on synthetic trees of increasing sizes.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, metavar='N',
+                        help=f'numbers of files of the trees (default: {" ".join(map(str, DEFAULT_SIZES))})')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help='stages to time (default: all)')
+    parser.add_argument('--mean-size', type=float, default=DEFAULT_MEAN_SIZE_KB, metavar='KB',
+                        help=f'mean size of a picture (default: {DEFAULT_MEAN_SIZE_KB}[kB])')
+    parser.add_argument('--max-conversions', type=int, default=DEFAULT_MAX_CONVERSIONS, metavar='N',
+                        help=f'maximum number of files converted per conversion stage\
+                        (default: {DEFAULT_MAX_CONVERSIONS})')
+    parser.add_argument('--work-dir', default=tempfile.gettempdir(),
+                        help='folder in which the trees are generated (default: the temporary folder)')
+    parser.add_argument('--output', metavar='JSON_PATH', help='save the results to a JSON file')
+    parser.add_argument('--baseline', metavar='JSON_PATH',
+                        help='compare the results with those of a previous run (e.g. of the last\
+                        release), exiting with status 1 if a stage regressed')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'relative slowdown above which a stage regressed (default: {DEFAULT_TOLERANCE})')
+    args = parser.parse_args()
+
+    work_path = os.path.join(args.work_dir, 'dropsync_benchmark')
+    templates = media_templates(os.path.join(work_path, 'templates'))
+    results = {}
+    for nb_files in args.sizes:
+        print(f'\n{nb_files} files')
+        print('-' * (len(str(nb_files)) + 6))
+        timings = run_benchmark(nb_files, work_path, args.mean_size, args.max_conversions, templates,
+                                tuple(args.stages))
+        for stage, timing in timings.items():
+            if 'skipped' in timing:
+                print(f' {stage:<17} skipped ({timing["skipped"]})')
+            else:
+                rate = timing['files'] / timing['seconds'] if timing['seconds'] > 0 else 0
+                print(f' {stage:<17} {timing["seconds"]:8.3f}[s]  {timing["files"]:>7} file(s)  '
+                      f'{rate:10.0f} file(s)/[s]')
+        results[str(nb_files)] = timings
+    shutil.rmtree(work_path, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        slower_stages = regressions(results, baseline, args.tolerance)
+        for nb_files, stage, baseline_seconds, seconds in slower_stages:
+            print(f'⚠️  Regression: {stage} ({nb_files} files) took {seconds:.3f}[s] '
+                  f'instead of {baseline_seconds:.3f}[s]')
+        if len(slower_stages) > 0:
+            raise SystemExit(1)
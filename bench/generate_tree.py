@@ -0,0 +1,188 @@
+#!/usr/local/bin/python3.8
+
+
+# generate_tree.py
+
+
+import os
+import random
+import shutil
+import subprocess
+import time
+from argparse import ArgumentParser
+
+# Initializations
+DEFAULT_NB_FILES: int = 1000
+DEFAULT_MEAN_SIZE_KB: float = 16
+DEFAULT_SEED: int = 0
+# (Size of the pool of random bytes from which the file contents are sliced,
+# every file starting with a unique header so that no two files are identical)
+RANDOM_POOL_SIZE: int = 8 * 1024 * 1024
+# (Spread of the file sizes around their mean, cf. "random.lognormvariate")
+SIZE_SIGMA: float = 0.6
+# (Period in [s] over which the modification dates of the files are spread)
+DATE_SPREAD: float = 365 * 24 * 3600
+# (Kinds of files of the synthetic tree: relative path pattern, share of the
+# files and size relative to the mean size. Patterns are filled with a random
+# date ("{date}"), a file number ("{n}"), a random account name ("{account}")
+# and a random week folder name ("{week}"))
+FILE_KINDS: tuple = (
+    # WhatsApp
+    ('WhatsApp/WhatsApp Images/IMG-{date}-WA{n:04d}.jpg', 0.22, 1.0),
+    ('WhatsApp/WhatsApp Images/Sent/IMG-{date}-WA{n:04d}.jpg', 0.02, 1.0),
+    ('WhatsApp/WhatsApp Images/Private/IMG-{date}-WA{n:04d}.jpg', 0.005, 1.0),
+    ('WhatsApp/WhatsApp Video/VID-{date}-WA{n:04d}.mp4', 0.06, 8.0),
+    ('WhatsApp/WhatsApp Video/Sent/VID-{date}-WA{n:04d}.mp4', 0.01, 8.0),
+    ('WhatsApp/WhatsApp Stickers/STK-{date}-WA{n:04d}.webp', 0.05, 0.1),
+    ('WhatsApp/WhatsApp Audio/AUD-{date}-WA{n:04d}.opus', 0.03, 0.5),
+    ('WhatsApp/WhatsApp Audio/Sent/AUD-{date}-WA{n:04d}.opus', 0.01, 0.5),
+    ('WhatsApp/WhatsApp Voice Notes/{week}/PTT-{date}-WA{n:04d}.opus', 0.05, 0.3),
+    ('WhatsApp/WhatsApp Animated Gifs/VID-{date}-WA{n:04d}.mp4', 0.02, 2.0),
+    ('WhatsApp/WhatsApp Video Notes/{week}/VID-{date}-WA{n:04d}.mp4', 0.01, 4.0),
+    ('WhatsApp/WhatsApp Documents/DOC-{date}-WA{n:04d}.pdf', 0.01, 2.0),
+    ('WhatsApp/WhatsApp Profile Photos/{n}.jpg', 0.005, 0.2),
+    # Telegram
+    ('Telegram/Telegram Images/{n:010d}_{n}.jpg', 0.08, 1.0),
+    ('Telegram/Telegram Video/{n:010d}_{n}.mp4', 0.02, 8.0),
+    # Snapchat
+    ('Snapchat/Snapchat-{n:09d}.jpg', 0.05, 1.0),
+    ('Snapchat/Snapchat-{n:09d}.mp4', 0.03, 6.0),
+    # MusicDownload
+    ('MusicDownload/Song {n}.mp3', 0.02, 4.0),
+    ('MusicDownload/Song {n}.m4a', 0.02, 4.0),
+    # VidMate
+    ('VidMate/download/Video {n}.mp4', 0.03, 10.0),
+    ('VidMate/download/Video {n}.smi', 0.005, 0.01),
+    ('VidMate/download/App {n}.apk', 0.005, 4.0),
+    # Instander
+    ('Instander/{account}/{account}-{n}.jpg', 0.08, 1.0),
+    ('Instander/{account}/{account}-{n}.webp', 0.02, 0.5),
+    ('Instander/{account}/{account}-{n}.mp4', 0.02, 6.0),
+    ('Instander/{account}-{n}.jpg', 0.01, 1.0),
+    # StorySaver
+    ('StorySaver/{account}/Story {n}.jpg', 0.04, 1.0),
+    ('StorySaver/{account}/Story {n}.mp4', 0.03, 6.0),
+)
+ACCOUNT_NAMES: tuple = ('alice', 'bob', 'carol', 'dave', 'erin', 'frank', 'grace', 'heidi')
+WEEK_FOLDERS: tuple = tuple(f'2021{week:02d}' for week in range(1, 53))
+WEBP_EXTENSION: str = '.webp'
+AUDIO_EXTENSIONS: tuple = ('.opus', '.m4a')
+
+
+def media_templates(work_path: str) -> dict:
+    """
+    Creates one genuine file per media kind that has to be converted (a
+    ".webp" image with Pillow, ".opus" and ".m4a" audio files with ffmpeg), so
+    that the conversion stages convert real media. Kinds whose tool is missing
+    are left out.
+
+    Args:
+        work_path (str): Path of the folder in which the templates are created.
+
+    Returns:
+        templates (dict): Dict mapping the extensions to the paths of their
+        template files.
+    """
+
+    os.makedirs(work_path, exist_ok=True)
+    templates = {}
+    try:
+        from PIL import Image  # pip3 install Pillow
+        webp_path = os.path.join(work_path, 'template.webp')
+        Image.effect_noise((512, 512), 64).convert('RGBA').save(webp_path, 'webp')
+        templates[WEBP_EXTENSION] = webp_path
+    except ImportError:
+        pass
+    if shutil.which('ffmpeg') is not None:
+        for extension in AUDIO_EXTENSIONS:
+            audio_path = os.path.join(work_path, 'template' + extension)
+            completed = subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi', '-i',
+                                        'sine=frequency=440:duration=5', audio_path],
+                                       stdin=subprocess.DEVNULL, capture_output=True)
+            if completed.returncode == 0:
+                templates[extension] = audio_path
+
+    return templates
+
+
+def generate_tree(root_path: str, nb_files: int = DEFAULT_NB_FILES, mean_size_kb: float = DEFAULT_MEAN_SIZE_KB,
+                  seed: int = DEFAULT_SEED, templates: dict = None) -> dict:
+    """
+    Generates a synthetic "DropsyncFiles" tree with files of the seven sources
+    (WhatsApp with its "Sent" and "Private" folders, Telegram, Snapchat,
+    MusicDownload, VidMate, Instander and StorySaver), named as the apps name
+    them. Contents are random (apart from the templates) and modification
+    dates are spread over the last year.
+
+    Args:
+        root_path (str): Path of the tree to create (which must not exist).
+        nb_files (int): Total number of files.
+        mean_size_kb (float): Mean size in [kB] of a picture, the sizes of the
+                              other kinds being proportional to it.
+        seed (int): Seed of the random generator (same tree for a same seed).
+        templates (dict): Dict mapping extensions to the paths of the files
+                          whose content is copied for that extension (cf.
+                          "media_templates").
+
+    Returns:
+        counts (dict): Dict mapping the top-level folders to their number of
+        files.
+    """
+
+    rng = random.Random(seed)
+    templates = templates or {}
+    os.makedirs(root_path)
+    pool = memoryview(rng.getrandbits(8 * RANDOM_POOL_SIZE).to_bytes(RANDOM_POOL_SIZE, 'little'))
+    weights = [share for _, share, _ in FILE_KINDS]
+    now = time.time()
+    counts = {}
+    created_dirs = set()
+    for n, (pattern, _, size_factor) in enumerate(rng.choices(FILE_KINDS, weights, k=nb_files)):
+        date = now - rng.random() * DATE_SPREAD
+        relative_path = pattern.format(date=time.strftime('%Y%m%d', time.localtime(date)), n=n,
+                                       account=rng.choice(ACCOUNT_NAMES), week=rng.choice(WEEK_FOLDERS))
+        file_path = os.path.join(root_path, relative_path)
+        dir_path = os.path.dirname(file_path)
+        if dir_path not in created_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            created_dirs.add(dir_path)
+        extension = os.path.splitext(file_path)[1]
+        if extension in templates:
+            shutil.copyfile(templates[extension], file_path)
+        else:
+            size = int(mean_size_kb * 1000 * size_factor * rng.lognormvariate(0, SIZE_SIGMA))
+            header = f'{relative_path}\n'.encode()
+            offset = rng.randrange(RANDOM_POOL_SIZE)
+            with open(file_path, 'wb') as f:
+                f.write(header)
+                remaining = size - len(header)
+                while remaining > 0:
+                    chunk = pool[offset:offset + remaining]
+                    f.write(chunk)
+                    remaining -= len(chunk)
+                    offset = 0
+        os.utime(file_path, (date, date))
+        top_folder = relative_path.split('/')[0]
+        counts[top_folder] = counts.get(top_folder, 0) + 1
+
+    return counts
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Generates a synthetic "DropsyncFiles" tree for benchmarks.')
+    parser.add_argument('root_path', help='path of the tree to create')
+    parser.add_argument('--files', type=int, default=DEFAULT_NB_FILES,
+                        help=f'total number of files (default: {DEFAULT_NB_FILES})')
+    parser.add_argument('--mean-size', type=float, default=DEFAULT_MEAN_SIZE_KB, metavar='KB',
+                        help=f'mean size of a picture, the sizes of the other kinds being\
+                        proportional to it (default: {DEFAULT_MEAN_SIZE_KB}[kB])')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'seed of the random generator (default: {DEFAULT_SEED})')
+    parser.add_argument('--real-media', action='store_true',
+                        help='make the stickers and audio files genuine media (with Pillow and\
+                        ffmpeg) instead of random bytes')
+    args = parser.parse_args()
+    templates = media_templates(args.root_path + '_templates') if args.real_media else None
+    counts = generate_tree(args.root_path, args.files, args.mean_size, args.seed, templates)
+    for top_folder, count in sorted(counts.items()):
+        print(f'{top_folder}: {count} file(s)')
@@ -0,0 +1,7 @@
+# __init__.py
+
+
+from .config import Root
+from .shift_rename import execute_plan, main, plan_sources, process_roots
+
+__all__ = ['Root', 'execute_plan', 'main', 'plan_sources', 'process_roots']
@@ -0,0 +1,7 @@
+# __main__.py
+
+
+from .shift_rename import main
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+# cache.py
+
+
+import hashlib
+import os
+import platform
+import shutil
+import threading
+
+from .snapshot import reflink_file
+
+# Initializations
+# (Size of the blocks in which files are read to be hashed)
+HASH_BLOCK_SIZE: int = 1024 * 1024
+
+
+def default_cache_path() -> str:
+    """
+    Returns the platform specific folder in which the conversion cache is kept
+    ("~/Library/Caches" on macOS, "$XDG_CACHE_HOME" or "~/.cache" otherwise).
+
+    Returns:
+        cache_path (str): Path of the conversion cache folder.
+    """
+
+    if platform.system() == 'Darwin':
+        caches_path = os.path.expanduser('~/Library/Caches')
+    else:
+        caches_path = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+
+    return os.path.join(caches_path, 'dropsync_shift_rename', 'conversions')
+
+
+def content_hash(file_path: str, salt: str = '') -> str:
+    """
+    Computes a fast content hash (BLAKE2b) of a file.
+
+    Args:
+        file_path (str): Path of the file to hash.
+        salt (str): String hashed before the content of the file (e.g. the
+                    conversion parameters).
+
+    Returns:
+        digest (str): The hexadecimal digest.
+    """
+
+    h = hashlib.blake2b(salt.encode(), digest_size=20)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            h.update(block)
+
+    return h.hexdigest()
+
+
+def clone_file(src_path: str, dst_path: str):
+    """
+    Reflinks a file when the filesystem supports it and copies it otherwise.
+    (Hardlinks are not used since cache entries and conversion outputs must
+    not share their inode: the outputs end up in "Camera Uploads", and the
+    modification date of the entries is updated to track their use.)
+
+    Args:
+        src_path (str): Path of the file to clone.
+        dst_path (str): Path of the clone to create.
+    """
+
+    try:
+        reflink_file(src_path, dst_path)
+    except (OSError, AttributeError):
+        shutil.copyfile(src_path, dst_path)
+
+
+class ConversionCache:
+    """
+    Persistent, content-addressed cache of conversion outputs, keyed by the
+    content hash of the converted file and the conversion parameters, so that
+    the same sticker or voice note is never converted twice. Entries are
+    reflinked in and out of the cache whenever possible (and copied otherwise),
+    and the least recently used ones are evicted once the cache exceeds its
+    size.
+    """
+
+    def __init__(self, cache_path: str, max_bytes: int):
+        """
+        Args:
+            cache_path (str): Path of the cache folder (created if needed).
+            max_bytes (int): Size above which entries are evicted.
+        """
+
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        os.makedirs(cache_path, exist_ok=True)
+
+    def entry_path(self, src_path: str, params: str, extension: str) -> str:
+        """
+        Returns the path of the cache entry holding the conversion output of a
+        file.
+
+        Args:
+            src_path (str): Path of the file to convert.
+            params (str): The conversion parameters.
+            extension (str): The extension of the conversion output (e.g. ".png").
+
+        Returns:
+            entry_path (str): Path of the cache entry (which may not exist).
+        """
+
+        key = content_hash(src_path, params)
+
+        return os.path.join(self.cache_path, key[:2], key + extension)
+
+    def fetch(self, entry_path: str, dst_path: str) -> bool:
+        """
+        Puts the cached conversion output at the destination path, if any.
+
+        Args:
+            entry_path (str): Path of the cache entry.
+            dst_path (str): Path of the conversion output to create.
+
+        Returns:
+            hit (bool): Whether the entry was cached.
+        """
+
+        if not os.path.isfile(entry_path):
+            return False
+        try:
+            if os.path.lexists(dst_path):
+                os.remove(dst_path)
+            clone_file(entry_path, dst_path)
+            # Marking the entry as recently used
+            os.utime(entry_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def store(self, entry_path: str, output_path: str):
+        """
+        Stores a conversion output in the cache (atomically, so that concurrent
+        workers storing the same entry do not conflict).
+
+        Args:
+            entry_path (str): Path of the cache entry.
+            output_path (str): Path of the conversion output.
+        """
+
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        temp_path = f'{entry_path}.{os.getpid()}.{threading.get_ident()}.part'
+        try:
+            clone_file(output_path, temp_path)
+            os.replace(temp_path, entry_path)
+            os.utime(entry_path)
+        except OSError:
+            # (The cache being an optimization, failing to store an entry is not an error)
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+
+    def evict(self) -> int:
+        """
+        Evicts the least recently used entries until the cache fits its size.
+
+        Returns:
+            nb_evicted (int): Number of evicted entries.
+        """
+
+        entries = []
+        total_bytes = 0
+        for bucket in os.scandir(self.cache_path):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+        nb_evicted = 0
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            os.remove(entry_path)
+            total_bytes -= size
+            nb_evicted += 1
+
+        return nb_evicted
@@ -0,0 +1,309 @@
+# catalog.py
+
+
+import os
+import platform
+import sqlite3
+import time
+
+# Initializations
+DONE_STATUS: str = 'done'
+DELETED_STATUS: str = 'deleted'
+FAILED_STATUS: str = 'failed'
+REJECTED_STATUS: str = 'rejected'
+# (Statuses of the files that are not to be handled again as long as they are
+# unchanged: processed files synced again and files that do not match the
+# naming pattern of their app, unlike files whose processing failed, which are
+# retried)
+HANDLED_STATUSES: tuple = (DONE_STATUS, REJECTED_STATUS)
+# (Maximum number of parameters of a single SQLite query)
+QUERY_BATCH_SIZE: int = 500
+SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS files (
+    src TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    stage TEXT,
+    dst TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    first_seen REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (src, size, mtime_ns)
+);
+CREATE INDEX IF NOT EXISTS files_dst ON files (dst);
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partial_hash TEXT,
+    full_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS perceptual_hashes (
+    path TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT,
+    PRIMARY KEY (path, algorithm)
+);
+CREATE TABLE IF NOT EXISTS audio_probes (
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    container TEXT,
+    codec TEXT,
+    PRIMARY KEY (path, size, mtime_ns)
+);
+'''
+
+
+def default_catalog_path() -> str:
+    """
+    Returns the platform specific path of the catalog ("~/Library/Application
+    Support" on macOS, "$XDG_DATA_HOME" or "~/.local/share" otherwise).
+
+    Returns:
+        catalog_path (str): Path of the catalog file.
+    """
+
+    if platform.system() == 'Darwin':
+        data_path = os.path.expanduser('~/Library/Application Support')
+    else:
+        data_path = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+
+    return os.path.join(data_path, 'dropsync_shift_rename', 'catalog.sqlite3')
+
+
+def folder_range(folder_path: str) -> tuple:
+    """
+    Returns the bounds of the paths of the files of a folder, so that they are
+    looked up through the primary key ("path > lower AND path < upper").
+
+    Args:
+        folder_path (str): Path of the folder.
+
+    Returns:
+        (lower, upper) (tuple): The exclusive bounds of the paths.
+    """
+
+    lower = os.path.join(folder_path, '')
+
+    return lower, lower[:-1] + chr(ord(lower[-1]) + 1)
+
+
+class Catalog:
+    """
+    Persistent SQLite catalog of the files handled by the previous runs, keyed
+    by their source path, size and modification date (so that a file that is
+    synced again with a different content is handled again), recording where
+    they ended up and how.
+    """
+
+    def __init__(self, catalog_path: str):
+        """
+        Args:
+            catalog_path (str): Path of the catalog file (created if needed).
+        """
+
+        self.catalog_path = catalog_path
+        os.makedirs(os.path.dirname(catalog_path), exist_ok=True)
+        # (The connection being used by the threads processing the roots, one
+        # at a time)
+        self._connection = sqlite3.connect(catalog_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+
+    def lookup(self, keys: list) -> dict:
+        """
+        Looks up files in the catalog.
+
+        Args:
+            keys (list): List containing the (source path, size, modification
+                         date in [ns]) tuples of the files.
+
+        Returns:
+            rows (dict): Dict mapping the keys of the catalogued files to their
+            (status, destination path) tuples.
+        """
+
+        keys = set(keys)
+        rows = {}
+        src_paths = sorted({key[0] for key in keys})
+        for i in range(0, len(src_paths), QUERY_BATCH_SIZE):
+            batch = src_paths[i:i + QUERY_BATCH_SIZE]
+            cursor = self._connection.execute(
+                'SELECT src, size, mtime_ns, status, dst FROM files WHERE src IN ('
+                + ','.join('?' * len(batch)) + ')', batch)
+            for src, size, mtime_ns, status, dst in cursor:
+                if (src, size, mtime_ns) in keys:
+                    rows[(src, size, mtime_ns)] = (status, dst)
+
+        return rows
+
+    def record(self, entries: list):
+        """
+        Records how files have been handled (in a single transaction).
+
+        Args:
+            entries (list): List containing the (key, stage, destination path,
+                            status, error) tuples of the files, the stage being
+                            the one of their last operation (e.g. "WhatsApp D.8").
+        """
+
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO files (src, size, mtime_ns, stage, dst, status, error, first_seen, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (src, size, mtime_ns) DO UPDATE SET '
+                'stage = excluded.stage, dst = excluded.dst, status = excluded.status, '
+                'error = excluded.error, updated = excluded.updated',
+                [key + (stage, dst, status, error, now, now) for key, stage, dst, status, error in entries])
+
+    def where(self, pattern: str) -> list:
+        """
+        Finds out where files ended up.
+
+        Args:
+            pattern (str): Part of the source or destination name of the files
+                           (e.g. "IMG-20210501-WA0001").
+
+        Returns:
+            rows (list): List containing the (source path, destination path,
+            status, error, last update date) tuples of the matching files, the
+            most recent first.
+        """
+
+        like = '%' + pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        cursor = self._connection.execute(
+            "SELECT src, dst, status, error, updated FROM files WHERE src LIKE ? ESCAPE '\\' "
+            "OR dst LIKE ? ESCAPE '\\' ORDER BY updated DESC", (like, like))
+
+        return cursor.fetchall()
+
+    def hashes(self, library_path: str) -> dict:
+        """
+        Args:
+            library_path (str): Path of the library folder (the rows of the
+                                other libraries, e.g. the destination folders
+                                of other roots, being left aside).
+
+        Returns:
+            rows (dict): Dict mapping the paths of the files of the library whose
+            content has been hashed to their (size, modification date in [ns],
+            partial hash, full hash) tuples (hashes being None if not computed).
+        """
+
+        cursor = self._connection.execute(
+            'SELECT path, size, mtime_ns, partial_hash, full_hash FROM hashes WHERE path > ? AND path < ?',
+            folder_range(library_path))
+
+        return {path: tuple(row) for path, *row in cursor if os.path.dirname(path) == library_path}
+
+    def record_hashes(self, rows: dict, removed_paths: list = ()):
+        """
+        Records the hashes of files of the library (in a single transaction).
+
+        Args:
+            rows (dict): Dict mapping the paths of the files to their (size,
+                         modification date in [ns], partial hash, full hash)
+                         tuples.
+            removed_paths (list): List containing the paths of the files that
+                                  are no longer in the library.
+        """
+
+        with self._connection:
+            self._connection.executemany('DELETE FROM hashes WHERE path = ?', [(path,) for path in removed_paths])
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO hashes (path, size, mtime_ns, partial_hash, full_hash) '
+                'VALUES (?, ?, ?, ?, ?)', [(path,) + row for path, row in rows.items()])
+
+    def perceptual_hashes(self, algorithm: str, library_path: str) -> dict:
+        """
+        Args:
+            algorithm (str): The perceptual hash algorithm (e.g. "phash").
+            library_path (str): Path of the library folder (the rows of the
+                                other libraries being left aside).
+
+        Returns:
+            rows (dict): Dict mapping the paths of the images of the library to
+            their (size, modification date in [ns], 64-bit hash) tuples (the
+            hash being None if the image could not be decoded).
+        """
+
+        cursor = self._connection.execute(
+            'SELECT path, size, mtime_ns, hash FROM perceptual_hashes WHERE algorithm = ? AND path > ? AND path < ?',
+            (algorithm,) + folder_range(library_path))
+
+        return {path: (size, mtime_ns, int(value, 16) if value is not None else None)
+                for path, size, mtime_ns, value in cursor if os.path.dirname(path) == library_path}
+
+    def record_perceptual_hashes(self, algorithm: str, rows: dict, removed_paths: list = ()):
+        """
+        Records the perceptual hashes of images of the library (in a single
+        transaction).
+
+        Args:
+            algorithm (str): The perceptual hash algorithm.
+            rows (dict): Dict mapping the paths of the images to their (size,
+                         modification date in [ns], hash) tuples.
+            removed_paths (list): List containing the paths of the images that
+                                  are no longer in the library.
+        """
+
+        with self._connection:
+            self._connection.executemany('DELETE FROM perceptual_hashes WHERE path = ? AND algorithm = ?',
+                                         [(path, algorithm) for path in removed_paths])
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO perceptual_hashes (path, algorithm, size, mtime_ns, hash) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(path, algorithm, size, mtime_ns, f'{value:016x}' if value is not None else None)
+                 for path, (size, mtime_ns, value) in rows.items()])
+
+    def audio_probes(self, keys: list) -> dict:
+        """
+        Looks up the containers and audio codecs of files.
+
+        Args:
+            keys (list): List containing the (path, size, modification date in
+                         [ns]) tuples of the files.
+
+        Returns:
+            rows (dict): Dict mapping the keys of the probed files to their
+            (container, codec) tuples.
+        """
+
+        keys = set(keys)
+        rows = {}
+        paths = sorted({key[0] for key in keys})
+        for i in range(0, len(paths), QUERY_BATCH_SIZE):
+            batch = paths[i:i + QUERY_BATCH_SIZE]
+            cursor = self._connection.execute(
+                'SELECT path, size, mtime_ns, container, codec FROM audio_probes WHERE path IN ('
+                + ','.join('?' * len(batch)) + ')', batch)
+            for path, size, mtime_ns, container, codec in cursor:
+                if (path, size, mtime_ns) in keys:
+                    rows[(path, size, mtime_ns)] = (container, codec)
+
+        return rows
+
+    def record_audio_probes(self, rows: dict):
+        """
+        Records the containers and audio codecs of files (in a single
+        transaction).
+
+        Args:
+            rows (dict): Dict mapping the (path, size, modification date in
+                         [ns]) keys of the files to their (container, codec)
+                         tuples.
+        """
+
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO audio_probes (path, size, mtime_ns, container, codec) '
+                'VALUES (?, ?, ?, ?, ?)', [key + probe for key, probe in rows.items()])
+
+    def close(self):
+        self._connection.close()
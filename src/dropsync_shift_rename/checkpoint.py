@@ -0,0 +1,180 @@
+# checkpoint.py
+
+
+import json
+import os
+import threading
+import time
+
+# Initializations
+# (Relative path of the top folder of a tree among its folders)
+TOP_FOLDER: str = '.'
+
+
+def folder_dates(dir_path: str) -> dict:
+    """
+    Lists the folders of a directory tree with their modification dates (a
+    folder's modification date changing whenever an entry is added to,
+    removed from or renamed in it). The entries of every folder are listed to
+    find its subfolders, but only the folders are stat'ed.
+
+    Args:
+        dir_path (str): Path of the directory.
+
+    Returns:
+        folder_dates (dict): Dict mapping the paths of the folders (relative to
+        the directory, "." for the directory itself) to their modification
+        dates in [ns] (None for the directory if it does not exist).
+    """
+
+    folder_dates = {TOP_FOLDER: None}
+    stack = [dir_path]
+    while len(stack) > 0:
+        folder_path = stack.pop()
+        try:
+            mtime_ns = os.stat(folder_path).st_mtime_ns
+            with os.scandir(folder_path) as it:
+                stack.extend(entry.path for entry in it if entry.is_dir(follow_symlinks=False))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        folder_dates[os.path.relpath(folder_path, dir_path)] = mtime_ns
+
+    return folder_dates
+
+
+def folders_unchanged(dir_path: str, folder_dates: dict) -> bool:
+    """
+    Checks whether a directory tree is unchanged since its folders were listed
+    (cf. "folder_dates"). Only the listed folders are stat'ed, none of them
+    being listed again: a file or folder added to (or removed from) any folder
+    of the tree changes the modification date of that folder.
+
+    Args:
+        dir_path (str): Path of the directory.
+        folder_dates (dict): Dict mapping the relative paths of the folders to
+                             their modification dates in [ns] when listed.
+
+    Returns:
+        unchanged (bool): Whether the tree is unchanged.
+    """
+
+    for relative_path, mtime_ns in folder_dates.items():
+        try:
+            current_mtime_ns = os.stat(os.path.join(dir_path, relative_path)).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            current_mtime_ns = None
+        if current_mtime_ns != mtime_ns:
+            return False
+
+    return True
+
+
+class Checkpoints:
+    """
+    Checkpoints of a run, kept in a JSON file that is rewritten atomically
+    whenever a section (i.e., source of a root, e.g. "WhatsApp") is done, so
+    that a run interrupted midway can be resumed: the sections completed by
+    the interrupted run are skipped as long as their folders are unchanged
+    (cf. "folders_unchanged"), the next run continuing from the first
+    incomplete section. The steps of an incomplete section need no
+    checkpoints, since the section is planned again from the state of its
+    folder, in which the work of its completed steps is already done.
+    """
+
+    def __init__(self, checkpoint_path: str, resume: bool = False):
+        """
+        Args:
+            checkpoint_path (str): Path of the checkpoint file.
+            resume (bool): Whether to resume the run whose checkpoints are kept
+                           in the file (a new run being started otherwise).
+        """
+
+        self.checkpoint_path = checkpoint_path
+        # (Dicts mapping the "root path|source name" keys of the sections
+        # done by the interrupted run and by this run to their records)
+        self._previous_sections = read_checkpoints(checkpoint_path).get('sections', {}) if resume else {}
+        self._sections = {}
+        # (Set containing the names of the sources of the sections skipped by
+        # this run, since completed by the interrupted run)
+        self.skipped_sources = set()
+        self._lock = threading.Lock()
+        self._save()
+
+    def _save(self):
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sections': self._sections}, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def is_done(self, root_path: str, source_name: str) -> bool:
+        """
+        Checks whether a section has been completed by the interrupted run and
+        left unchanged since (its checkpoint being then kept for this run).
+
+        Args:
+            root_path (str): Path of the root of the section.
+            source_name (str): Name of the source of the section.
+
+        Returns:
+            done (bool): Whether the section can be skipped.
+        """
+
+        key = f'{root_path}|{source_name}'
+        record = self._previous_sections.get(key)
+        if record is None or not isinstance(record.get('folders'), dict) \
+                or not folders_unchanged(os.path.join(root_path, source_name), record['folders']):
+            return False
+        with self._lock:
+            self._sections[key] = record
+            self.skipped_sources.add(source_name)
+            self._save()
+
+        return True
+
+    def section_done(self, root_path: str, source_name: str):
+        """
+        Records the checkpoint of a completed section, along with the
+        modification dates of its folders once processed.
+
+        Args:
+            root_path (str): Path of the root of the section.
+            source_name (str): Name of the source of the section.
+        """
+
+        folders = folder_dates(os.path.join(root_path, source_name))
+        with self._lock:
+            self._sections[f'{root_path}|{source_name}'] = {'done': time.time(), 'folders': folders}
+            self._save()
+
+    def remove(self):
+        """
+        Removes the checkpoint file once the run is complete.
+        """
+
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
+
+
+def read_checkpoints(checkpoint_path: str) -> dict:
+    """
+    Reads the checkpoints of a run.
+
+    Args:
+        checkpoint_path (str): Path of the checkpoint file.
+
+    Returns:
+        checkpoints (dict): The "sections" records of the run (empty if the
+        file does not exist or cannot be read).
+    """
+
+    try:
+        with open(checkpoint_path, encoding='utf-8') as f:
+            checkpoints = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return checkpoints if isinstance(checkpoints, dict) else {}
@@ -0,0 +1,141 @@
+# config.py
+
+
+import os
+from typing import NamedTuple
+
+from .catalog import default_catalog_path
+
+# Initializations
+TOML_EXTENSIONS: tuple = ('.toml',)
+YAML_EXTENSIONS: tuple = ('.yaml', '.yml')
+
+
+class Root(NamedTuple):
+    """
+    Directory in which the media files of a device are synced, with the
+    sources (i.e., top-level folders, e.g. "WhatsApp") to process in it and the
+    folder to which their files are moved.
+    """
+
+    name: str
+    path: str
+    destination: str
+    sources: tuple
+
+
+class Config(NamedTuple):
+    """
+    Roots to process and global settings of a run.
+    """
+
+    roots: list
+    # (Maximum number of conversions of each kind (images, audio files) running
+    # at once for all the roots, None for the number of cores)
+    max_conversion_workers: int = None
+
+
+def default_config_path() -> str:
+    """
+    Returns the platform specific path of the configuration file (next to the
+    catalog).
+
+    Returns:
+        config_path (str): Path of the configuration file.
+    """
+
+    return os.path.join(os.path.dirname(default_catalog_path()), 'config.toml')
+
+
+def read_config_file(config_path: str) -> dict:
+    """
+    Reads a TOML or YAML configuration file (depending on its extension).
+
+    Args:
+        config_path (str): Path of the configuration file.
+
+    Returns:
+        data (dict): The content of the file.
+    """
+
+    extension = os.path.splitext(config_path)[1].lower()
+    if extension in TOML_EXTENSIONS:
+        # (Part of the standard library from Python 3.11 on)
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib  # pip3 install tomli (Python < 3.11)
+            except ImportError:
+                raise ValueError(f'reading "{config_path}" requires Python 3.11+ or the "tomli" package')
+        with open(config_path, 'rb') as f:
+            try:
+                return tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f'"{config_path}" is not valid TOML: {e}')
+    if extension in YAML_EXTENSIONS:
+        try:
+            import yaml  # pip3 install pyyaml (optional, YAML configuration files)
+        except ImportError:
+            raise ValueError(f'reading "{config_path}" requires the "pyyaml" package')
+        with open(config_path, encoding='utf-8') as f:
+            try:
+                return yaml.safe_load(f) or {}
+            except yaml.YAMLError as e:
+                raise ValueError(f'"{config_path}" is not valid YAML: {e}')
+
+    raise ValueError(f'"{config_path}" is neither a TOML nor a YAML file')
+
+
+def load_config(config_path: str, source_names: list) -> Config:
+    """
+    Loads the roots to process from a configuration file, e.g. (in TOML):
+
+        max_conversion_workers = 8
+
+        [[roots]]
+        name = "Pixel"
+        path = "~/Dropbox/DropsyncFiles/Pixel"
+        destination = "~/Dropbox/Camera Uploads"
+
+        [[roots]]
+        name = "Galaxy"
+        path = "/Volumes/Backup/DropsyncFiles/Galaxy"
+        destination = "~/Dropbox/Camera Uploads"
+        sources = ["WhatsApp", "Telegram"]
+
+    Args:
+        config_path (str): Path of the configuration file (".toml", ".yaml" or
+                           ".yml").
+        source_names (list): List containing the names of the known sources
+                             (all of them being processed in the roots that do
+                             not list theirs).
+
+    Returns:
+        config (Config): The configuration (a ValueError being raised if it is
+        invalid).
+    """
+
+    data = read_config_file(config_path)
+    if not isinstance(data, dict) or not isinstance(data.get('roots'), list) or len(data['roots']) == 0:
+        raise ValueError(f'"{config_path}" lists no roots')
+    roots = []
+    for i, entry in enumerate(data['roots']):
+        if not isinstance(entry, dict) or 'path' not in entry or 'destination' not in entry:
+            raise ValueError(f'root #{i + 1} of "{config_path}" has no "path" or no "destination"')
+        path = os.path.normpath(os.path.expanduser(entry['path']))
+        sources = tuple(entry.get('sources', source_names))
+        unknown_sources = [source for source in sources if source not in source_names]
+        if len(unknown_sources) > 0:
+            raise ValueError(f'unknown source(s) {", ".join(map(repr, unknown_sources))} in root #{i + 1} '
+                             f'of "{config_path}" (known sources: {", ".join(source_names)})')
+        roots.append(Root(str(entry.get('name', os.path.basename(path))), path,
+                          os.path.normpath(os.path.expanduser(entry['destination'])), sources))
+    if len({root.path for root in roots}) < len(roots):
+        raise ValueError(f'"{config_path}" lists a same root several times')
+    max_conversion_workers = data.get('max_conversion_workers')
+    if max_conversion_workers is not None and (not isinstance(max_conversion_workers, int)
+                                               or max_conversion_workers < 1):
+        raise ValueError(f'"max_conversion_workers" of "{config_path}" is not a positive integer')
+
+    return Config(roots, max_conversion_workers)
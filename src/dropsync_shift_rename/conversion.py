@@ -0,0 +1,434 @@
+# conversion.py
+
+
+import os
+import subprocess
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from itertools import chain, islice
+from typing import NamedTuple
+
+from .cache import ConversionCache
+from .transfer import temporary_path
+
+# Initializations
+# (Number of conversions submitted to the pool per worker, bounding the memory
+# used by the pending work while keeping every worker busy)
+IN_FLIGHT_PER_WORKER: int = 2
+# (Maximum duration in [s] of a single ffmpeg conversion)
+FFMPEG_TIMEOUT: float = 600
+# (Maximum number of audio files converted by a single ffmpeg process, so that
+# short files (e.g. voice notes) do not each pay for the start of ffmpeg)
+AUDIO_BATCH_SIZE: int = 16
+# (Conversion parameters, part of the conversion cache keys, to be changed
+# whenever the way files are converted changes)
+WEBP_TO_PNG_PARAMS: str = 'webp_to_png:RGBA:png'
+AUDIO_TO_MP3_PARAMS: str = 'audio_to_mp3:ffmpeg:-map a:0 -map v:0? -map_metadata -f mp3'
+REMUX_TO_MP3_PARAMS: str = 'remux_to_mp3:ffmpeg:-map a:0 -map v:0? -map_metadata -c copy -f mp3'
+
+
+class ConversionResult(NamedTuple):
+    """
+    Status of a single file conversion.
+    """
+
+    src: str
+    dst: str
+    error: str = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def webp_to_png(src_path: str, dst_path: str) -> ConversionResult:
+    """
+    Converts a ".webp" image to ".png" (run in the worker processes).
+    (Cf. "Image Conversion (JPG ⇄ PNG/JPG ⇄ WEBP) with Python",
+    https://medium.com/@ajeet214/image-type-conversion-jpg-png-jpg-webp-png-webp-with-python-7d5df09394c9)
+
+    Args:
+        src_path (str): Path of the ".webp" image.
+        dst_path (str): Path of the ".png" image to create.
+
+    Returns:
+        result (ConversionResult): The status of the conversion.
+    """
+
+    from PIL import Image  # pip3 install Pillow (imported in the workers only)
+
+    try:
+        with Image.open(src_path) as im:
+            im.convert('RGBA').save(dst_path, 'png')
+        return ConversionResult(src_path, dst_path)
+    except (OSError, ValueError) as e:
+        return ConversionResult(src_path, dst_path, str(e))
+
+
+def audio_to_mp3(src_path: str, dst_path: str, timeout: float = FFMPEG_TIMEOUT) -> ConversionResult:
+    """
+    Converts an audio file of any type to ".mp3" with ffmpeg (run in the worker
+    threads). The output is written to a temporary file unique to the job,
+    which is renamed to the destination path once the conversion succeeded.
+
+    Args:
+        src_path (str): Path of the audio file.
+        dst_path (str): Path of the ".mp3" file to create.
+        timeout (float): Maximum duration in [s] of the conversion.
+
+    Returns:
+        result (ConversionResult): The status of the conversion.
+    """
+
+    error = run_ffmpeg([(src_path, dst_path)], timeout)
+    if error is not None:
+        return ConversionResult(src_path, dst_path, error)
+
+    return ConversionResult(src_path, dst_path)
+
+
+def remux_to_mp3(src_path: str, dst_path: str, timeout: float = FFMPEG_TIMEOUT) -> ConversionResult:
+    """
+    Copies the MP3 audio stream of a file (e.g. an ".m4a" file holding MP3
+    audio) into an ".mp3" file with ffmpeg, without re-encoding it (run in the
+    worker threads).
+
+    Args:
+        src_path (str): Path of the audio file.
+        dst_path (str): Path of the ".mp3" file to create.
+        timeout (float): Maximum duration in [s] of the remux.
+
+    Returns:
+        result (ConversionResult): The status of the remux.
+    """
+
+    error = run_ffmpeg([(src_path, dst_path)], timeout, copy=True)
+    if error is not None:
+        return ConversionResult(src_path, dst_path, error)
+
+    return ConversionResult(src_path, dst_path)
+
+
+def run_ffmpeg(file_pairs: list, timeout: float, copy: bool = False) -> str:
+    """
+    Converts audio files to ".mp3" with a single ffmpeg process (one input and
+    one output per file, each output taking the audio stream, the cover art
+    and the metadata of its own input). The outputs are written to temporary
+    files unique to the job, which are renamed to their destination paths only
+    if the whole process succeeded.
+
+    Args:
+        file_pairs (list): List containing the (path of the audio file, path of
+                           the ".mp3" file to create) tuples.
+        timeout (float): Maximum duration in [s] of the process.
+        copy (bool): Whether to copy the streams as they are instead of
+                     encoding them (for MP3 audio streams).
+
+    Returns:
+        error (str): The error of the process (None on success).
+    """
+
+    temp_paths = [temporary_path(dst_path) for _, dst_path in file_pairs]
+    command = ['ffmpeg', '-nostdin', '-y', '-loglevel', 'error']
+    for src_path, _ in file_pairs:
+        command += ['-i', src_path]
+    for i, temp_path in enumerate(temp_paths):
+        command += ['-map', f'{i}:a:0', '-map', f'{i}:v:0?', '-map_metadata', str(i)] \
+            + (['-c', 'copy'] if copy else []) + ['-f', 'mp3', temp_path]
+    try:
+        completed_process = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                           stderr=subprocess.PIPE, timeout=timeout)
+        if completed_process.returncode != 0:
+            error = completed_process.stderr.decode(errors='replace').strip().splitlines()
+            return f'ffmpeg exited with code {completed_process.returncode}' + (f' ({error[-1]})' if error else '')
+        for (_, dst_path), temp_path in zip(file_pairs, temp_paths):
+            os.replace(temp_path, dst_path)
+    except subprocess.TimeoutExpired:
+        return f'ffmpeg timed out after {timeout}[s]'
+    except OSError as e:
+        return str(e)
+    finally:
+        for temp_path in temp_paths:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+
+
+def audio_batch_to_mp3(file_pairs: list, timeout: float = FFMPEG_TIMEOUT) -> list:
+    """
+    Converts a batch of audio files to ".mp3" with a single ffmpeg process (run
+    in the worker threads). If the process fails (e.g. because of a single
+    corrupt file), the files are converted again one by one, so that every
+    error is attributed to its own file and that the other files are converted
+    anyway.
+
+    Args:
+        file_pairs (list): List containing the (path of the audio file, path of
+                           the ".mp3" file to create) tuples.
+        timeout (float): Maximum duration in [s] of the conversion of a file.
+
+    Returns:
+        results (list): List containing the status (ConversionResult) of each
+        conversion.
+    """
+
+    if len(file_pairs) > 1 and run_ffmpeg(file_pairs, timeout * len(file_pairs)) is None:
+        return [ConversionResult(src_path, dst_path) for src_path, dst_path in file_pairs]
+
+    return [audio_to_mp3(src_path, dst_path, timeout) for src_path, dst_path in file_pairs]
+
+
+def cached_conversion(function, cache: ConversionCache, params: str, src_path: str, dst_path: str,
+                      *args) -> ConversionResult:
+    """
+    Runs a conversion function unless its output is already in the conversion
+    cache, in which case the cached output is put at the destination path, and
+    stores the output of successful conversions in the cache (run in the
+    workers, so that files are hashed in parallel).
+
+    Args:
+        function (callable): The conversion function.
+        cache (ConversionCache): The conversion cache (None to always convert).
+        params (str): The conversion parameters (part of the cache key).
+        src_path (str): Path of the file to convert.
+        dst_path (str): Path of the conversion output.
+        *args: Additional arguments of the conversion function.
+
+    Returns:
+        result (ConversionResult): The status of the conversion.
+    """
+
+    if cache is None:
+        return function(src_path, dst_path, *args)
+    try:
+        entry_path = cache.entry_path(src_path, params, os.path.splitext(dst_path)[1])
+    except OSError as e:
+        return ConversionResult(src_path, dst_path, str(e))
+    if cache.fetch(entry_path, dst_path):
+        return ConversionResult(src_path, dst_path, cached=True)
+    conversion_result = function(src_path, dst_path, *args)
+    if conversion_result.ok:
+        cache.store(entry_path, dst_path)
+
+    return conversion_result
+
+
+def cached_batch_conversion(cache: ConversionCache, file_pairs: list, timeout: float = FFMPEG_TIMEOUT) -> list:
+    """
+    Converts a batch of audio files to ".mp3" with a single ffmpeg process
+    (cf. "audio_batch_to_mp3"), leaving out the files whose output is already
+    in the conversion cache (cf. "cached_conversion").
+
+    Args:
+        cache (ConversionCache): The conversion cache (None to always convert).
+        file_pairs (list): List containing the (path of the audio file, path of
+                           the ".mp3" file to create) tuples.
+        timeout (float): Maximum duration in [s] of the conversion of a file.
+
+    Returns:
+        results (list): List containing the status (ConversionResult) of each
+        conversion.
+    """
+
+    if cache is None:
+        return audio_batch_to_mp3(file_pairs, timeout)
+    results = []
+    # (Dict mapping the (source path, destination path) tuples of the files to
+    # convert to the paths of their cache entries)
+    entry_paths = {}
+    for src_path, dst_path in file_pairs:
+        try:
+            entry_path = cache.entry_path(src_path, AUDIO_TO_MP3_PARAMS, os.path.splitext(dst_path)[1])
+        except OSError as e:
+            results.append(ConversionResult(src_path, dst_path, str(e)))
+            continue
+        if cache.fetch(entry_path, dst_path):
+            results.append(ConversionResult(src_path, dst_path, cached=True))
+        else:
+            entry_paths[(src_path, dst_path)] = entry_path
+    for conversion_result in audio_batch_to_mp3(list(entry_paths), timeout):
+        if conversion_result.ok:
+            cache.store(entry_paths[(conversion_result.src, conversion_result.dst)], conversion_result.dst)
+        results.append(conversion_result)
+
+    return results
+
+
+def batches(items, batch_size: int, nb_batches: int = 1):
+    """
+    Groups items in batches (lazily), the batches being made smaller than
+    their maximum size when there are too few items to fill the given number
+    of batches (e.g. so that every worker of a pool gets a batch).
+
+    Args:
+        items (iterable): The items.
+        batch_size (int): Maximum number of items per batch.
+        nb_batches (int): Number of batches to fill at least (if possible).
+
+    Yields:
+        batch (list): List containing the items of a batch.
+    """
+
+    items = iter(items)
+    first_items = list(islice(items, batch_size * nb_batches))
+    if len(first_items) < batch_size * nb_batches:
+        batch_size = max(1, -(-len(first_items) // nb_batches))
+    items = chain(first_items, items)
+    while True:
+        batch = list(islice(items, batch_size))
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+def conversion_job(src_path: str, dst_path: str, cache: ConversionCache = None,
+                   timeout: float = FFMPEG_TIMEOUT, remux: bool = False) -> tuple:
+    """
+    Returns the arguments of the "cached_conversion" call converting a ".webp"
+    image to ".png" or an audio file to ".mp3", depending on the extension of
+    the conversion output.
+
+    Args:
+        src_path (str): Path of the file to convert.
+        dst_path (str): Path of the conversion output (".png" or ".mp3").
+        cache (ConversionCache): Conversion cache to use (if any).
+        timeout (float): Maximum duration in [s] of an ffmpeg conversion.
+        remux (bool): Whether to copy the MP3 audio stream of the audio file
+                      instead of encoding it (cf. "remux_to_mp3").
+
+    Returns:
+        job (tuple): The arguments of the call.
+    """
+
+    if dst_path.endswith('.png'):
+        return webp_to_png, cache, WEBP_TO_PNG_PARAMS, src_path, dst_path
+    if remux:
+        return remux_to_mp3, cache, REMUX_TO_MP3_PARAMS, src_path, dst_path, timeout
+
+    return audio_to_mp3, cache, AUDIO_TO_MP3_PARAMS, src_path, dst_path, timeout
+
+
+def run_in_pool(function, jobs, max_workers: int = None, use_processes: bool = True):
+    """
+    Runs a function on jobs in a pool of workers sized to the number of cores,
+    keeping a bounded number of jobs in flight (the jobs being consumed lazily,
+    so that they can come from a generator), and yields the results as they
+    complete.
+
+    Args:
+        function (callable): Module level function to run (must be picklable
+                             when run in processes).
+        jobs (iterable): Iterable of the argument tuples of each call.
+        max_workers (int): Number of workers (number of cores if None).
+        use_processes (bool): Whether to run the function in processes (for
+                              CPU-bound work) or in threads (e.g. for work that
+                              is delegated to subprocesses).
+
+    Yields:
+        result: The value returned by each call (in completion order).
+    """
+
+    max_workers = max_workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    # (Sizing the pool to the number of jobs when there are fewer jobs than workers)
+    first_jobs = list(islice(jobs, max_workers))
+    max_workers = min(max_workers, len(first_jobs))
+    if max_workers <= 1:
+        # (Not paying the cost of starting a pool for a single job)
+        for job in chain(first_jobs, jobs):
+            yield function(*job)
+        return
+
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    with executor:
+        in_flight = set()
+        for job in chain(first_jobs, jobs):
+            in_flight.add(executor.submit(function, *job))
+            if len(in_flight) < max_workers * IN_FLIGHT_PER_WORKER:
+                continue
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        for future in wait(in_flight).done:
+            yield future.result()
+
+
+def convert_webp_images(webp_paths, max_workers: int = None, cache: ConversionCache = None):
+    """
+    Converts ".webp" images to ".png" images (next to them) in parallel.
+
+    Args:
+        webp_paths (iterable): Iterable of the paths of the ".webp" images
+                               (consumed lazily).
+        max_workers (int): Number of worker processes (number of cores if None).
+        cache (ConversionCache): Conversion cache to use (if any).
+
+    Yields:
+        result (ConversionResult): The status of each conversion (in completion
+        order).
+    """
+
+    jobs = (conversion_job(webp_path, webp_path[:-len('.webp')] + '.png', cache) for webp_path in webp_paths)
+    yield from run_in_pool(cached_conversion, jobs, max_workers)
+
+
+def convert_audio_files(audio_paths, max_workers: int = None, timeout: float = FFMPEG_TIMEOUT,
+                        cache: ConversionCache = None, batch_size: int = AUDIO_BATCH_SIZE):
+    """
+    Converts audio files of any type to ".mp3" files (next to them) by running
+    several ffmpeg processes at once, each converting a batch of files.
+
+    Args:
+        audio_paths (iterable): Iterable of the paths of the audio files
+                                (consumed lazily).
+        max_workers (int): Number of concurrent ffmpeg processes (number of
+                           cores if None).
+        timeout (float): Maximum duration in [s] of each conversion.
+        cache (ConversionCache): Conversion cache to use (if any).
+        batch_size (int): Maximum number of files converted by a single ffmpeg
+                          process (1 to run one process per file).
+
+    Yields:
+        result (ConversionResult): The status of each conversion (in completion
+        order).
+    """
+
+    if batch_size <= 1:
+        jobs = (conversion_job(audio_path, os.path.splitext(audio_path)[0] + '.mp3', cache, timeout)
+                for audio_path in audio_paths)
+        yield from run_in_pool(cached_conversion, jobs, max_workers, use_processes=False)
+        return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    file_pairs = ((audio_path, os.path.splitext(audio_path)[0] + '.mp3') for audio_path in audio_paths)
+    jobs = ((cache, batch, timeout) for batch in batches(file_pairs, batch_size, max_workers))
+    for results in run_in_pool(cached_batch_conversion, jobs, max_workers, use_processes=False):
+        yield from results
+
+
+def remux_audio_files(audio_paths, max_workers: int = None, timeout: float = FFMPEG_TIMEOUT,
+                      cache: ConversionCache = None):
+    """
+    Copies the MP3 audio streams of audio files into ".mp3" files (next to
+    them) without re-encoding them, by running several ffmpeg processes at
+    once.
+
+    Args:
+        audio_paths (iterable): Iterable of the paths of the audio files
+                                (consumed lazily).
+        max_workers (int): Number of concurrent ffmpeg processes (number of
+                           cores if None).
+        timeout (float): Maximum duration in [s] of each remux.
+        cache (ConversionCache): Conversion cache to use (if any).
+
+    Yields:
+        result (ConversionResult): The status of each remux (in completion
+        order).
+    """
+
+    jobs = (conversion_job(audio_path, os.path.splitext(audio_path)[0] + '.mp3', cache, timeout, remux=True)
+            for audio_path in audio_paths)
+    yield from run_in_pool(cached_conversion, jobs, max_workers, use_processes=False)
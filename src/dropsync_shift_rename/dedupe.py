@@ -0,0 +1,169 @@
+# dedupe.py
+
+
+import hashlib
+import mmap
+import os
+
+# Initializations
+DROP_MODE: str = 'drop'
+HARDLINK_MODE: str = 'hardlink'
+KEEP_MODE: str = 'keep'
+DUPLICATE_MODES: tuple = (DROP_MODE, HARDLINK_MODE, KEEP_MODE)
+# (Size in bytes of the first and last blocks hashed to tell apart files of the
+# same size before hashing them entirely)
+PARTIAL_BLOCK_SIZE: int = 64 * 1024
+# (Indexes of the hashes in the rows of the index)
+PARTIAL_HASH: int = 2
+FULL_HASH: int = 3
+
+
+def content_hash(file_path: str, partial: bool = False) -> str:
+    """
+    Hashes the content of a file through a memory map (so that it is not read
+    in Python-level chunks).
+
+    Args:
+        file_path (str): Path of the file.
+        partial (bool): Whether to only hash its first and last blocks.
+
+    Returns:
+        hash (str): The BLAKE2b hex digest.
+    """
+
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return hashlib.blake2b().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            if not partial:
+                return hashlib.blake2b(m).hexdigest()
+            digest = hashlib.blake2b(m[:PARTIAL_BLOCK_SIZE])
+            digest.update(m[max(PARTIAL_BLOCK_SIZE, size - PARTIAL_BLOCK_SIZE):])
+            return digest.hexdigest()
+
+
+class DuplicateFinder:
+    """
+    Finds the files already in the library (i.e., the "Camera Uploads" folder)
+    with exactly the same content as incoming files: only the library files of
+    the same size are considered, then compared by the hash of their first and
+    last blocks, and only the remaining candidates are hashed entirely. Hashes
+    are computed lazily and kept in the catalog (keyed by path, size and
+    modification date), so that the library is hashed at most once.
+    """
+
+    def __init__(self, library_path: str, catalog=None):
+        """
+        Args:
+            library_path (str): Path of the library folder.
+            catalog (Catalog): The catalog in which the hashes are kept (if any).
+        """
+
+        self.library_path = os.path.normpath(library_path)
+        self._catalog = catalog
+        stored_rows = catalog.hashes(self.library_path) if catalog is not None else {}
+        # (Dict mapping the paths of the library files to their [size,
+        # modification date in [ns], partial hash, full hash] lists)
+        self._rows = {}
+        # (Dict mapping the sizes to the paths of the library files of that size)
+        self._buckets = {}
+        # (Dict mapping the planned paths of the files planned into the library
+        # to the paths from which their content can be read)
+        self._content_paths = {}
+        self._hashed_paths = set()
+        try:
+            with os.scandir(self.library_path) as it:
+                for entry in it:
+                    if entry.name.startswith('.') or not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    row = stored_rows.get(entry.path)
+                    if row is None or tuple(row[:2]) != (stat.st_size, stat.st_mtime_ns):
+                        row = (stat.st_size, stat.st_mtime_ns, None, None)
+                    self._rows[entry.path] = list(row)
+                    self._buckets.setdefault(stat.st_size, []).append(entry.path)
+        except FileNotFoundError:
+            pass
+        self._removed_paths = [path for path in stored_rows if path not in self._rows]
+
+    def _hash(self, path: str, index: int) -> str:
+        row = self._rows[path]
+        if row[index] is None:
+            content_path = self._content_paths.get(path, path)
+            # (The files planned into the library being read from their path in
+            # it once moved)
+            if content_path != path and not os.path.lexists(content_path):
+                content_path = path
+            row[index] = content_hash(content_path, partial=index == PARTIAL_HASH)
+            self._hashed_paths.add(path)
+
+        return row[index]
+
+    def find(self, file_path: str, size: int) -> str:
+        """
+        Finds a file of the library with the same content as a file.
+
+        Args:
+            file_path (str): Path of the file.
+            size (int): Size in bytes of the file.
+
+        Returns:
+            duplicate_path (str): The (planned) path of the library file with
+                                  the same content (None if there is none).
+        """
+
+        candidates = self._buckets.get(size, [])
+        if len(candidates) == 0:
+            return None
+        try:
+            file_hashes = {PARTIAL_HASH: content_hash(file_path, partial=True)}
+        except OSError:
+            return None
+        for index in (PARTIAL_HASH, FULL_HASH):
+            if index not in file_hashes:
+                try:
+                    file_hashes[index] = content_hash(file_path)
+                except OSError:
+                    return None
+            matching_candidates = []
+            for path in candidates:
+                try:
+                    if self._hash(path, index) == file_hashes[index]:
+                        matching_candidates.append(path)
+                except OSError:
+                    continue
+            candidates = matching_candidates
+            if len(candidates) == 0:
+                return None
+
+        return candidates[0]
+
+    def add(self, planned_path: str, size: int, content_path: str):
+        """
+        Adds a file planned into the library (so that the next incoming files
+        are compared with it too).
+
+        Args:
+            planned_path (str): Path of the file once in the library.
+            size (int): Size in bytes of the file.
+            content_path (str): Path from which its content can be read until
+                                it is moved (its planned path being read
+                                afterwards).
+        """
+
+        self._rows[planned_path] = [size, None, None, None]
+        self._content_paths[planned_path] = content_path
+        self._buckets.setdefault(size, []).append(planned_path)
+
+    def save(self):
+        """
+        Keeps the hashes computed so far in the catalog (if any).
+        """
+
+        if self._catalog is None:
+            return
+        rows = {path: tuple(self._rows[path]) for path in self._hashed_paths if path not in self._content_paths}
+        self._catalog.record_hashes(rows, self._removed_paths)
+        self._hashed_paths = set()
+        self._removed_paths = []
@@ -0,0 +1,159 @@
+# inventory.py
+
+
+import os
+
+
+class Inventory:
+    """
+    Single-pass, "os.scandir" based inventory of a directory tree. Every folder
+    of the tree is listed exactly once, and the "DirEntry" objects are kept so
+    that the type of the entries comes for free and their stat results are
+    fetched at most once (only for the entries whose size or dates are needed).
+    """
+
+    def __init__(self, root_path: str):
+        """
+        Args:
+            root_path (str): Path of the directory tree to inventory (which may
+                             not exist, in which case the inventory is empty).
+        """
+
+        self.root_path = os.path.normpath(root_path)
+        # (Dict mapping every folder path to the list of its DirEntry objects)
+        self._entries = {}
+        # (Dict mapping every file path to its DirEntry object)
+        self._files = {}
+        self._scan()
+
+    def _scan(self):
+        folders_to_scan = [self.root_path]
+        while len(folders_to_scan) > 0:
+            folder_path = folders_to_scan.pop()
+            try:
+                with os.scandir(folder_path) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            self._entries[folder_path] = entries
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders_to_scan.append(entry.path)
+                else:
+                    self._files[entry.path] = entry
+
+    def is_dir(self, dir_path: str) -> bool:
+        """
+        Tells whether a folder exists in the tree.
+
+        Args:
+            dir_path (str): Path of the folder.
+
+        Returns:
+            is_dir (bool): Whether the folder exists.
+        """
+
+        return os.path.normpath(dir_path) in self._entries
+
+    def files(self, dir_path: str, extensions: tuple = None, recursive: bool = False,
+              include_hidden: bool = False) -> list:
+        """
+        Lists the files of a folder.
+
+        Args:
+            dir_path (str): Path of the folder.
+            extensions (tuple): Tuple containing the extensions (e.g. ".jpg") of
+                                the files to list (case-sensitive, all files if
+                                None).
+            recursive (bool): Whether to list the files of the subfolders too.
+            include_hidden (bool): Whether to list hidden files too.
+
+        Returns:
+            file_paths (list): List containing the paths of the files.
+        """
+
+        file_paths = []
+        for entry in self._entries.get(os.path.normpath(dir_path), []):
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    file_paths += self.files(entry.path, extensions, recursive, include_hidden)
+            elif (include_hidden or not entry.name.startswith('.')) \
+                    and (extensions is None or entry.name.endswith(extensions)):
+                file_paths.append(entry.path)
+
+        return file_paths
+
+    def subdirs(self, dir_path: str, include_hidden: bool = True) -> list:
+        """
+        Lists the subfolders of a folder.
+
+        Args:
+            dir_path (str): Path of the folder.
+            include_hidden (bool): Whether to list hidden subfolders too.
+
+        Returns:
+            subdir_paths (list): List containing the paths of the subfolders.
+        """
+
+        return [entry.path for entry in self._entries.get(os.path.normpath(dir_path), [])
+                if entry.is_dir(follow_symlinks=False) and (include_hidden or not entry.name.startswith('.'))]
+
+    def children(self, dir_path: str, include_hidden: bool = False) -> list:
+        """
+        Lists the files and subfolders of a folder.
+
+        Args:
+            dir_path (str): Path of the folder.
+            include_hidden (bool): Whether to list hidden files and subfolders too.
+
+        Returns:
+            child_paths (list): List containing the paths of the files and subfolders.
+        """
+
+        return [entry.path for entry in self._entries.get(os.path.normpath(dir_path), [])
+                if include_hidden or not entry.name.startswith('.')]
+
+    def stat(self, file_path: str) -> os.stat_result:
+        """
+        Returns the (cached) stat result of a file of the tree.
+
+        Args:
+            file_path (str): Path of the file.
+
+        Returns:
+            stat (os.stat_result): The stat result (None if the file is not in
+                                   the inventory).
+        """
+
+        entry = self._files.get(os.path.normpath(file_path))
+
+        return entry.stat(follow_symlinks=False) if entry is not None else None
+
+    def size(self, path: str) -> int:
+        """
+        Computes the size of a file or folder of the tree.
+
+        Args:
+            path (str): Path of the file or folder.
+
+        Returns:
+            num_bytes (int): The size in bytes (0 if the path is not in the
+                             inventory).
+        """
+
+        stat = self.stat(path)
+        if stat is not None:
+            return stat.st_size
+
+        return sum(self.stat(file_path).st_size for file_path in self.files(path, recursive=True,
+                                                                              include_hidden=True))
+
+    def total_size(self) -> int:
+        """
+        Computes the total size of the files of the tree.
+
+        Returns:
+            num_bytes (int): The total size in bytes.
+        """
+
+        return sum(entry.stat(follow_symlinks=False).st_size for entry in self._files.values())
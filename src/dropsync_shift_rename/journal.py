@@ -0,0 +1,453 @@
+# journal.py
+
+
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+# Initializations
+RENAME_OP: str = 'rename'
+MOVE_OP: str = 'move'
+DELETE_OP: str = 'delete'
+CREATE_OP: str = 'create'
+LINK_OP: str = 'link'
+RMDIR_OP: str = 'rmdir'
+SNAPSHOT_OP: str = 'snapshot'
+BEGIN_PHASE: str = 'begin'
+PLAN_PHASE: str = 'plan'
+DONE_PHASE: str = 'done'
+COMMIT_PHASE: str = 'commit'
+# (Number of records after which the log is fsynced, in addition to every commit)
+FSYNC_BATCH_SIZE: int = 64
+
+
+def perform_operation(op: str, src: str, dst: str = None):
+    """
+    Performs a journaled operation on the filesystem. Deletions are performed
+    by moving the file or folder to the trash path given as destination, so
+    that they can be reverted until their transaction is committed.
+
+    Args:
+        op (str): The operation type ("rename", "move", "delete", "link" or
+                  "rmdir").
+        src (str): The source path of the operation (linked path for a link).
+        dst (str): The destination path of the operation (trash path for a
+                   deletion, None to delete permanently).
+    """
+
+    if op in (RENAME_OP, MOVE_OP) or (op == DELETE_OP and dst is not None):
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.move(src, dst)
+    elif op == DELETE_OP:
+        if os.path.isdir(src):
+            shutil.rmtree(src)
+        else:
+            os.remove(src)
+    elif op == LINK_OP:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.link(src, dst)
+    elif op == RMDIR_OP:
+        os.rmdir(src)
+
+
+def revert_operation(op: str, src: str, dst: str = None) -> bool:
+    """
+    Reverts a journaled operation if (and only if) its effect is present on the
+    filesystem, which makes it safe to call on operations that have only been
+    planned or that have already been reverted.
+
+    Args:
+        op (str): The operation type.
+        src (str): The source path of the operation.
+        dst (str): The destination path of the operation (if any).
+
+    Returns:
+        reverted (bool): Whether the operation has been reverted.
+    """
+
+    if op in (RENAME_OP, MOVE_OP, DELETE_OP):
+        if dst is not None and os.path.lexists(dst) and not os.path.lexists(src):
+            os.makedirs(os.path.dirname(src), exist_ok=True)
+            shutil.move(dst, src)
+            return True
+    elif op == CREATE_OP:
+        if os.path.isfile(src):
+            os.remove(src)
+            return True
+    elif op == LINK_OP:
+        # (Only removing the link itself, not a file that replaced it)
+        if os.path.isfile(dst) and os.path.isfile(src) and os.path.samefile(src, dst):
+            os.remove(dst)
+            return True
+    elif op == RMDIR_OP:
+        if not os.path.lexists(src):
+            os.makedirs(src)
+            return True
+
+    return False
+
+
+def complete_operation(op: str, src: str, dst: str = None) -> bool:
+    """
+    Completes a journaled operation that has been planned but whose completion
+    has not been recorded, if (and only if) it has not already taken effect.
+    Creations (i.e., conversion outputs) cannot be replayed, so their possibly
+    partial output is removed instead (the conversion is then redone by the
+    next run since its source is still there).
+
+    Args:
+        op (str): The operation type.
+        src (str): The source path of the operation.
+        dst (str): The destination path of the operation (if any).
+
+    Returns:
+        completed (bool): Whether the operation has been completed.
+    """
+
+    if op == CREATE_OP:
+        revert_operation(op, src, dst)
+        return False
+    if op == RMDIR_OP:
+        if os.path.isdir(src) and not os.listdir(src):
+            perform_operation(op, src, dst)
+            return True
+        return False
+    if os.path.lexists(src) and (dst is None or not os.path.lexists(dst)):
+        perform_operation(op, src, dst)
+        return True
+
+    return False
+
+
+class WriteAheadLog:
+    """
+    Append-only write-ahead log (one JSON object per line) of the operations
+    performed on the directory in which media files are synced. Operations are
+    grouped in transactions: each operation is recorded as planned before it is
+    performed and as done afterwards, and a transaction is committed once all
+    its operations are done. The log is flushed on every record and fsynced in
+    batches (and on every commit). A same log can be shared by several threads
+    (e.g. processing different roots), each one having its own transactions.
+    """
+
+    def __init__(self, log_path: str, trash_path: str):
+        """
+        Args:
+            log_path (str): Path of the log file (truncated if it exists).
+            trash_path (str): Path of the folder in which deleted files are kept
+                              until the transaction deleting them is committed.
+        """
+
+        self.log_path = log_path
+        self.trash_path = trash_path
+        self._file = open(log_path, 'w', encoding='utf-8')
+        self._seq = 0
+        self._nb_unsynced = 0
+        self._lock = threading.RLock()
+        # (Current transaction of every thread)
+        self._local = threading.local()
+
+    @property
+    def _txn(self) -> int:
+        return getattr(self._local, 'txn', None)
+
+    @_txn.setter
+    def _txn(self, txn: int):
+        self._local.txn = txn
+
+    def _write(self, record: dict, sync: bool = False):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            self._nb_unsynced += 1
+            if sync or self._nb_unsynced >= FSYNC_BATCH_SIZE:
+                os.fsync(self._file.fileno())
+                self._nb_unsynced = 0
+
+    @contextmanager
+    def transaction(self, name: str):
+        """
+        Groups the operations performed in the "with" block in a transaction,
+        which is committed when the block exits without raising (and left
+        uncommitted otherwise, to be undone or resumed by the next run).
+        Nested transactions are merged into the outermost one.
+
+        Args:
+            name (str): A human readable name for the transaction.
+        """
+
+        if self._txn is not None:
+            yield
+            return
+        with self._lock:
+            self._seq += 1
+            self._txn = self._seq
+        self._write({'txn': self._txn, 'phase': BEGIN_PHASE, 'name': name})
+        try:
+            yield
+            self._write({'txn': self._txn, 'phase': COMMIT_PHASE}, sync=True)
+            shutil.rmtree(os.path.join(self.trash_path, str(self._txn)), ignore_errors=True)
+        finally:
+            # (The next transactions of the thread not being merged into a
+            # failed one)
+            self._txn = None
+
+    @property
+    def current_transaction(self) -> int:
+        """
+        Returns:
+            txn (int): The transaction of the current thread (None if none).
+        """
+
+        return self._txn
+
+    @contextmanager
+    def joined(self, txn: int):
+        """
+        Makes the operations recorded by the current thread in the "with" block
+        part of a transaction begun by another thread (e.g. a thread offloading
+        them to a pool of workers).
+
+        Args:
+            txn (int): The transaction (cf. "current_transaction").
+        """
+
+        previous_txn = self._txn
+        self._txn = txn
+        try:
+            yield
+        finally:
+            self._txn = previous_txn
+
+    def plan(self, op: str, src: str, dst: str = None) -> int:
+        """
+        Records an operation as planned.
+
+        Args:
+            op (str): The operation type ("rename", "move", "delete", "create",
+                      "rmdir" or "snapshot").
+            src (str): The source path of the operation.
+            dst (str): The destination path of the operation (if any).
+
+        Returns:
+            seq (int): The sequence number of the operation.
+        """
+
+        with self._lock:
+            self._seq += 1
+            record = {'seq': self._seq, 'txn': self._txn, 'phase': PLAN_PHASE, 'op': op, 'src': src}
+            if dst is not None:
+                record['dst'] = dst
+            self._write(record)
+
+            return self._seq
+
+    def done(self, seq: int):
+        """
+        Records a planned operation as done.
+
+        Args:
+            seq (int): The sequence number of the operation.
+        """
+
+        self._write({'seq': seq, 'phase': DONE_PHASE})
+
+    def execute(self, op: str, src: str, dst: str = None):
+        """
+        Plans, performs and records as done a rename, move, delete, link or
+        rmdir operation (deleted files being moved to the trash of the current
+        transaction).
+
+        Args:
+            op (str): The operation type ("rename", "move", "delete", "link" or
+                      "rmdir").
+            src (str): The source path of the operation.
+            dst (str): The destination path of the operation (if any).
+        """
+
+        with self._lock:
+            if op == DELETE_OP:
+                dst = os.path.join(self.trash_path, str(self._txn), str(self._seq + 1) + '_' + os.path.basename(src))
+            seq = self.plan(op, src, dst)
+        perform_operation(op, src, dst)
+        self.done(seq)
+
+    def close(self):
+        """
+        Fsyncs and closes the log file.
+        """
+
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def read_log(log_path: str) -> list:
+    """
+    Reads all the records of a log, ignoring a truncated last line (e.g. if the
+    program has been killed while writing it).
+
+    Args:
+        log_path (str): Path of the log file.
+
+    Returns:
+        records (list): List containing the log records (dicts) in the order in
+        which they have been written.
+    """
+
+    records = []
+    with open(log_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+
+    return records
+
+
+def incomplete_operations(log_path: str) -> list:
+    """
+    Lists the planned operations of the transactions that have not been
+    committed (i.e., the incomplete tail of the log).
+
+    Args:
+        log_path (str): Path of the log file.
+
+    Returns:
+        operations (list): List containing the plan records (dicts) of the
+        uncommitted transactions, each one with an additional "done" key.
+    """
+
+    if not os.path.isfile(log_path):
+        return []
+    records = read_log(log_path)
+    committed = {r['txn'] for r in records if r['phase'] == COMMIT_PHASE}
+    done = {r['seq'] for r in records if r['phase'] == DONE_PHASE}
+    operations = [dict(r, done=r['seq'] in done) for r in records
+                  if r['phase'] == PLAN_PHASE and r['txn'] is not None and r['txn'] not in committed]
+
+    return operations
+
+
+def undo_incomplete(log_path: str) -> int:
+    """
+    Rolls back the uncommitted transactions of a log by reverting, from the
+    most recent to the oldest, their operations (done or merely planned).
+
+    Args:
+        log_path (str): Path of the log file.
+
+    Returns:
+        nb_reverted (int): Number of operations that have been reverted.
+    """
+
+    nb_reverted = 0
+    for r in reversed(incomplete_operations(log_path)):
+        nb_reverted += revert_operation(r['op'], r['src'], r.get('dst'))
+
+    return nb_reverted
+
+
+def resume_incomplete(log_path: str) -> int:
+    """
+    Rolls forward the uncommitted transactions of a log by completing the
+    operations that have been planned but not recorded as done.
+
+    Args:
+        log_path (str): Path of the log file.
+
+    Returns:
+        nb_completed (int): Number of operations that have been completed.
+    """
+
+    nb_completed = 0
+    for r in incomplete_operations(log_path):
+        if not r['done']:
+            nb_completed += complete_operation(r['op'], r['src'], r.get('dst'))
+
+    return nb_completed
+
+
+def _snapshot_path(snapshots: list, original_path: str) -> str:
+    """
+    Returns the path of the copy of a file (or folder) in the snapshot of the
+    root (i.e., directory in which media files are synced) holding it.
+
+    Args:
+        snapshots (list): List containing the "snapshot" records of the log
+                          (one per root).
+        original_path (str): The original path of the file.
+
+    Returns:
+        snapshot_path (str): The path of its copy (None if its root has no
+                             snapshot).
+    """
+
+    for snapshot in snapshots:
+        root_path = os.path.normpath(snapshot['src'])
+        if os.path.normpath(original_path).startswith(os.path.join(root_path, '')):
+            return os.path.join(snapshot['dst'], os.path.relpath(original_path, root_path))
+
+    return None
+
+
+def rebuild_layout(log_path: str) -> int:
+    """
+    Rebuilds the original layout of the directory in which media files are
+    synced by reverting, from the most recent to the oldest, all the operations
+    recorded in a log. Files deleted by committed transactions (whose trash has
+    been purged) are restored from the snapshot of their root whose path is
+    stored in the log (following the renames and moves they went through before being deleted to
+    find their original path). The rebuild is refused, before reverting
+    anything, if some of them cannot be restored (e.g. without a snapshot):
+    reverting the conversions that replaced them would otherwise lose both
+    versions of the files.
+
+    Args:
+        log_path (str): Path of the log file.
+
+    Returns:
+        nb_reverted (int): Number of operations that have been reverted.
+
+    Raises:
+        ValueError: If files deleted by committed transactions cannot be
+                    restored.
+    """
+
+    records = [r for r in read_log(log_path) if r['phase'] == PLAN_PHASE]
+    snapshots = [r for r in records if r['op'] == SNAPSHOT_OP]
+    # Computing the original path of every path that has been renamed or moved
+    origins = {}
+    snapshot_paths = []
+    for r in records:
+        src = r['src']
+        snapshot_paths.append(_snapshot_path(snapshots, origins.get(src, src)))
+        if r['op'] in (RENAME_OP, MOVE_OP):
+            origins[r['dst']] = origins.pop(src, src)
+    # Checking that every deleted file is still in the trash or in the snapshot
+    lost_paths = [r['src'] for r, snapshot_path in zip(records, snapshot_paths)
+                  if r['op'] == DELETE_OP and not os.path.lexists(r['src'])
+                  and (r.get('dst') is None or not os.path.lexists(r['dst']))
+                  and (snapshot_path is None or not os.path.lexists(snapshot_path))]
+    if len(lost_paths) > 0:
+        raise ValueError(f'{len(lost_paths)} file(s) deleted by committed transactions (e.g. "{lost_paths[0]}") '
+                         f'cannot be restored without a snapshot of the run')
+    # Reverting the operations from the most recent to the oldest
+    nb_reverted = 0
+    for r, snapshot_path in zip(reversed(records), reversed(snapshot_paths)):
+        op, src, dst = r['op'], r['src'], r.get('dst')
+        if revert_operation(op, src, dst):
+            nb_reverted += 1
+        elif op == DELETE_OP and snapshot_path is not None:
+            if os.path.lexists(src) or not os.path.lexists(snapshot_path):
+                continue
+            os.makedirs(os.path.dirname(src), exist_ok=True)
+            if os.path.isdir(snapshot_path):
+                shutil.copytree(snapshot_path, src, copy_function=os.link)
+            else:
+                os.link(snapshot_path, src)
+            nb_reverted += 1
+
+    return nb_reverted
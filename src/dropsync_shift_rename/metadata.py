@@ -0,0 +1,365 @@
+# metadata.py
+
+
+import math
+import os
+import platform
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+# Initializations
+SYSTEM: str = platform.system()
+JPEG_EXTENSIONS: tuple = ('.jpg', '.jpeg')
+# (ISO base media file formats, whose "moov/mvhd" atom holds the creation time)
+MP4_EXTENSIONS: tuple = ('.mp4', '.m4v', '.mov', '.3gp')
+# (EXIF tags, cf. "https://exiftool.org/TagNames/EXIF.html")
+EXIF_DATE_TIME_TAG: int = 0x0132
+EXIF_IFD_POINTER_TAG: int = 0x8769
+EXIF_DATE_TIME_ORIGINAL_TAG: int = 0x9003
+EXIF_SUB_SEC_TIME_ORIGINAL_TAG: int = 0x9291
+EXIF_ASCII_TYPE: int = 2
+# (Number of seconds between the MP4 epoch (1904-01-01) and the Unix epoch)
+MP4_EPOCH_OFFSET: int = 2082844800
+# (Number of threads reading the metadata of a batch of files, the reads being
+# small and I/O bound)
+MAX_WORKERS: int = 8
+# (Number of formatted seconds kept, files of a same burst sharing them)
+FORMAT_CACHE_SIZE: int = 4096
+
+
+def _ifd_entries(tiff: bytes, byte_order: str, offset: int) -> dict:
+    """
+    Reads an image file directory of a TIFF structure.
+
+    Args:
+        tiff (bytes): The TIFF structure (e.g. EXIF data).
+        byte_order (str): The byte order of the structure ("<" or ">").
+        offset (int): Offset of the IFD in the structure.
+
+    Returns:
+        entries (dict): Dict mapping the tags of the IFD to their (type, count,
+        raw 4-byte value or offset) tuples.
+    """
+
+    nb_entries = struct.unpack_from(byte_order + 'H', tiff, offset)[0]
+    entries = {}
+    for i in range(nb_entries):
+        tag, type, count = struct.unpack_from(byte_order + 'HHI', tiff, offset + 2 + 12 * i)
+        entries[tag] = (type, count, tiff[offset + 10 + 12 * i:offset + 14 + 12 * i])
+
+    return entries
+
+
+def _ascii_value(tiff: bytes, byte_order: str, entry: tuple) -> str:
+    """
+    Reads the value of an ASCII entry of an image file directory (stored in
+    the entry itself if it fits in 4 bytes, elsewhere in the structure
+    otherwise).
+
+    Args:
+        tiff (bytes): The TIFF structure (e.g. EXIF data).
+        byte_order (str): The byte order of the structure ("<" or ">").
+        entry (tuple): The (type, count, raw 4-byte value or offset) tuple of
+                       the entry (cf. "_ifd_entries").
+
+    Returns:
+        value (str): The value (None if the entry is not an ASCII one).
+    """
+
+    type, count, raw_value = entry
+    if type != EXIF_ASCII_TYPE:
+        return None
+    if count <= 4:
+        value = raw_value[:count]
+    else:
+        offset = struct.unpack(byte_order + 'I', raw_value)[0]
+        value = tiff[offset:offset + count]
+
+    return value.split(b'\0')[0].decode('ascii', 'replace').strip()
+
+
+def exif_timestamp(tiff: bytes) -> float:
+    """
+    Extracts the capture time from EXIF data (the original date and time,
+    falling back to the date and time of the last change of the image).
+
+    Args:
+        tiff (bytes): The EXIF data (i.e., a TIFF structure).
+
+    Returns:
+        timestamp (float): The capture time in [s] since the epoch (None if the
+                           data has no valid date).
+    """
+
+    byte_order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if byte_order is None:
+        return None
+    entries = _ifd_entries(tiff, byte_order, struct.unpack_from(byte_order + 'I', tiff, 4)[0])
+    if EXIF_IFD_POINTER_TAG in entries:
+        exif_offset = struct.unpack(byte_order + 'I', entries[EXIF_IFD_POINTER_TAG][2])[0]
+        entries.update(_ifd_entries(tiff, byte_order, exif_offset))
+    for date_tag in (EXIF_DATE_TIME_ORIGINAL_TAG, EXIF_DATE_TIME_TAG):
+        if date_tag not in entries:
+            continue
+        try:
+            # (EXIF dates are in the local time of the camera, e.g. "2021:05:01 12:30:45")
+            date = datetime.strptime(_ascii_value(tiff, byte_order, entries[date_tag]), '%Y:%m:%d %H:%M:%S')
+        except (TypeError, ValueError):
+            continue
+        sub_seconds = None
+        if date_tag == EXIF_DATE_TIME_ORIGINAL_TAG and EXIF_SUB_SEC_TIME_ORIGINAL_TAG in entries:
+            sub_seconds = _ascii_value(tiff, byte_order, entries[EXIF_SUB_SEC_TIME_ORIGINAL_TAG])
+        if sub_seconds and sub_seconds.isdigit():
+            date = date.replace(microsecond=int(sub_seconds[:6].ljust(6, '0')))
+        return date.timestamp()
+
+    return None
+
+
+def jpeg_timestamp(file_path: str) -> float:
+    """
+    Extracts the capture time of a JPEG image from its EXIF segment (without
+    reading further than the segments preceding the image data).
+
+    Args:
+        file_path (str): Path of the image.
+
+    Returns:
+        timestamp (float): The capture time in [s] since the epoch (None if the
+                           image has no EXIF date).
+    """
+
+    with open(file_path, 'rb') as f:
+        if f.read(2) != b'\xff\xd8':
+            return None
+        while True:
+            marker = f.read(2)
+            # (End of the segments: no marker, start of scan or end of image)
+            if len(marker) < 2 or marker[0] != 0xFF or marker[1] in (0xD9, 0xDA):
+                return None
+            length = struct.unpack('>H', f.read(2))[0]
+            if marker[1] == 0xE1:
+                segment = f.read(length - 2)
+                if segment.startswith(b'Exif\0\0'):
+                    return exif_timestamp(segment[6:])
+            else:
+                f.seek(length - 2, os.SEEK_CUR)
+
+
+def _find_atom(f, start: int, end: int, atom_type: bytes) -> tuple:
+    """
+    Finds an atom among the atoms stored between two offsets of an MP4 file.
+
+    Args:
+        f (file): The MP4 file, opened in binary mode.
+        start (int): Offset of the first atom.
+        end (int): Offset of the end of the last atom.
+        atom_type (bytes): The type of the atom (e.g. b"moov").
+
+    Returns:
+        (data_start, data_end) (tuple): Offsets of the content of the atom (None
+        if not found).
+    """
+
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        size, type = struct.unpack('>I4s', f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            # (Last atom, extending to the end)
+            size = end - position
+        if size < header_size:
+            return None
+        if type == atom_type:
+            return position + header_size, position + size
+        position += size
+
+    return None
+
+
+def mp4_timestamp(file_path: str) -> float:
+    """
+    Extracts the creation time of an MP4/MOV video from its "moov/mvhd" atom
+    (seeking from atom to atom, the "moov" atom being often at the end).
+
+    Args:
+        file_path (str): Path of the video.
+
+    Returns:
+        timestamp (float): The creation time in [s] since the epoch (None if the
+                           video has no creation time).
+    """
+
+    with open(file_path, 'rb') as f:
+        moov = _find_atom(f, 0, os.fstat(f.fileno()).st_size, b'moov')
+        if moov is None:
+            return None
+        mvhd = _find_atom(f, moov[0], moov[1], b'mvhd')
+        if mvhd is None:
+            return None
+        f.seek(mvhd[0])
+        version = f.read(4)[0]
+        creation_time = struct.unpack('>Q' if version == 1 else '>I', f.read(8 if version == 1 else 4))[0]
+
+    # (MP4 creation times are in UTC, and 0 when unknown)
+    return creation_time - MP4_EPOCH_OFFSET if creation_time > MP4_EPOCH_OFFSET else None
+
+
+def metadata_timestamp(file_path: str) -> float:
+    """
+    Extracts the capture time of a file from its metadata (EXIF for JPEG
+    images, "mvhd" atom for MP4/MOV videos).
+
+    Args:
+        file_path (str): Path of the file.
+
+    Returns:
+        timestamp (float): The capture time in [s] since the epoch (None if the
+                           file has no such metadata or cannot be read).
+    """
+
+    extension = os.path.splitext(file_path)[1].lower()
+    try:
+        if extension in JPEG_EXTENSIONS:
+            timestamp = jpeg_timestamp(file_path)
+        elif extension in MP4_EXTENSIONS:
+            timestamp = mp4_timestamp(file_path)
+        else:
+            return None
+        # (Discarding dates that cannot be represented)
+        if timestamp is not None:
+            time.localtime(timestamp)
+    except (OSError, IndexError, struct.error, ValueError, OverflowError):
+        return None
+
+    return timestamp
+
+
+def stat_timestamp(stat: os.stat_result) -> float:
+    """
+    - Gets the date when a file was created, falling back to when it was last
+      modified if that isn't possible.
+    - See http://stackoverflow.com/a/39501288/1709587 for explanation.
+
+    Args:
+        stat (os.stat_result): The stat result of the file.
+
+    Returns:
+        timestamp (float): The creation date in [s] since the epoch.
+    """
+
+    if SYSTEM == 'Windows':
+        return stat.st_ctime
+    # (We're probably on Linux if there is no birth time. No easy way to get
+    # creation dates here, so we'll settle for when its content was last modified)
+    return getattr(stat, 'st_birthtime', stat.st_mtime)
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def format_second(seconds: int) -> str:
+    """
+    Formats a whole number of seconds in my standard date format
+    YYYY-MM-DD_HH-MM-SS (the formatted seconds being cached).
+
+    Args:
+        seconds (int): The number of seconds since the epoch.
+
+    Returns:
+        date_formatted (str): The formatted date.
+    """
+
+    return time.strftime('%Y-%m-%d_%H-%M-%S', time.localtime(seconds))
+
+
+def format_timestamp(timestamp: float) -> str:
+    """
+    Formats a timestamp in my standard date format YYYY-MM-DD_HH-MM-SS (followed
+    by the microseconds, if any, as in "str(datetime)"), the formatted seconds
+    being cached.
+
+    Args:
+        timestamp (float): The timestamp in [s] since the epoch.
+
+    Returns:
+        date_formatted (str): The formatted date.
+    """
+
+    seconds = math.floor(timestamp)
+    # (Rounded as by "datetime.fromtimestamp")
+    microseconds = round((timestamp - seconds) * 1000000)
+    if microseconds == 1000000:
+        seconds, microseconds = seconds + 1, 0
+    date_formatted = format_second(seconds)
+
+    return date_formatted if microseconds == 0 else f'{date_formatted}.{microseconds:06d}'
+
+
+class CaptureDates:
+    """
+    Per-run cache of the capture dates of files, extracted in bulk from their
+    metadata (cf. "metadata_timestamp") and falling back to the stat results
+    of the listing.
+    """
+
+    def __init__(self, stat_function):
+        """
+        Args:
+            stat_function (callable): Function returning the (cached) stat
+                                      result of a file (None if unknown, the
+                                      file being then stat'ed).
+        """
+
+        self._stat_function = stat_function
+        # (Dict mapping every file path to its capture date in [s])
+        self._timestamps = {}
+
+    def prefetch(self, file_paths: list):
+        """
+        Extracts the capture dates of a batch of files at once.
+
+        Args:
+            file_paths (list): List containing the paths of the files.
+        """
+
+        file_paths = [path for path in dict.fromkeys(file_paths) if path not in self._timestamps]
+        if len(file_paths) == 0:
+            return
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(file_paths))) as executor:
+            for file_path, timestamp in zip(file_paths, executor.map(metadata_timestamp, file_paths)):
+                if timestamp is None:
+                    stat = self._stat_function(file_path)
+                    timestamp = stat_timestamp(stat if stat is not None else os.stat(file_path))
+                self._timestamps[file_path] = timestamp
+
+    def timestamp(self, file_path: str) -> float:
+        """
+        Args:
+            file_path (str): Path of the file.
+
+        Returns:
+            timestamp (float): The capture date in [s] since the epoch of a file.
+        """
+
+        if file_path not in self._timestamps:
+            self.prefetch([file_path])
+
+        return self._timestamps[file_path]
+
+    def formatted(self, file_path: str) -> str:
+        """
+        Args:
+            file_path (str): Path of the file.
+
+        Returns:
+            date_formatted (str): The capture date of a file, formatted as
+                                  YYYY-MM-DD_HH-MM-SS[.ffffff].
+        """
+
+        return format_timestamp(self.timestamp(file_path))
@@ -0,0 +1,267 @@
+# metrics.py
+
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from .catalog import default_catalog_path
+
+# Initializations
+# (Groups of the metrics: phases of the run (inventory, planning, execution,
+# etc.), sections and sub-steps of the program (e.g. "WhatsApp" and "WhatsApp
+# A.1") and operation kinds (e.g. "move"))
+PHASE_GROUP: str = 'phases'
+SECTION_GROUP: str = 'sections'
+STAGE_GROUP: str = 'stages'
+KIND_GROUP: str = 'operations'
+FIELDS: tuple = ('seconds', 'files', 'bytes', 'errors')
+
+
+def default_metrics_path() -> str:
+    """
+    Returns the platform specific folder in which the metrics reports are kept
+    (next to the catalog).
+
+    Returns:
+        metrics_path (str): Path of the metrics folder.
+    """
+
+    return os.path.join(os.path.dirname(default_catalog_path()), 'metrics')
+
+
+def section_of(stage: str) -> str:
+    """
+    Returns the section of a stage (e.g. "WhatsApp" for "WhatsApp A.1").
+
+    Args:
+        stage (str): The stage.
+
+    Returns:
+        section (str): The section.
+    """
+
+    return stage.split(' ')[0]
+
+
+class Metrics:
+    """
+    Duration, number of files, number of bytes and number of errors of every
+    phase, stage (i.e., section and sub-step of the program) and operation kind
+    of a run. A stage accounts for the planning of its operations and for their
+    share of the execution: operations executed one by one (or in the pipeline)
+    are timed individually, while the duration of the batches executed at once
+    (moves and conversions) is shared among their stages in proportion to their
+    bytes. Metrics can be recorded by several threads at once (e.g. processing
+    different roots), whose durations add up.
+    """
+
+    def __init__(self, live: bool = False):
+        """
+        Args:
+            live (bool): Whether to print a summary line whenever a phase,
+                         stage or batch of operations is recorded.
+        """
+
+        self.live = live
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        # (Dict mapping the groups to dicts mapping the names to the [seconds,
+        # files, bytes, errors] lists of the metrics)
+        self._entries = {group: {} for group in (PHASE_GROUP, STAGE_GROUP, KIND_GROUP)}
+        # (Set containing the (thread, group, name) tuples being timed, so that
+        # nested timings of a same entry are not counted twice)
+        self._timing = set()
+        # (Dict mapping the sections to the set of the original paths of the
+        # files handled by their operations, a file being usually handled by
+        # several steps of its section)
+        self._section_files = {}
+        self._lock = threading.Lock()
+
+    def add(self, group: str, name: str, seconds: float = 0, files: int = 0, nb_bytes: int = 0, errors: int = 0):
+        """
+        Adds to the metrics of an entry.
+
+        Args:
+            group (str): The group of the entry (e.g. "stages").
+            name (str): The name of the entry (e.g. "WhatsApp A.1").
+            seconds (float): Duration in [s] to add.
+            files (int): Number of files to add.
+            nb_bytes (int): Number of bytes to add.
+            errors (int): Number of errors to add.
+        """
+
+        with self._lock:
+            entry = self._entries[group].setdefault(name, [0.0, 0, 0, 0])
+            entry[0] += seconds
+            entry[1] += files
+            entry[2] += nb_bytes
+            entry[3] += errors
+
+    @contextmanager
+    def timed(self, group: str, name: str):
+        """
+        Adds the duration of the "with" block to the metrics of an entry.
+
+        Args:
+            group (str): The group of the entry.
+            name (str): The name of the entry.
+        """
+
+        key = (threading.get_ident(), group, name)
+        if key in self._timing:
+            yield
+            return
+        self._timing.add(key)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timing.discard(key)
+            self.add(group, name, time.perf_counter() - start)
+            if self.live:
+                self.print_entry(group, name)
+
+    def add_batch(self, kind: str, operations: list, seconds: float, failed_ids: set, op_seconds: dict = None):
+        """
+        Adds the metrics of a batch of operations of a same kind to their
+        stages and kind, the duration of the batch being shared among the
+        stages of its operations in proportion to their bytes (to their number
+        if they have no bytes) unless the operations have been timed
+        individually.
+
+        Args:
+            kind (str): The operation kind.
+            operations (list): List containing the operations (Operation).
+            seconds (float): Duration in [s] of the batch.
+            failed_ids (set): Set containing the ids of the failed operations.
+            op_seconds (dict): Dict mapping the ids of the operations to their
+                               duration in [s] (if timed individually).
+        """
+
+        nb_bytes = sum(op.nb_bytes for op in operations)
+        for op in operations:
+            if op_seconds is not None:
+                share = op_seconds.get(op.id, 0)
+            else:
+                share = seconds * (op.nb_bytes / nb_bytes if nb_bytes > 0 else 1 / len(operations))
+            self.add_operation(op, share, op.id in failed_ids, add_seconds_to_kind=False)
+        self.add(KIND_GROUP, kind, seconds)
+        if self.live:
+            self.print_entry(KIND_GROUP, kind)
+
+    def add_operation(self, op, seconds: float, failed: bool, add_seconds_to_kind: bool = True):
+        """
+        Adds the metrics of a single executed operation to its stage and kind.
+
+        Args:
+            op (Operation): The operation.
+            seconds (float): Duration in [s] of the operation.
+            failed (bool): Whether the operation failed (or has been skipped).
+            add_seconds_to_kind (bool): Whether to add the duration to the kind
+                                        too (operations executed concurrently
+                                        summing their durations).
+        """
+
+        nb_bytes = 0 if failed else op.nb_bytes
+        self.add(STAGE_GROUP, op.stage, seconds, 1, nb_bytes, int(failed))
+        self.add(KIND_GROUP, op.kind, seconds if add_seconds_to_kind else 0, 1, nb_bytes, int(failed))
+        with self._lock:
+            self._section_files.setdefault(section_of(op.stage), set()).add(op.origin)
+
+    def report(self) -> dict:
+        """
+        Returns:
+            report (dict): The metrics of the run, by group then by name (the
+            sections summing the durations, bytes and errors of their stages,
+            and counting the files handled by them).
+        """
+
+        sections = {}
+        for stage, entry in self._entries[STAGE_GROUP].items():
+            section = section_of(stage)
+            section_entry = sections.setdefault(section, [0.0, len(self._section_files.get(section, ())), 0, 0])
+            section_entry[0] += entry[0]
+            section_entry[2] += entry[2]
+            section_entry[3] += entry[3]
+        groups = {PHASE_GROUP: self._entries[PHASE_GROUP], SECTION_GROUP: sections,
+                  STAGE_GROUP: self._entries[STAGE_GROUP], KIND_GROUP: self._entries[KIND_GROUP]}
+
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - self._start, 6),
+            **{group: {name: dict(zip(FIELDS, [round(entry[0], 6)] + entry[1:]))
+                       for name, entry in sorted(entries.items())}
+               for group, entries in groups.items()},
+        }
+
+    def save(self, report_path: str) -> str:
+        """
+        Saves the report of the run as JSON.
+
+        Args:
+            report_path (str): Path of the report file, or of the folder in
+                               which it is saved under a name containing the
+                               start date of the run.
+
+        Returns:
+            report_path (str): Path of the saved report.
+        """
+
+        if not report_path.endswith('.json'):
+            os.makedirs(report_path, exist_ok=True)
+            report_path = os.path.join(report_path, f'metrics_{self.started.strftime("%Y-%m-%d_%H-%M-%S")}.json')
+        tmp_path = report_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, report_path)
+
+        return report_path
+
+    def format_entry(self, group: str, name: str) -> str:
+        """
+        Returns:
+            line (str): The human readable metrics of an entry.
+        """
+
+        seconds, files, nb_bytes, errors = self._entries[group][name]
+        line = f'{name}: {seconds:.3f}[s]'
+        if files > 0:
+            line += f', {files} file(s), {nb_bytes / 1e6:.2f}[MB]'
+            if seconds > 0:
+                line += f' ({files / seconds:.0f} file(s)/[s], {nb_bytes / 1e6 / seconds:.2f}[MB/s])'
+        if errors > 0:
+            line += f', {errors} error(s)'
+
+        return line
+
+    def print_entry(self, group: str, name: str):
+        print(f'\t⏱  {self.format_entry(group, name)}')
+
+    def summary(self) -> str:
+        """
+        Returns:
+            summary (str): The human readable metrics of the phases and of the
+            operation kinds of the run.
+        """
+
+        lines = [f' {self.format_entry(group, name)}'
+                 for group in (PHASE_GROUP, KIND_GROUP) for name in self._entries[group]]
+        lines.append(f' total: {time.perf_counter() - self._start:.3f}[s]')
+
+        return '\n'.join(lines)
+
+    def idle_sections(self, sections: list) -> list:
+        """
+        Args:
+            sections (list): List containing the names of the sections.
+
+        Returns:
+            idle_sections (list): List containing the names of the sections
+            that had no file to handle.
+        """
+
+        return [section for section in sections if len(self._section_files.get(section, ())) == 0]
@@ -0,0 +1,55 @@
+# names.py
+
+
+import os
+
+
+class NameIndex:
+    """
+    In-memory index of the file names of destination folders (e.g. "Camera
+    Uploads"), each folder being listed once with a single "os.scandir" the
+    first time a file is planned into it. Names are compared case-insensitively
+    (as on the default macOS filesystem) and every planned destination name is
+    claimed, so that collisions with existing files and between planned files
+    are detected in O(1) before any file is moved.
+    """
+
+    def __init__(self):
+        # (Dict mapping every indexed folder path to the set of its casefolded
+        # file names, existing and claimed)
+        self._names = {}
+
+    def _folder_names(self, folder_path: str) -> set:
+        folder_path = os.path.normpath(folder_path)
+        if folder_path not in self._names:
+            try:
+                with os.scandir(folder_path) as it:
+                    self._names[folder_path] = {entry.name.casefold() for entry in it}
+            except (FileNotFoundError, NotADirectoryError):
+                self._names[folder_path] = set()
+
+        return self._names[folder_path]
+
+    def claim(self, folder_path: str, file_name: str) -> str:
+        """
+        Claims a file name in a folder, adding a counter suffix to it (e.g.
+        "_1", "_2", etc., before the extension) if it is already taken.
+
+        Args:
+            folder_path (str): Path of the destination folder.
+            file_name (str): Name of the file to put in it.
+
+        Returns:
+            file_name (str): The claimed name (free in the folder).
+        """
+
+        names = self._folder_names(folder_path)
+        stem, extension = os.path.splitext(file_name)
+        claimed_name = file_name
+        counter = 1
+        while claimed_name.casefold() in names:
+            claimed_name = f'{stem}_{counter}{extension}'
+            counter += 1
+        names.add(claimed_name.casefold())
+
+        return claimed_name
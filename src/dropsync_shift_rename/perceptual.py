@@ -0,0 +1,315 @@
+# perceptual.py
+
+
+import importlib.util
+import math
+import os
+from functools import lru_cache
+from itertools import repeat
+
+from .conversion import run_in_pool
+from .dedupe import DROP_MODE
+
+# Initializations
+OFF_MODE: str = 'off'
+REPORT_MODE: str = 'report'
+NEAR_DUPLICATE_MODES: tuple = (OFF_MODE, REPORT_MODE, DROP_MODE)
+DHASH_ALGORITHM: str = 'dhash'
+PHASH_ALGORITHM: str = 'phash'
+IMAGE_EXTENSIONS: tuple = ('.jpg', '.jpeg', '.png', '.webp')
+# (Side of the grid of a 64-bit hash, and side of the thumbnail whose discrete
+# cosine transform gives the pHash)
+HASH_SIZE: int = 8
+PHASH_THUMBNAIL_SIZE: int = 32
+# (Maximum Hamming distance between the hashes of two near-duplicate images)
+MAX_DISTANCE: int = 4
+# (Number of images sent at once to the worker processes of an executor)
+HASH_CHUNK_SIZE: int = 16
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    # (Imported on first use only, NumPy taking a while to import)
+    try:
+        import numpy  # pip3 install numpy (optional, vectorised hashing and pHash)
+    except ImportError:
+        return None
+
+    return numpy
+
+
+def default_algorithm() -> str:
+    """
+    Returns:
+        algorithm (str): "phash" if NumPy is available, "dhash" otherwise
+        (without importing it).
+    """
+
+    return PHASH_ALGORITHM if importlib.util.find_spec('numpy') is not None else DHASH_ALGORITHM
+
+
+def _grayscale_thumbnail(file_path: str, size: tuple):
+    from PIL import Image  # pip3 install Pillow
+
+    with Image.open(file_path) as im:
+        # (Letting the JPEG decoder downscale the image by up to 8 while
+        # decoding, which is much faster than decoding it entirely)
+        im.draft('L', size)
+        return im.convert('L').resize(size, Image.BILINEAR)
+
+
+def _pack_bits(bits) -> int:
+    return int.from_bytes(_numpy().packbits(bits.flatten()).tobytes(), 'big')
+
+
+def dhash(file_path: str) -> int:
+    """
+    Computes the difference hash of an image: whether each pixel of a 9x8
+    grayscale thumbnail is brighter than its left neighbour.
+
+    Args:
+        file_path (str): Path of the image.
+
+    Returns:
+        hash (int): The 64-bit hash.
+    """
+
+    thumbnail = _grayscale_thumbnail(file_path, (HASH_SIZE + 1, HASH_SIZE))
+    np = _numpy()
+    if np is not None:
+        pixels = np.asarray(thumbnail, dtype=np.int16)
+        return _pack_bits(pixels[:, 1:] > pixels[:, :-1])
+    pixels = list(thumbnail.getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        for column in range(HASH_SIZE):
+            i = row * (HASH_SIZE + 1) + column
+            value = value << 1 | (pixels[i + 1] > pixels[i])
+
+    return value
+
+
+def _dct_matrix(size: int):
+    np = _numpy()
+    k = np.arange(size).reshape(-1, 1)
+    i = np.arange(size).reshape(1, -1)
+
+    return np.cos(math.pi * (2 * i + 1) * k / (2 * size))
+
+
+def phash(file_path: str) -> int:
+    """
+    Computes the perceptual hash of an image: whether each of the 8x8 lowest
+    frequencies of the discrete cosine transform of a 32x32 grayscale
+    thumbnail is above their median (NumPy needed).
+
+    Args:
+        file_path (str): Path of the image.
+
+    Returns:
+        hash (int): The 64-bit hash.
+    """
+
+    np = _numpy()
+    size = PHASH_THUMBNAIL_SIZE
+    pixels = np.asarray(_grayscale_thumbnail(file_path, (size, size)), dtype=np.float64)
+    dct = _dct_matrix(size)
+    frequencies = (dct @ pixels @ dct.T)[:HASH_SIZE, :HASH_SIZE]
+    # (Leaving the average (i.e., the DC coefficient) out of the median)
+    median = np.median(frequencies.flatten()[1:])
+
+    return _pack_bits(frequencies > median)
+
+
+HASH_FUNCTIONS: dict = {DHASH_ALGORITHM: dhash, PHASH_ALGORITHM: phash}
+
+
+def hash_image(file_path: str, algorithm: str) -> tuple:
+    """
+    Computes the perceptual hash of an image (run in the worker processes).
+
+    Returns:
+        (file_path, hash) (tuple): The path of the image and its hash (None if
+        the image cannot be decoded).
+    """
+
+    from PIL import Image  # pip3 install Pillow
+
+    try:
+        return file_path, HASH_FUNCTIONS[algorithm](file_path)
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        return file_path, None
+
+
+def hash_images(file_paths: list, algorithm: str, executor=None) -> list:
+    """
+    Computes the perceptual hashes of images in parallel, decoding being CPU
+    bound: in the given executor (e.g. the pool shared with the image
+    conversions), or in a pool of one process per core.
+
+    Args:
+        file_paths (list): List containing the paths of the images.
+        algorithm (str): The hash algorithm ("dhash" or "phash").
+        executor (Executor): The executor in which the images are hashed (if
+                             any).
+
+    Returns:
+        hashes (list): List containing the hashes of the images, in the same
+        order (None for the images that cannot be decoded).
+    """
+
+    unique_paths = list(dict.fromkeys(file_paths))
+    if executor is not None:
+        hashes = dict(executor.map(hash_image, unique_paths, repeat(algorithm), chunksize=HASH_CHUNK_SIZE))
+    else:
+        hashes = dict(run_in_pool(hash_image, [(file_path, algorithm) for file_path in unique_paths]))
+
+    return [hashes[file_path] for file_path in file_paths]
+
+
+class MultiIndex:
+    """
+    Multi-index hashing of 64-bit hashes for Hamming-distance queries: hashes
+    are split in "max_distance + 1" chunks, each indexed in its own table, and
+    two hashes within the maximum distance necessarily share at least one
+    identical chunk (pigeonhole principle). A lookup hence only compares the
+    hashes sharing a chunk with the query, i.e. a few dozen for a library of
+    200k images.
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE, nb_bits: int = HASH_SIZE * HASH_SIZE):
+        """
+        Args:
+            max_distance (int): Maximum Hamming distance of the lookups.
+            nb_bits (int): Number of bits of the hashes.
+        """
+
+        self.max_distance = max_distance
+        nb_chunks = max_distance + 1
+        self._chunks = []
+        shift = 0
+        for i in range(nb_chunks):
+            width = nb_bits // nb_chunks + (1 if i < nb_bits % nb_chunks else 0)
+            self._chunks.append((shift, (1 << width) - 1))
+            shift += width
+        # (One dict per chunk, mapping the chunk values to the lists of the
+        # (hash, key) tuples having that chunk value)
+        self._tables = [{} for _ in self._chunks]
+
+    def add(self, value: int, key: str):
+        """
+        Indexes a hash.
+
+        Args:
+            value (int): The hash.
+            key (str): The key of the hash (e.g. the path of the image).
+        """
+
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            table.setdefault(value >> shift & mask, []).append((value, key))
+
+    def search(self, value: int) -> list:
+        """
+        Finds the indexed hashes within the maximum distance of a hash.
+
+        Args:
+            value (int): The hash.
+
+        Returns:
+            matches (list): List containing the (distance, key) tuples of the
+            matching hashes, the closest first.
+        """
+
+        matches = {}
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            for indexed_value, key in table.get(value >> shift & mask, ()):
+                if key not in matches:
+                    distance = bin(indexed_value ^ value).count('1')
+                    if distance <= self.max_distance:
+                        matches[key] = distance
+
+        return sorted((distance, key) for key, distance in matches.items())
+
+
+class NearDuplicateFinder:
+    """
+    Finds the images of the library (i.e., the "Camera Uploads" folder) that
+    look like incoming images (e.g. recompressed copies of a same photo),
+    comparing their perceptual hashes through a multi-index. The hashes of the
+    library images are kept in the catalog (keyed by path, size and
+    modification date), so that only the new library images are hashed.
+    """
+
+    def __init__(self, library_path: str, catalog=None, algorithm: str = None,
+                 max_distance: int = MAX_DISTANCE, executor=None):
+        """
+        Args:
+            library_path (str): Path of the library folder.
+            catalog (Catalog): The catalog in which the hashes are kept (if any).
+            algorithm (str): The hash algorithm (cf. "default_algorithm" if None).
+            max_distance (int): Maximum Hamming distance between near duplicates.
+            executor (Executor): The executor in which the images are hashed
+                                 (cf. "hash_images").
+        """
+
+        self.library_path = os.path.normpath(library_path)
+        self.algorithm = algorithm if algorithm is not None else default_algorithm()
+        self.executor = executor
+        self.index = MultiIndex(max_distance)
+        stored_rows = catalog.perceptual_hashes(self.algorithm, self.library_path) if catalog is not None else {}
+        rows = {}
+        new_paths = []
+        try:
+            with os.scandir(self.library_path) as it:
+                for entry in it:
+                    if entry.name.startswith('.') or not entry.name.lower().endswith(IMAGE_EXTENSIONS) \
+                            or not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    row = stored_rows.get(entry.path)
+                    if row is None or tuple(row[:2]) != (stat.st_size, stat.st_mtime_ns):
+                        row = (stat.st_size, stat.st_mtime_ns, None)
+                        new_paths.append(entry.path)
+                    rows[entry.path] = row
+        except FileNotFoundError:
+            pass
+        # Hashing the library images that are new (or have changed) at once
+        for path, value in zip(new_paths, hash_images(new_paths, self.algorithm, self.executor)):
+            size, mtime_ns, _ = rows[path]
+            rows[path] = (size, mtime_ns, value)
+        if catalog is not None and (len(new_paths) > 0 or len(stored_rows) > len(rows)):
+            catalog.record_perceptual_hashes(self.algorithm, {path: rows[path] for path in new_paths},
+                                             [path for path in stored_rows if path not in rows])
+        for path, (_, _, value) in rows.items():
+            if value is not None:
+                self.index.add(value, path)
+
+    def find(self, file_pairs: list) -> dict:
+        """
+        Finds the near duplicates of incoming images, in order: each image
+        that has no near duplicate is added to the index under its planned
+        path, so that the next ones are compared with it too.
+
+        Args:
+            file_pairs (list): List containing the (path from which the content
+                               can be read, planned path in the library) tuples
+                               of the images.
+
+        Returns:
+            near_duplicates (dict): Dict mapping the planned paths of the near
+            duplicates to the (distance, path) tuples of their closest match.
+        """
+
+        near_duplicates = {}
+        file_pairs = [pair for pair in file_pairs if pair[0].lower().endswith(IMAGE_EXTENSIONS)]
+        values = hash_images([content_path for content_path, _ in file_pairs], self.algorithm, self.executor)
+        for (_, planned_path), value in zip(file_pairs, values):
+            if value is None:
+                continue
+            matches = self.index.search(value)
+            if len(matches) > 0:
+                near_duplicates[planned_path] = matches[0]
+            else:
+                self.index.add(value, planned_path)
+
+        return near_duplicates
@@ -0,0 +1,191 @@
+# pipeline.py
+
+
+import asyncio
+import time
+
+# Initializations
+SKIPPED_ERROR: str = 'skipped since an operation it depends on failed'
+# (Number of ready operations (or batches of operations) queued per worker,
+# beyond which the workers producing them wait)
+QUEUE_SIZE_PER_WORKER: int = 2
+
+
+def _reachable_kinds(operations: list) -> dict:
+    """
+    Computes which kinds of operations depend, directly or not, on each kind.
+
+    Args:
+        operations (list): List containing the operations (Operation).
+
+    Returns:
+        reachable_kinds (dict): Dict mapping the kinds of the operations to the
+        sets containing the kinds depending on them.
+    """
+
+    kinds = {op.id: op.kind for op in operations}
+    # (Dict mapping the kinds to the kinds depending directly on them)
+    edges = {kind: set() for kind in kinds.values()}
+    for op in operations:
+        for i in op.depends_on:
+            if i in kinds:
+                edges[kinds[i]].add(op.kind)
+    reachable_kinds = {}
+    for kind in edges:
+        reachable, stack = set(), [kind]
+        while len(stack) > 0:
+            for next_kind in edges[stack.pop()] - reachable:
+                reachable.add(next_kind)
+                stack.append(next_kind)
+        reachable_kinds[kind] = reachable
+
+    return reachable_kinds
+
+
+async def _run_pipeline(operations: list, handlers: dict, nb_workers: dict, on_done, batch_sizes: dict) -> dict:
+    ids = {op.id for op in operations}
+    # (Dict mapping the ids of the operations to the operations depending on them)
+    dependents = {op.id: [] for op in operations}
+    # (Dict mapping the ids of the operations to their number of dependencies
+    # that are not done yet)
+    nb_pending_dependencies = {}
+    for op in operations:
+        dependencies = {i for i in op.depends_on if i in ids}
+        nb_pending_dependencies[op.id] = len(dependencies)
+        for i in dependencies:
+            dependents[i].append(op)
+    # (Bounded queues, so that the workers producing ready operations wait for
+    # the workers consuming them instead of running ahead of them)
+    queues = {kind: asyncio.Queue(QUEUE_SIZE_PER_WORKER * nb_workers.get(kind, 1) * batch_sizes.get(kind, 1))
+              for kind in {op.kind for op in operations}}
+    reachable_kinds = _reachable_kinds(operations)
+    # (Operations waiting for room in the queue of a kind depending on the kind
+    # of their producer, cf. "enqueue")
+    pending_puts = set()
+    errors = {}
+    finished_ids = set()
+    all_finished = asyncio.Event()
+
+    def finish(op, seconds: float, error: str, ready: list):
+        finished_ids.add(op.id)
+        if error is not None:
+            errors[op.id] = error
+        if on_done is not None:
+            on_done(op, seconds, error)
+        for dependent in dependents[op.id]:
+            if dependent.id in finished_ids:
+                continue
+            if error is not None:
+                # (Skipping the operations depending on a failed operation, and
+                # in turn those depending on them)
+                finish(dependent, 0, SKIPPED_ERROR, ready)
+                continue
+            nb_pending_dependencies[dependent.id] -= 1
+            if nb_pending_dependencies[dependent.id] == 0:
+                ready.append(dependent)
+        if len(finished_ids) == len(operations):
+            all_finished.set()
+
+    async def enqueue(kind: str, ready: list):
+        for op in ready:
+            if kind is not None and kind in reachable_kinds[op.kind] | {op.kind} and queues[op.kind].full():
+                # (Not waiting when the consumers may themselves wait for the
+                # producer, which would be a deadlock)
+                put = asyncio.ensure_future(queues[op.kind].put(op))
+                pending_puts.add(put)
+                put.add_done_callback(pending_puts.discard)
+            else:
+                await queues[op.kind].put(op)
+
+    async def worker(kind: str):
+        queue = queues[kind]
+        while True:
+            op = await queue.get()
+            if op.id in finished_ids:
+                continue
+            start = time.perf_counter()
+            ready = []
+            if kind not in batch_sizes:
+                try:
+                    error = await handlers[kind](op)
+                except OSError as e:
+                    error = str(e)
+                finish(op, time.perf_counter() - start, error, ready)
+                await enqueue(kind, ready)
+                continue
+            # Taking the other ready operations of the kind along (sharing them
+            # with the other workers of the kind)
+            batch = [op]
+            batch_size = min(batch_sizes[kind], -(-(queue.qsize() + 1) // nb_workers.get(kind, 1)))
+            while len(batch) < batch_size and not queue.empty():
+                op = queue.get_nowait()
+                if op.id not in finished_ids:
+                    batch.append(op)
+            try:
+                batch_errors = await handlers[kind](batch)
+            except OSError as e:
+                batch_errors = {op.id: str(e) for op in batch}
+            seconds = (time.perf_counter() - start) / len(batch)
+            for op in batch:
+                finish(op, seconds, batch_errors.get(op.id), ready)
+            await enqueue(kind, ready)
+
+    workers = [asyncio.ensure_future(worker(kind)) for kind in queues for _ in range(nb_workers.get(kind, 1))]
+    # (The operations ready from the start being queued as room is made)
+    feeder = asyncio.ensure_future(enqueue(None, [op for op in operations if nb_pending_dependencies[op.id] == 0]))
+    waiter = asyncio.ensure_future(all_finished.wait())
+    try:
+        if len(operations) > 0:
+            # (A worker only stops on an unexpected error, which is raised)
+            await asyncio.wait([waiter, *workers], return_when=asyncio.FIRST_COMPLETED)
+            for task in workers:
+                if task.done():
+                    task.result()
+    finally:
+        tasks = [waiter, feeder, *workers, *pending_puts]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return errors
+
+
+def run_pipeline(operations: list, handlers: dict, nb_workers: dict = None, on_done=None,
+                 batch_sizes: dict = None) -> dict:
+    """
+    Executes operations as a pipeline: every operation is queued for the
+    workers of its kind as soon as all the operations it depends on are done,
+    so that the stages overlap (e.g. the first converted files are moved while
+    the next ones are still being converted) instead of running one after
+    another. The queue of every kind is bounded, so that the workers producing
+    ready operations wait for the workers consuming them (unless the consumers
+    may depend on them in turn). The operations depending on a failed operation
+    are skipped.
+
+    Args:
+        operations (list): List containing the operations (Operation), each
+                           depending only on operations of the list or on
+                           operations already executed.
+        handlers (dict): Dict mapping the operation kinds to the coroutine
+                         functions executing an operation of that kind (work
+                         blocking for a while being offloaded to executors),
+                         which return None on success and an error message
+                         otherwise (raised OSErrors being caught too).
+        nb_workers (dict): Dict mapping the operation kinds to their number of
+                           concurrent operations (1 for the kinds left out).
+        on_done (callable): Function called with each operation, its duration
+                            in [s] and its error (None on success) once it is
+                            finished.
+        batch_sizes (dict): Dict mapping the operation kinds whose handlers
+                            execute batches of operations (taking the list of
+                            the operations and returning a dict mapping the ids
+                            of the failed ones to their errors) to the maximum
+                            number of operations per batch (the ready
+                            operations being shared among the workers).
+
+    Returns:
+        errors (dict): Dict mapping the ids of the failed and skipped
+        operations to their errors.
+    """
+
+    return asyncio.run(_run_pipeline(list(operations), handlers, nb_workers or {}, on_done, batch_sizes or {}))
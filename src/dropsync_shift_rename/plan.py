@@ -0,0 +1,218 @@
+# plan.py
+
+
+import os
+from typing import NamedTuple
+
+from .journal import DELETE_OP, LINK_OP, MOVE_OP, RENAME_OP, RMDIR_OP
+
+# Initializations
+CONVERT_PNG_KIND: str = 'convert_png'
+CONVERT_MP3_KIND: str = 'convert_mp3'
+# (Copy of the MP3 audio stream of a file into an ".mp3" file, without re-encoding it)
+REMUX_MP3_KIND: str = 'remux_mp3'
+# (Order in which the batches of operations of a same level are executed)
+KIND_ORDER: tuple = (DELETE_OP, RENAME_OP, CONVERT_PNG_KIND, CONVERT_MP3_KIND, REMUX_MP3_KIND, MOVE_OP, LINK_OP,
+                     RMDIR_OP)
+# (Operation kinds whose destination is a new version of their source)
+PRODUCING_KINDS: tuple = (RENAME_OP, MOVE_OP, CONVERT_PNG_KIND, CONVERT_MP3_KIND, REMUX_MP3_KIND)
+CONVERTING_KINDS: tuple = (CONVERT_PNG_KIND, CONVERT_MP3_KIND, REMUX_MP3_KIND)
+
+
+class Operation(NamedTuple):
+    """
+    Single planned operation on the directory in which media files are synced.
+    """
+
+    id: int
+    kind: str
+    src: str
+    dst: str
+    # (Section and step of the program that planned the operation, e.g. "WhatsApp A.1")
+    stage: str
+    # (Ids of the operations to execute successfully beforehand)
+    depends_on: tuple
+    # (Estimated number of bytes handled by the operation)
+    nb_bytes: int
+    # (Original path of the file the operation applies to)
+    origin: str
+
+
+class Plan(NamedTuple):
+    """
+    Immutable plan of all the operations of a run, in the order in which they
+    have been planned.
+    """
+
+    operations: tuple
+
+    @property
+    def nb_bytes(self) -> int:
+        return sum(op.nb_bytes for op in self.operations)
+
+
+class PlanBuilder:
+    """
+    Builds a plan, keeping track of the planned path of every file (i.e., the
+    path it will have once the operations planned so far are executed) so that
+    operations on a file automatically depend on the operation producing it,
+    and that the original path (hence the dates and size) of any planned path
+    can be retrieved.
+    """
+
+    def __init__(self, size_function):
+        """
+        Args:
+            size_function (callable): Function returning the size in bytes of
+                                      an original path (file or folder).
+        """
+
+        self._size_function = size_function
+        self._operations = []
+        # (Dict mapping every planned path to the original path of the file)
+        self._origins = {}
+        # (Dict mapping every planned path to the id of the operation producing it)
+        self._producers = {}
+        # (Set containing the planned paths whose content differs from the one
+        # of their original path, i.e. conversion outputs)
+        self._converted_paths = set()
+
+    def origin(self, path: str) -> str:
+        """
+        Returns the original path of a planned path.
+
+        Args:
+            path (str): The planned path (or an original path).
+
+        Returns:
+            origin (str): The original path.
+        """
+
+        return self._origins.get(path, path)
+
+    def converted(self, path: str) -> bool:
+        """
+        Tells whether a planned path is (a new version of) a conversion output,
+        whose content hence differs from the one of its original path.
+
+        Args:
+            path (str): The planned path.
+
+        Returns:
+            converted (bool): Whether the path comes from a conversion.
+        """
+
+        return path in self._converted_paths
+
+    def add(self, kind: str, src: str, dst: str = None, stage: str = '', depends_on: tuple = ()) -> Operation:
+        """
+        Plans an operation.
+
+        Args:
+            kind (str): The operation kind ("rename", "move", "delete", "link",
+                        "rmdir", "convert_png", "convert_mp3" or "remux_mp3").
+            src (str): The (planned) source path of the operation.
+            dst (str): The destination path of the operation (if any).
+            stage (str): The section and step of the program planning it.
+            depends_on (tuple): Ids of additional operations to execute
+                                successfully beforehand.
+
+        Returns:
+            operation (Operation): The planned operation.
+        """
+
+        depends_on = tuple(depends_on)
+        if src in self._producers:
+            depends_on = (self._producers[src],) + depends_on
+        origin = self.origin(src)
+        operation = Operation(len(self._operations), kind, src, dst, stage, depends_on,
+                              self._size_function(origin), origin)
+        self._operations.append(operation)
+        if kind in PRODUCING_KINDS:
+            self._origins[dst] = origin
+            self._producers[dst] = operation.id
+            if kind in CONVERTING_KINDS or src in self._converted_paths:
+                self._converted_paths.add(dst)
+
+        return operation
+
+    def consumers(self, dir_path: str) -> tuple:
+        """
+        Returns the ids of the operations planned so far on the content of a
+        folder (e.g. the operations to execute before removing it).
+
+        Args:
+            dir_path (str): Path of the folder.
+
+        Returns:
+            ids (tuple): The ids of the operations.
+        """
+
+        prefix = os.path.join(dir_path, '')
+
+        return tuple(op.id for op in self._operations if op.src.startswith(prefix))
+
+    def build(self) -> Plan:
+        """
+        Returns:
+            plan (Plan): The plan of the operations planned so far.
+        """
+
+        return Plan(tuple(self._operations))
+
+
+def execution_batches(plan: Plan) -> list:
+    """
+    Groups the operations of a plan in batches that can each be executed at
+    once (e.g. all the conversions in a single pool, all the moves in a single
+    transfer): an operation runs in the batch following the last batch of the
+    operations it depends on, and the operations of a same level are batched
+    by kind.
+
+    Args:
+        plan (Plan): The plan.
+
+    Returns:
+        batches (list): List containing the (kind, list of operations) tuples
+        in execution order.
+    """
+
+    levels = []
+    for op in plan.operations:
+        # (Operations only depend on operations planned before them)
+        levels.append(1 + max((levels[i] for i in op.depends_on), default=-1))
+    batches = []
+    for level in range(max(levels, default=-1) + 1):
+        for kind in KIND_ORDER:
+            operations = [op for op, op_level in zip(plan.operations, levels)
+                          if op_level == level and op.kind == kind]
+            if len(operations) > 0:
+                batches.append((kind, operations))
+
+    return batches
+
+
+def format_plan(plan: Plan) -> str:
+    """
+    Formats a plan for a dry run: one line per operation, followed by the
+    number of operations and estimated bytes of each kind.
+
+    Args:
+        plan (Plan): The plan.
+
+    Returns:
+        text (str): The formatted plan.
+    """
+
+    lines = []
+    for op in plan.operations:
+        target = f' → {op.dst}' if op.dst is not None else ''
+        lines.append(f' [{op.stage}] {op.kind} {op.src}{target} ({op.nb_bytes / 1e6:.2f}[MB])')
+    lines.append(f'{len(plan.operations)} operation(s) planned, {plan.nb_bytes / 1e6:.2f}[MB] in total:')
+    for kind in KIND_ORDER:
+        operations = [op for op in plan.operations if op.kind == kind]
+        if len(operations) > 0:
+            lines.append(f' - {kind}: {len(operations)} operation(s), '
+                         f'{sum(op.nb_bytes for op in operations) / 1e6:.2f}[MB]')
+
+    return '\n'.join(lines)
@@ -0,0 +1,138 @@
+# probe.py
+
+
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Initializations
+MP3_CODEC: str = 'mp3'
+MP3_CONTAINER: str = 'mp3'
+# (Maximum duration in [s] of a single ffprobe run)
+FFPROBE_TIMEOUT: float = 30
+# (Number of ffprobe processes run at once)
+MAX_WORKERS: int = 8
+
+
+def probe_audio(file_path: str, timeout: float = FFPROBE_TIMEOUT) -> tuple:
+    """
+    Reads the container and the codec of the (first) audio stream of a file
+    with ffprobe.
+
+    Args:
+        file_path (str): Path of the file.
+        timeout (float): Maximum duration in [s] of ffprobe.
+
+    Returns:
+        (container, codec) (tuple): The container (e.g. "mp3", "ogg" or
+        "mov,mp4,m4a,3gp,3g2,mj2") and the audio codec (e.g. "mp3", "opus" or
+        "aac") of the file, each being None if unknown (e.g. for a corrupt
+        file).
+    """
+
+    command = ['ffprobe', '-v', 'error', '-show_entries', 'format=format_name:stream=codec_type,codec_name',
+               '-of', 'json', file_path]
+    try:
+        completed_process = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                           stderr=subprocess.DEVNULL, timeout=timeout)
+        info = json.loads(completed_process.stdout or b'{}')
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None, None
+    container = info.get('format', {}).get('format_name')
+    codec = next((stream.get('codec_name') for stream in info.get('streams', [])
+                  if stream.get('codec_type') == 'audio'), None)
+
+    return container, codec
+
+
+class AudioProbes:
+    """
+    Cache of the containers and audio codecs of files (cf. "probe_audio"),
+    probed in bulk and kept in the catalog (keyed by path, size and
+    modification date), so that a file is probed at most once as long as it
+    is unchanged. Files are not probed at all if ffprobe is not installed.
+    """
+
+    def __init__(self, stat_function, catalog=None):
+        """
+        Args:
+            stat_function (callable): Function returning the (cached) stat
+                                      result of a file (None if unknown, the
+                                      file being then stat'ed).
+            catalog (Catalog): The catalog in which the probes are kept (if any).
+        """
+
+        self._stat_function = stat_function
+        self._catalog = catalog
+        self.available = shutil.which('ffprobe') is not None
+        # (Dict mapping the (path, size, modification date in [ns]) keys of the
+        # files to their (container, codec) tuples)
+        self._probes = {}
+        # (Dict mapping the keys of the files probed by this run to their probes)
+        self._new_probes = {}
+
+    def _key(self, file_path: str) -> tuple:
+        stat = self._stat_function(file_path)
+        if stat is None:
+            stat = os.stat(file_path)
+
+        return file_path, stat.st_size, stat.st_mtime_ns
+
+    def prefetch(self, file_paths: list):
+        """
+        Probes a batch of files at once (the files probed by a previous run
+        being looked up in the catalog).
+
+        Args:
+            file_paths (list): List containing the paths of the files.
+        """
+
+        if not self.available:
+            return
+        keys = []
+        for file_path in dict.fromkeys(file_paths):
+            try:
+                key = self._key(file_path)
+            except OSError:
+                continue
+            if key not in self._probes:
+                keys.append(key)
+        if self._catalog is not None and len(keys) > 0:
+            self._probes.update(self._catalog.audio_probes(keys))
+            keys = [key for key in keys if key not in self._probes]
+        if len(keys) == 0:
+            return
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(keys))) as executor:
+            for key, probe in zip(keys, executor.map(probe_audio, [key[0] for key in keys])):
+                self._probes[key] = probe
+                self._new_probes[key] = probe
+
+    def probe(self, file_path: str) -> tuple:
+        """
+        Returns:
+            (container, codec) (tuple): The container and the audio codec of a
+            file (None if unknown).
+        """
+
+        if not self.available:
+            return None, None
+        try:
+            key = self._key(file_path)
+        except OSError:
+            return None, None
+        if key not in self._probes:
+            self.prefetch([file_path])
+
+        return self._probes.get(key, (None, None))
+
+    def save(self):
+        """
+        Keeps the probes made so far in the catalog (if any).
+        """
+
+        if self._catalog is None or len(self._new_probes) == 0:
+            return
+        self._catalog.record_audio_probes(self._new_probes)
+        self._new_probes = {}
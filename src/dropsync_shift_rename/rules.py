@@ -0,0 +1,135 @@
+# rules.py
+
+
+import os
+import re
+from string import Formatter
+from typing import NamedTuple
+
+# Initializations
+# (Fields available to the templates in addition to the named groups of the
+# patterns: the date of the file in its full, second and day precisions, the
+# name of the folder holding the file and the name of the file itself)
+DATE_FIELD: str = 'date'
+DATE_SECONDS_FIELD: str = 'date_seconds'
+DAY_FIELD: str = 'day'
+FOLDER_FIELD: str = 'folder'
+NAME_FIELD: str = 'name'
+
+
+class RenamePlan(NamedTuple):
+    """
+    New names computed by a rename rule for a listing of files.
+    """
+
+    # (List containing the (current path, new path) tuples of the files to rename)
+    renames: list
+    # (List containing the paths of the files matching the skip pattern of the rule)
+    skipped: list
+    # (List containing the paths of the files matching none of the patterns of the rule)
+    rejected: list
+
+
+class RenameRule:
+    """
+    Declarative rename rule of a source (i.e., an app): a precompiled pattern
+    that the names of the files of the source must match, and a template (in
+    "str.format" syntax) of their new names, filled with the named groups of
+    the pattern and the fields above. Files whose name matches the optional
+    skip pattern (e.g. files already renamed) are left as they are.
+    """
+
+    def __init__(self, source: str, pattern: str, template: str, skip_pattern: str = None):
+        """
+        Args:
+            source (str): The type of platform the files are coming from (e.g.
+                          'WhatsApp', 'Telegram', etc.).
+            pattern (str): Regular expression that the file names must match.
+            template (str): Template of the new file names.
+            skip_pattern (str): Regular expression of the file names to leave
+                                as they are (if any).
+        """
+
+        self.source = source
+        self.pattern = re.compile(pattern)
+        self.template = template
+        self.skip_pattern = re.compile(skip_pattern) if skip_pattern is not None else None
+        # (Computing the date fields only when the template uses them)
+        fields = {field for _, field, _, _ in Formatter().parse(template) if field}
+        self._needs_date = len(fields & {DATE_FIELD, DATE_SECONDS_FIELD, DAY_FIELD}) > 0
+
+    def plan(self, list_of_file_paths: list, date_function) -> RenamePlan:
+        """
+        Computes the new names of a listing of files in one batch (each file
+        staying in its folder).
+
+        Args:
+            list_of_file_paths (list): List containing the paths of the files.
+            date_function (callable): Function returning the date of a file,
+                                      formatted as YYYY-MM-DD_HH-MM-SS[.ffffff].
+
+        Returns:
+            rename_plan (RenamePlan): The new names, skipped and rejected files.
+        """
+
+        renames, skipped, rejected = [], [], []
+        for file_path in list_of_file_paths:
+            folder_path, file_name = os.path.split(file_path)
+            if self.skip_pattern is not None and self.skip_pattern.match(file_name):
+                skipped.append(file_path)
+                continue
+            match = self.pattern.fullmatch(file_name)
+            if match is None:
+                rejected.append(file_path)
+                continue
+            fields = match.groupdict()
+            fields[FOLDER_FIELD] = os.path.basename(folder_path)
+            fields[NAME_FIELD] = file_name
+            if self._needs_date:
+                date = date_function(file_path)
+                fields[DATE_FIELD] = date
+                fields[DATE_SECONDS_FIELD] = date.split('.')[0]
+                fields[DAY_FIELD] = date.split('_')[0]
+            renames.append((file_path, os.path.join(folder_path, self.template.format(**fields))))
+
+        return RenamePlan(renames, skipped, rejected)
+
+
+# Registry of the rename rules, by source
+RENAME_RULES: dict = {}
+
+
+def register_rule(rule: RenameRule):
+    """
+    Registers the rename rule of a source (replacing any previous one).
+
+    Args:
+        rule (RenameRule): The rename rule.
+    """
+
+    RENAME_RULES[rule.source] = rule
+
+
+# "IMG-20210501-WA0001.jpg" → "2021-05-01_12-30-45_WhatsApp_IMG_0001.jpg"
+# (Files whose name starts with a digit have already been renamed)
+register_rule(RenameRule('WhatsApp',
+                         r'(?P<category>[^-]+)-[^-]*-WA(?P<number>[^-]+)',
+                         '{date}_WhatsApp_{category}_{number}',
+                         skip_pattern=r'\d'))
+# "5012345678_123456.jpg" → "2021-05-01_12-30-45_Telegram_123456.jpg"
+register_rule(RenameRule('Telegram',
+                         r'[^_]*_(?P<number>[^_]+)',
+                         '{date}_Telegram_{number}'))
+# "Snapchat-123456789.jpg" → "2021-05-01_12-30-45_Snapchat_6789.jpg"
+register_rule(RenameRule('Snapchat',
+                         r'[^.]*(?P<number>[^.]{4})\.(?P<extension>[^.]+)',
+                         '{date}_Snapchat_{number}.{extension}'))
+# "Song.mp3" → "2021-05-01_12-30-45_Song.mp3"
+register_rule(RenameRule('VidMate', r'.+', '{date_seconds}_{name}'))
+register_rule(RenameRule('MusicDownload', r'.+', '{date_seconds}_{name}'))
+# "<account>/<account>-1.jpg" → "<account>/2021-05-01_<account>_1.jpg"
+register_rule(RenameRule('Instander',
+                         r'(?:.*-)?(?P<number>[^-]+)',
+                         '{day}_{folder}_{number}'))
+# "<account>/Story.mp4" → "<account>/2021-05-01_<account>_Story.mp4"
+register_rule(RenameRule('StorySaver', r'.+', '{day}_{folder}_{name}'))
@@ -0,0 +1,2145 @@
+# shift_rename.py
+
+
+import asyncio
+import os
+import queue
+import shutil
+import threading
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from functools import partial, wraps
+from typing import NamedTuple
+
+from .cache import ConversionCache, default_cache_path
+from .catalog import (DELETED_STATUS, DONE_STATUS, FAILED_STATUS,
+                      HANDLED_STATUSES, REJECTED_STATUS, Catalog,
+                      default_catalog_path)
+from .checkpoint import Checkpoints
+from .config import Root, default_config_path, load_config
+from .conversion import (AUDIO_BATCH_SIZE, cached_batch_conversion,
+                         cached_conversion, conversion_job,
+                         convert_audio_files, convert_webp_images,
+                         remux_audio_files)
+from .dedupe import (DROP_MODE, DUPLICATE_MODES, HARDLINK_MODE, KEEP_MODE,
+                     DuplicateFinder)
+from .inventory import Inventory
+from .journal import (CREATE_OP, DELETE_OP, LINK_OP, MOVE_OP, RENAME_OP,
+                      RMDIR_OP, SNAPSHOT_OP, WriteAheadLog, incomplete_operations,
+                      perform_operation, rebuild_layout, resume_incomplete,
+                      undo_incomplete)
+from .metadata import CaptureDates
+from .metrics import (KIND_GROUP, PHASE_GROUP, STAGE_GROUP, Metrics,
+                      default_metrics_path)
+from .names import NameIndex
+from .perceptual import (NEAR_DUPLICATE_MODES, OFF_MODE, NearDuplicateFinder,
+                         default_algorithm)
+from .pipeline import SKIPPED_ERROR, run_pipeline
+from .plan import (CONVERT_MP3_KIND, CONVERT_PNG_KIND, KIND_ORDER,
+                   REMUX_MP3_KIND, Plan, PlanBuilder, execution_batches,
+                   format_plan)
+from .probe import MP3_CODEC, MP3_CONTAINER, AudioProbes
+from .rules import RENAME_RULES
+from .snapshot import SNAPSHOT_MODES, snapshot_dir
+from .transfer import (TRANSFER_BATCH_FILES, TransferStats, iter_transfers,
+                       move_file)
+from .watch import (DEBOUNCE_DELAY, POLL_INTERVAL, changed_folders,
+                    debounced_changes, open_watcher)
+
+# ====================
+DEBUG_MODE_ON = False
+# ====================
+
+
+# Required packages
+
+
+# Initializations
+DASH_SIGN: str = '-'
+POINT_SIGN: str = '.'
+SLASH_SIGN: str = '/'
+UNDERSCORE_SIGN: str = '_'
+SENT_FOLDER: str = 'Sent'
+PRIVATE_FOLDER: str = 'Private'
+WHATSAPP_TYPE: str = 'WhatsApp'
+TELEGRAM_TYPE: str = 'Telegram'
+SNAPCHAT_TYPE: str = 'Snapchat'
+MUSIC_DOWNLOAD_TYPE: str = 'MusicDownload'
+VIDMATE_TYPE: str = 'VidMate'
+INSTANDER_TYPE: str = 'Instander'
+STORYSAVER_TYPE: str = 'StorySaver'
+WHATSAPP_SHORT: str = 'WA'
+DROPSYNCFILES_DIRECTORY_PATH: str = '/Users/anthony/Dropbox/DropsyncFiles/Media_UnidirectionalSync_AndroidToMac'
+CAMERA_UPLOADS_DIRECTORY_PATH: str = '/Users/anthony/Dropbox/Camera Uploads'
+# (Configuration file listing the roots to process, i.e., the directories in
+# which the media files of several devices are synced, the above directory
+# being processed alone if there is none)
+CONFIG_PATH: str = default_config_path()
+ROOTS: list = None
+WAL_PATH: str = DROPSYNCFILES_DIRECTORY_PATH + '_WAL.jsonl'
+TRASH_PATH: str = DROPSYNCFILES_DIRECTORY_PATH + '_Trash'
+WAL: WriteAheadLog = None
+# (Checkpoints of the sections done by the run, so that an
+# interrupted run can be resumed from its first incomplete section)
+CHECKPOINT_PATH: str = DROPSYNCFILES_DIRECTORY_PATH + '_Checkpoints.json'
+CHECKPOINTS: Checkpoints = None
+CONVERSION_CACHE_PATH: str = default_cache_path()
+CONVERSION_CACHE_MAX_MB: int = 2000
+CONVERSION_CACHE: ConversionCache = None
+FFMPEG_BATCH_SIZE: int = AUDIO_BATCH_SIZE
+CATALOG_PATH: str = default_catalog_path()
+CATALOG: Catalog = None
+DUPLICATES_MODE: str = DROP_MODE
+NEAR_DUPLICATES_MODE: str = OFF_MODE
+METRICS_PATH: str = default_metrics_path()
+# (Metrics of the run, started by "main" or by "process_roots")
+METRICS: Metrics = None
+DRY_RUN: bool = False
+SEQUENTIAL: bool = False
+# (Number of concurrent conversions (of each kind) and moves of the pipeline)
+PIPELINE_CONVERSION_WORKERS: int = os.cpu_count() or 1
+PIPELINE_MOVE_WORKERS: int = 4
+# (Number of threads performing the renames, deletions and records of the
+# write-ahead log of the pipeline)
+PIPELINE_IO_WORKERS: int = 4
+# (Maximum number of conversions of each kind (images, audio files) running at
+# once for all the roots processed concurrently, whose pools are shared)
+MAX_CONVERSION_WORKERS: int = os.cpu_count() or 1
+CONVERSION_EXECUTORS: dict = None
+# (Lock serializing the planning of the roots processed concurrently, which
+# share the indexes of the destination folders and the catalog, and the
+# catalog records)
+PLANNING_LOCK: threading.Lock = threading.Lock()
+WATCH: bool = False
+WATCH_DEBOUNCE: float = DEBOUNCE_DELAY
+WATCH_POLL_INTERVAL: float = POLL_INTERVAL
+
+
+# Planning context
+
+class SourceFolders(NamedTuple):
+    """
+    Paths of the folders of the sources of a root (e.g. "WhatsApp Audio") and
+    of its destination folder (cf. "source_folders").
+    """
+
+    camera_uploads: str
+    whatsapp_animated_gifs: str
+    whatsapp_audio: str
+    whatsapp_images: str
+    whatsapp_stickers: str
+    whatsapp_videos: str
+    whatsapp_voice_notes: str
+    whatsapp_video_notes: str
+    # (Folders of the "WhatsApp" folder that are emptied)
+    whatsapp_untargeted: list
+    telegram: str
+    telegram_images: str
+    snapchat: str
+    music_download: str
+    vidmate: str
+    vidmate_download: str
+    instander: str
+    storysaver: str
+
+
+class PlanningContext(NamedTuple):
+    """
+    State of the planning of a source (i.e., top-level folder of a root),
+    passed to the planning functions: the listing of the source, the caches
+    of its files and the plan being built, along with the indexes of the
+    destination folders shared by all the sources of the run.
+    """
+
+    root: Root
+    folders: SourceFolders
+    inventory: Inventory
+    capture_dates: CaptureDates
+    audio_probes: AudioProbes
+    builder: PlanBuilder
+    destination_names: NameIndex
+    duplicate_finder: DuplicateFinder = None
+    near_duplicate_finder: NearDuplicateFinder = None
+
+
+# Helper functions
+
+def perform(op: str, src: str, dst: str = None):
+    """
+    Performs a rename, move, delete or rmdir operation through the write-ahead
+    log of the current run (if any).
+
+    Args:
+        op (str): The operation type ("rename", "move", "delete" or "rmdir").
+        src (str): The source path of the operation.
+        dst (str): The destination path of the operation (if any).
+    """
+
+    if WAL is not None:
+        WAL.execute(op, src, dst)
+    else:
+        perform_operation(op, src, dst)
+
+
+@contextmanager
+def transaction(name: str):
+    """
+    Groups the operations performed in the "with" block in a transaction of the
+    write-ahead log of the current run (if any).
+
+    Args:
+        name (str): A human readable name for the transaction.
+    """
+
+    if WAL is None:
+        yield
+        return
+    with WAL.transaction(name):
+        yield
+
+
+def timed_stage(function):
+    """
+    Decorates a planning function (whose last argument is the stage planning
+    the operations) so that its duration is added to the metrics of the stage.
+
+    Args:
+        function (callable): The planning function.
+
+    Returns:
+        wrapper (callable): The decorated function.
+    """
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        stage = kwargs['stage'] if 'stage' in kwargs else args[-1]
+        with METRICS.timed(STAGE_GROUP, stage):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def colored(text: str, color: str, attrs: list = None) -> str:
+    """
+    Colors a text for the terminal (termcolor being imported on first use).
+
+    Args:
+        text (str): The text.
+        color (str): The color (e.g. "red").
+        attrs (list): List containing the attributes (e.g. "reverse").
+
+    Returns:
+        text (str): The colored text.
+    """
+
+    from termcolor import colored as termcolor_colored  # pip3 install termcolor
+
+    return termcolor_colored(text, color, attrs=attrs)
+
+
+def run_applescript(code: str):
+    """
+    Runs AppleScript code (osascript being imported on first use).
+
+    Args:
+        code (str): The AppleScript code.
+    """
+
+    import osascript  # pip3 install osascript
+
+    osascript.run(code)
+
+
+def notify(message: str, title: str, subtitle: str, sound: str):
+    """
+    Posts macOS X notification.
+
+    Args:
+        message (str): The message
+        title (str): The title
+        subtitle (str): The subtitle
+        sound (str): The macOS X sound
+    """
+
+    run_applescript(
+        'display notification "{0}" with title "{1}" subtitle "{2}" sound name "{3}"'.format(message, title, subtitle, sound))
+
+
+def move_files(file_pairs, dest_devices: dict = None):
+    """
+    Moves files to their destination paths (in-process, renaming the files
+    when their destination folder is on the same device and transferring
+    them in durable batches with kernel-side copies otherwise). The file pairs
+    are consumed lazily and the status of every move is yielded as soon as it
+    is done, so that only a batch of cross-device transfers is held in memory.
+
+    Args:
+        file_pairs (iterable): Iterable of the (source path, destination path)
+                               tuples of the files to be moved.
+        dest_devices (dict): Dict mapping the destination folders to their
+                             device, filled as they are met (e.g. shared by
+                             the batches of moves of a pipeline).
+
+    Yields:
+        move_result (MoveResult): The status of each move.
+    """
+
+    # (Device of each destination folder, fetched once)
+    dest_devices = dest_devices if dest_devices is not None else {}
+    # (Dict mapping the source paths of the pending moves to the sequence
+    # numbers of their records in the write-ahead log)
+    seqs = {}
+    cross_device_pairs = []
+    nb_transferred_files, nb_transferred_bytes, transfer_seconds = 0, 0, 0.0
+    failed_moves = []
+
+    def done(move_result):
+        seq = seqs.pop(move_result.src, None)
+        if not move_result.ok:
+            failed_moves.append(move_result)
+        elif seq is not None:
+            WAL.done(seq)
+
+        return move_result
+
+    def transfer():
+        nonlocal nb_transferred_files, nb_transferred_bytes, transfer_seconds
+        start = time.perf_counter()
+        for move_result, nb_bytes in iter_transfers(cross_device_pairs):
+            if move_result.ok:
+                nb_transferred_files += 1
+                nb_transferred_bytes += nb_bytes
+            yield done(move_result)
+        transfer_seconds += time.perf_counter() - start
+        cross_device_pairs.clear()
+
+    with transaction('move files'):
+        for src_path, dst_path in file_pairs:
+            dest_folder_path = os.path.dirname(dst_path)
+            try:
+                if dest_folder_path not in dest_devices:
+                    dest_devices[dest_folder_path] = os.stat(dest_folder_path).st_dev
+                dest_device = dest_devices[dest_folder_path]
+                cross_device = os.lstat(src_path).st_dev != dest_device
+            except OSError:
+                # (The failure being reported by "move_file", without failing
+                # the other moves)
+                dest_device, cross_device = None, False
+            if WAL is not None:
+                seqs[src_path] = WAL.plan(MOVE_OP, src_path, dst_path)
+            if cross_device:
+                # (Transferred in batches)
+                cross_device_pairs.append((src_path, dst_path))
+                if len(cross_device_pairs) >= TRANSFER_BATCH_FILES:
+                    yield from transfer()
+                continue
+            yield done(move_file(src_path, dst_path, dest_device))
+        if len(cross_device_pairs) > 0:
+            yield from transfer()
+    if nb_transferred_files > 0:
+        print(f'\t{TransferStats(nb_transferred_files, nb_transferred_bytes, transfer_seconds)}')
+
+    if len(failed_moves) > 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  {len(failed_moves)} file(s) could not be moved:')
+        for r in failed_moves:
+            print(f'\t{r.src} → {r.dst}: {r.error}')
+
+
+def convert_to_mp3(audio_paths):
+    """
+    Converts audio files of any type to mp3 (running several ffmpeg processes
+    at once) and deletes the converted audio files. The paths are consumed
+    lazily (a bounded number of conversions being in flight) and the status of
+    every conversion is yielded as soon as it is done.
+
+    Args:
+        audio_paths (iterable): Iterable of the paths of the audio files.
+
+    Yields:
+        conversion_result (ConversionResult): The status of each conversion
+        (the audio files whose conversion failed being left untouched).
+    """
+
+    yield from convert_files(audio_paths, '.mp3', partial(convert_audio_files, batch_size=FFMPEG_BATCH_SIZE),
+                             'convert to mp3')
+
+
+def remux_to_mp3(audio_paths):
+    """
+    Copies the MP3 audio streams of audio files (e.g. ".m4a" files holding MP3
+    audio) into ".mp3" files without re-encoding them, and deletes the remuxed
+    audio files. The paths are consumed lazily and the status of every remux
+    is yielded as soon as it is done.
+
+    Args:
+        audio_paths (iterable): Iterable of the paths of the audio files.
+
+    Yields:
+        conversion_result (ConversionResult): The status of each remux (the
+        audio files whose remux failed being left untouched).
+    """
+
+    yield from convert_files(audio_paths, '.mp3', remux_audio_files, 'remux to mp3')
+
+
+def print_conversion_errors(conversion_errors: list):
+    """
+    Prints the failed conversions of a section.
+
+    Args:
+        conversion_errors (list): List containing the status (ConversionResult)
+        of the failed conversions.
+    """
+
+    for conversion_result in conversion_errors:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  "{conversion_result.src}" could not be converted: {conversion_result.error}')
+
+
+def convert_to_png(webp_paths):
+    """
+    Converts ".webp" images to ".png" in parallel (one process per core) and
+    deletes the converted ".webp" images. The paths are consumed lazily (a
+    bounded number of conversions being in flight) and the status of every
+    conversion is yielded as soon as it is done.
+
+    Args:
+        webp_paths (iterable): Iterable of the paths of the ".webp" images.
+
+    Yields:
+        conversion_result (ConversionResult): The status of each conversion
+        (the images whose conversion failed being left untouched).
+    """
+
+    yield from convert_files(webp_paths, '.png', convert_webp_images, 'convert to png')
+
+
+def convert_files(file_paths, extension: str, convert, name: str):
+    """
+    Converts files next to them with a conversion function of the
+    "conversion" module, recording every conversion in the write-ahead log
+    (when its job is submitted) and deleting the converted files.
+
+    Args:
+        file_paths (iterable): Iterable of the paths of the files.
+        extension (str): The extension of the conversion outputs.
+        convert (callable): The conversion function (e.g. "convert_webp_images").
+        name (str): The name of the transaction of the write-ahead log.
+
+    Yields:
+        conversion_result (ConversionResult): The status of each conversion.
+    """
+
+    # (Dict mapping the paths of the files being converted to the sequence
+    # numbers of their records in the write-ahead log)
+    seqs = {}
+
+    def planned(file_paths):
+        for file_path in file_paths:
+            if WAL is not None:
+                seqs[file_path] = WAL.plan(CREATE_OP, os.path.splitext(file_path)[0] + extension)
+            yield file_path
+
+    with transaction(name):
+        for conversion_result in convert(planned(file_paths), cache=CONVERSION_CACHE):
+            seq = seqs.pop(conversion_result.src, None)
+            if conversion_result.ok:
+                if seq is not None:
+                    WAL.done(seq)
+                # Removing the original file
+                perform(DELETE_OP, conversion_result.src)
+            yield conversion_result
+
+
+def catalog_key(context: PlanningContext, file_path: str) -> tuple:
+    """
+    Returns the catalog key of the original file a (planned) path comes from.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        file_path (str): The (planned) path of the file.
+
+    Returns:
+        key (tuple): The (original path, size, modification date in [ns]) tuple
+                     of the file (None if it is not in the inventory).
+    """
+
+    origin = context.builder.origin(file_path)
+    try:
+        stat = context.inventory.stat(origin)
+    except OSError:
+        return None
+
+    return (origin, stat.st_size, stat.st_mtime_ns) if stat is not None else None
+
+
+def skip_handled(context: PlanningContext, list_of_file_paths: list, stage: str) -> list:
+    """
+    Leaves out the files that the catalog records as already handled by a
+    previous run (and that have not changed since).
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        list_of_file_paths (list): List containing the (planned) paths of the files.
+        stage (str): The section and step of the program planning their operations.
+
+    Returns:
+        unhandled_list_of_file_paths (list): List containing the paths of the
+        files that are still to be handled.
+    """
+
+    if CATALOG is None or len(list_of_file_paths) == 0:
+        return list_of_file_paths
+
+    keys = {file_path: catalog_key(context, file_path) for file_path in list_of_file_paths}
+    rows = CATALOG.lookup([key for key in keys.values() if key is not None])
+    unhandled_list_of_file_paths = []
+    handled_rows = []
+    for file_path, key in keys.items():
+        status, dst = rows.get(key, (None, None))
+        if status in HANDLED_STATUSES:
+            handled_rows.append((file_path, status, dst))
+        else:
+            unhandled_list_of_file_paths.append(file_path)
+    if len(handled_rows) > 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  [{stage}] {len(handled_rows)} unchanged file(s) have already been handled '
+              'by a previous run and will be left untouched:')
+        for file_path, status, dst in handled_rows:
+            print(f'\t{file_path} ({status}' + (f' → {dst})' if dst is not None else ')'))
+
+    return unhandled_list_of_file_paths
+
+
+@timed_stage
+def plan_renames(context: PlanningContext, list_of_file_paths: list, type: str, stage: str) -> list:
+    """
+    Plans the renaming of files, following the rename rule registered for the
+    platform they are coming from (their dates being the ones of the original
+    files they come from).
+
+    Args:
+        - context (PlanningContext): The planning context of the source.
+        - list_of_file_paths (list): List containing the (planned) paths of the
+          files.
+        - type (str): The type of platform the file is coming from (e.g.
+          'WhatsApp', 'Telegram', etc.).
+        - stage (str): The section and step of the program planning the renames.
+
+    Returns:
+        renamed_list_of_file_paths (list): List containing the planned paths of
+        the renamed files (and the paths of the files that had already been
+        renamed), without the files that matched none of the patterns of the
+        rule.
+    """
+
+    renamed_list_of_file_paths = []
+    list_of_file_paths = skip_handled(context, list_of_file_paths, stage)
+    if len(list_of_file_paths) == 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              '  The list of files to rename is empty!')
+        return renamed_list_of_file_paths
+
+    # Extracting the capture dates of the original files at once
+    context.capture_dates.prefetch([context.builder.origin(file_path) for file_path in list_of_file_paths])
+    rename_plan = RENAME_RULES[type].plan(
+        list_of_file_paths, lambda file_path: context.capture_dates.formatted(context.builder.origin(file_path)))
+    for file_path, file_path_new in rename_plan.renames:
+        context.builder.add(RENAME_OP, file_path, file_path_new, stage)
+        renamed_list_of_file_paths.append(file_path_new)
+    if len(rename_plan.skipped) > 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  {len(rename_plan.skipped)} {type} file(s) have already been renamed!')
+        renamed_list_of_file_paths += rename_plan.skipped
+    if len(rename_plan.rejected) > 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  {len(rename_plan.rejected)} file(s) do not match the {type} naming pattern '
+              'and will be left untouched:')
+        for file_path in rename_plan.rejected:
+            print(f'\t{file_path}')
+        # Recording them so that they are not looked at again while unchanged
+        if CATALOG is not None and not DRY_RUN:
+            keys = [catalog_key(context, file_path) for file_path in rename_plan.rejected]
+            CATALOG.record([(key, stage, None, REJECTED_STATUS, f'no match for the {type} naming pattern')
+                            for key in keys if key is not None])
+
+    return renamed_list_of_file_paths
+
+
+@timed_stage
+def plan_moves(context: PlanningContext, list_of_file_paths: list, dest_folder_path: str, stage: str) -> list:
+    """
+    Plans the moving of files to a folder.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        list_of_file_paths (list): List containing the (planned) paths of the files.
+        dest_folder_path (str): Path of the destination folder in which the files
+                                have to be moved.
+        stage (str): The section and step of the program planning the moves.
+
+    Returns:
+        moved_list_of_file_paths (list): List containing the planned paths of
+        the moved files.
+    """
+
+    moved_list_of_file_paths = []
+    renamed_collisions = []
+    duplicates = []
+    duplicate_finder = context.duplicate_finder
+    dedupe = duplicate_finder is not None and os.path.normpath(dest_folder_path) == duplicate_finder.library_path
+    for file_path in list_of_file_paths:
+        # Dropping (or hardlinking) the files whose exact content is already in
+        # the library (only for files whose content is the one of their
+        # original file, conversion outputs not existing yet)
+        origin = context.builder.origin(file_path)
+        if dedupe and not context.builder.converted(file_path):
+            size = context.inventory.size(origin)
+            duplicate_path = duplicate_finder.find(origin, size)
+            if duplicate_path is not None:
+                duplicates.append((file_path, duplicate_path))
+                depends_on = ()
+                if DUPLICATES_MODE == HARDLINK_MODE:
+                    file_name_new = context.destination_names.claim(dest_folder_path, os.path.basename(file_path))
+                    link = context.builder.add(LINK_OP, duplicate_path,
+                                               os.path.join(dest_folder_path, file_name_new), stage)
+                    depends_on = (link.id,)
+                context.builder.add(DELETE_OP, file_path, stage=stage, depends_on=depends_on)
+                continue
+        # Claiming a free name in the destination folder (the file name being
+        # suffixed if a file of the same name exists or is planned in it)
+        file_name = os.path.basename(file_path)
+        file_name_new = context.destination_names.claim(dest_folder_path, file_name)
+        if file_name_new != file_name:
+            renamed_collisions.append((file_name, file_name_new))
+        file_path_new = os.path.join(dest_folder_path, file_name_new)
+        context.builder.add(MOVE_OP, file_path, file_path_new, stage)
+        moved_list_of_file_paths.append(file_path_new)
+        if dedupe and not context.builder.converted(file_path):
+            duplicate_finder.add(file_path_new, size, origin)
+    if len(duplicates) > 0:
+        action = 'hardlinked to it' if DUPLICATES_MODE == HARDLINK_MODE else 'dropped'
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  {len(duplicates)} file(s) have the same content as a file of "{dest_folder_path}" '
+              f'and will be {action}:')
+        for file_path, duplicate_path in duplicates:
+            print(f'\t{os.path.basename(file_path)} = {os.path.basename(duplicate_path)}')
+    if len(renamed_collisions) > 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  {len(renamed_collisions)} file(s) would have overwritten a file of the same name '
+              f'in "{dest_folder_path}" and will be suffixed:')
+        for file_name, file_name_new in renamed_collisions:
+            print(f'\t{file_name} → {file_name_new}')
+
+    return moved_list_of_file_paths
+
+
+@timed_stage
+def plan_near_duplicates(context: PlanningContext, list_of_file_paths: list, stage: str) -> list:
+    """
+    Looks for near duplicates (e.g. recompressed copies) of images among the
+    images of the "Camera Uploads" folder and the images planned into it, then
+    reports them or plans their deletion (cf. "--near-duplicates").
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        list_of_file_paths (list): List containing the (planned) paths of the
+                                   files to be moved to the "Camera Uploads" folder.
+        stage (str): The section and step of the program planning the deletions.
+
+    Returns:
+        list_of_file_paths (list): List containing the paths of the files that
+        are still to be moved.
+    """
+
+    if context.near_duplicate_finder is None or len(list_of_file_paths) == 0:
+        return list_of_file_paths
+
+    near_duplicates = context.near_duplicate_finder.find(
+        [(context.builder.origin(file_path), file_path) for file_path in list_of_file_paths])
+    if len(near_duplicates) == 0:
+        return list_of_file_paths
+    action = ' and will be dropped' if NEAR_DUPLICATES_MODE == DROP_MODE else ''
+    print(colored('⚠️  Warning!\n', 'red'),
+          f'  {len(near_duplicates)} image(s) look like images of the "Camera Uploads" folder{action}:')
+    for file_path, (distance, duplicate_path) in near_duplicates.items():
+        print(f'\t{os.path.basename(file_path)} ≈ {os.path.basename(duplicate_path)} (distance: {distance})')
+    if NEAR_DUPLICATES_MODE != DROP_MODE:
+        return list_of_file_paths
+    plan_deletions(context, list(near_duplicates), stage)
+
+    return [file_path for file_path in list_of_file_paths if file_path not in near_duplicates]
+
+
+@timed_stage
+def plan_conversions(context: PlanningContext, list_of_file_paths: list, kind: str, stage: str) -> list:
+    """
+    Plans the conversion of ".webp" images to ".png" or of audio files to
+    ".mp3" (the converted files being deleted).
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        list_of_file_paths (list): List containing the (planned) paths of the files.
+        kind (str): The conversion kind ("convert_png", "convert_mp3" or
+                    "remux_mp3").
+        stage (str): The section and step of the program planning the conversions.
+
+    Returns:
+        converted_list_of_file_paths (list): List containing the planned paths
+        of the conversion outputs.
+    """
+
+    extension = '.png' if kind == CONVERT_PNG_KIND else '.mp3'
+    converted_list_of_file_paths = []
+    list_of_file_paths = skip_handled(context, list_of_file_paths, stage)
+    for file_path in list_of_file_paths:
+        file_path_new = os.path.splitext(file_path)[0] + extension
+        context.builder.add(kind, file_path, file_path_new, stage)
+        converted_list_of_file_paths.append(file_path_new)
+
+    return converted_list_of_file_paths
+
+
+@timed_stage
+def plan_audio_conversions(context: PlanningContext, list_of_file_paths: list, stage: str) -> list:
+    """
+    Plans the conversion of audio files to ".mp3" depending on their actual
+    audio codec (read once per file, cf. "AudioProbes") rather than on their
+    extension: the files that are already MP3 files are only renamed, those
+    holding an MP3 audio stream in another container (e.g. ".m4a") are
+    remuxed without re-encoding, and the other ones are converted (all of them
+    being converted if ffprobe is not installed).
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        list_of_file_paths (list): List containing the (planned) paths of the files.
+        stage (str): The section and step of the program planning the conversions.
+
+    Returns:
+        converted_list_of_file_paths (list): List containing the planned paths
+        of the ".mp3" files.
+    """
+
+    converted_list_of_file_paths = []
+    list_of_file_paths = skip_handled(context, list_of_file_paths, stage)
+    # Probing the original files at once (probes of the unchanged files being
+    # kept in the catalog)
+    context.audio_probes.prefetch([context.builder.origin(file_path) for file_path in list_of_file_paths])
+    nb_renamed = nb_remuxed = 0
+    for file_path in list_of_file_paths:
+        file_path_new = os.path.splitext(file_path)[0] + '.mp3'
+        container, codec = context.audio_probes.probe(context.builder.origin(file_path))
+        if codec != MP3_CODEC:
+            kind = CONVERT_MP3_KIND
+        elif container == MP3_CONTAINER:
+            kind = RENAME_OP
+            nb_renamed += 1
+        else:
+            kind = REMUX_MP3_KIND
+            nb_remuxed += 1
+        context.builder.add(kind, file_path, file_path_new, stage)
+        converted_list_of_file_paths.append(file_path_new)
+    if nb_renamed + nb_remuxed > 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  [{stage}] {nb_renamed + nb_remuxed} audio file(s) already hold MP3 audio and will not be '
+              f're-encoded ({nb_renamed} renamed, {nb_remuxed} remuxed)')
+
+    return converted_list_of_file_paths
+
+
+def plan_deletions(context: PlanningContext, list_of_paths: list, stage: str):
+    """
+    Plans the deletion of files or folders (folders being deleted with their
+    content).
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        list_of_paths (list): List containing the paths of the files or folders.
+        stage (str): The section and step of the program planning the deletions.
+    """
+
+    for path in list_of_paths:
+        context.builder.add(DELETE_OP, path, stage=stage)
+
+
+def plan_empty_folder(context: PlanningContext, directory_path: str, stage: str):
+    """
+    Plans the emptying of a folder, i.e. the deletion of all the (non-hidden)
+    files and folders it contains, as listed by the inventory of the current
+    run.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        directory_path (str): The path of the folder whose contents are to be deleted.
+        stage (str): The section and step of the program planning the deletions.
+    """
+
+    plan_deletions(context, context.inventory.children(directory_path), stage)
+
+
+def plan_rmdirs(context: PlanningContext, list_of_dir_paths: list, stage: str):
+    """
+    Plans the removal of folders once the operations planned so far on their
+    content (which are supposed to empty them) have been executed.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        list_of_dir_paths (list): List containing the paths of the folders.
+        stage (str): The section and step of the program planning the removals.
+    """
+
+    for dir_path in list_of_dir_paths:
+        context.builder.add(RMDIR_OP, dir_path, stage=stage, depends_on=context.builder.consumers(dir_path))
+
+
+def execute_plan(context: PlanningContext, plan: Plan) -> int:
+    """
+    Executes a plan (as a pipeline, or batch by batch with "--sequential"),
+    skipping the operations that depend on an operation that failed, and
+    records the outcome of every file in the catalog.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        plan (Plan): The plan to execute.
+
+    Returns:
+        nb_failed (int): Number of operations that failed or have been skipped.
+    """
+
+    errors = execute_batches(plan) if SEQUENTIAL else execute_pipeline(plan)
+    with METRICS.timed(PHASE_GROUP, 'catalog'), PLANNING_LOCK:
+        record_outcomes(context, plan, errors)
+
+    return len(errors)
+
+
+def run_in_transaction(txn: int, function, *args):
+    """
+    Calls a function (in a worker thread) so that the operations it records in
+    the write-ahead log of the current run (if any) are part of a transaction
+    begun by another thread.
+
+    Args:
+        txn (int): The transaction (None if there is no write-ahead log).
+        function (callable): The function.
+        *args: The arguments of the function.
+
+    Returns:
+        result: The result of the function.
+    """
+
+    if WAL is None:
+        return function(*args)
+    with WAL.joined(txn):
+        return function(*args)
+
+
+def execute_pipeline(plan: Plan) -> dict:
+    """
+    Executes a plan as a pipeline (cf. "run_pipeline"): every operation starts
+    as soon as the operations it depends on are done, conversions running in
+    pools of workers, moves in a pool of threads (the files that are ready
+    being moved in batches, those moved to another device being made durable
+    once per batch, cf. "move_files"), and renames, deletions and the records
+    of the write-ahead log in another pool of threads, so that the event loop
+    never waits for the disk. The disk hence keeps moving the files that are
+    ready while the next ones are still being converted. All the operations
+    form a single transaction of the write-ahead log.
+
+    Args:
+        plan (Plan): The plan to execute.
+
+    Returns:
+        errors (dict): Dict mapping the ids of the failed and skipped
+        operations to their errors.
+    """
+
+    kinds = {op.kind for op in plan.operations}
+    for kind in KIND_ORDER:
+        if kind in kinds:
+            operations = [op for op in plan.operations if op.kind == kind]
+            stages = ', '.join(sorted({op.stage for op in operations}))
+            print(f' {kind}: {len(operations)} operation(s) ({stages})')
+    # (Dict mapping the destination folders of the moves to their device)
+    dest_devices = {}
+    # (Transaction of the pipeline, joined by the threads performing its
+    # operations)
+    txn = None
+
+    with ExitStack() as stack:
+        # (Pools only started for the kinds of operations of the plan, unless
+        # shared by the roots processed concurrently)
+        executors = dict(CONVERSION_EXECUTORS or {})
+        if CONVERT_PNG_KIND in kinds and CONVERT_PNG_KIND not in executors:
+            executors[CONVERT_PNG_KIND] = stack.enter_context(ProcessPoolExecutor(PIPELINE_CONVERSION_WORKERS))
+        if CONVERT_MP3_KIND in kinds and CONVERT_MP3_KIND not in executors:
+            executors[CONVERT_MP3_KIND] = stack.enter_context(ThreadPoolExecutor(PIPELINE_CONVERSION_WORKERS))
+        if REMUX_MP3_KIND in kinds and REMUX_MP3_KIND not in executors:
+            executors[REMUX_MP3_KIND] = stack.enter_context(ThreadPoolExecutor(PIPELINE_CONVERSION_WORKERS))
+        if MOVE_OP in kinds:
+            executors[MOVE_OP] = stack.enter_context(ThreadPoolExecutor(PIPELINE_MOVE_WORKERS))
+        io_executor = stack.enter_context(ThreadPoolExecutor(PIPELINE_IO_WORKERS))
+
+        async def offload(executor, function, *args):
+            return await asyncio.get_running_loop().run_in_executor(executor, run_in_transaction, txn, function,
+                                                                    *args)
+
+        def plan_creations(operations: list) -> dict:
+            return {op.id: WAL.plan(CREATE_OP, op.dst) for op in operations} if WAL is not None else {}
+
+        def complete_conversion(seq: int, src_path: str):
+            if WAL is not None:
+                WAL.done(seq)
+            perform(DELETE_OP, src_path)
+
+        async def convert(op) -> str:
+            seqs = await offload(io_executor, plan_creations, [op])
+            conversion_result = await asyncio.get_running_loop().run_in_executor(
+                executors[op.kind], cached_conversion,
+                *conversion_job(op.src, op.dst, CONVERSION_CACHE, remux=op.kind == REMUX_MP3_KIND))
+            if not conversion_result.ok:
+                print_conversion_errors([conversion_result])
+                return conversion_result.error
+            await offload(io_executor, complete_conversion, seqs.get(op.id), op.src)
+
+        async def convert_batch(operations: list) -> dict:
+            seqs = await offload(io_executor, plan_creations, operations)
+            conversion_results = await asyncio.get_running_loop().run_in_executor(
+                executors[CONVERT_MP3_KIND], cached_batch_conversion, CONVERSION_CACHE,
+                [(op.src, op.dst) for op in operations])
+            operations_by_src = {op.src: op for op in operations}
+            batch_errors = {}
+            for conversion_result in conversion_results:
+                op = operations_by_src[conversion_result.src]
+                if not conversion_result.ok:
+                    print_conversion_errors([conversion_result])
+                    batch_errors[op.id] = conversion_result.error
+                    continue
+                await offload(io_executor, complete_conversion, seqs.get(op.id), op.src)
+
+            return batch_errors
+
+        def move_all(file_pairs: list) -> list:
+            return list(move_files(file_pairs, dest_devices))
+
+        async def move_batch(operations: list) -> dict:
+            operations_by_src = {op.src: op for op in operations}
+            move_results = await offload(executors[MOVE_OP], move_all, [(op.src, op.dst) for op in operations])
+
+            return {operations_by_src[r.src].id: r.error for r in move_results if not r.ok}
+
+        async def run(op) -> str:
+            try:
+                await offload(io_executor, perform, op.kind, op.src, op.dst)
+            except OSError as e:
+                print(colored('⚠️  Warning!\n', 'red'),
+                      f'  [{op.stage}] "{op.kind}" of "{op.src}" failed: {e}')
+                return str(e)
+
+        handlers = {kind: run for kind in kinds}
+        handlers.update({CONVERT_PNG_KIND: convert, CONVERT_MP3_KIND: convert, REMUX_MP3_KIND: convert,
+                         MOVE_OP: move_batch})
+        nb_workers = {CONVERT_PNG_KIND: PIPELINE_CONVERSION_WORKERS, CONVERT_MP3_KIND: PIPELINE_CONVERSION_WORKERS,
+                      REMUX_MP3_KIND: PIPELINE_CONVERSION_WORKERS, MOVE_OP: PIPELINE_MOVE_WORKERS}
+        # (Files being moved in batches of the moves that are ready, and audio
+        # files being converted in batches, by a single ffmpeg process per
+        # batch)
+        batch_sizes = {MOVE_OP: TRANSFER_BATCH_FILES}
+        if FFMPEG_BATCH_SIZE > 1:
+            handlers[CONVERT_MP3_KIND] = convert_batch
+            batch_sizes[CONVERT_MP3_KIND] = FFMPEG_BATCH_SIZE
+
+        def finished(op, seconds: float, error: str):
+            METRICS.add_operation(op, seconds, error is not None)
+
+        with transaction('pipeline'):
+            txn = WAL.current_transaction if WAL is not None else None
+            errors = run_pipeline(plan.operations, handlers, nb_workers, finished, batch_sizes)
+
+    nb_skipped = sum(error == SKIPPED_ERROR for error in errors.values())
+    if nb_skipped > 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  {nb_skipped} operation(s) skipped since an operation they depend on failed')
+    if METRICS.live:
+        for kind in KIND_ORDER:
+            if kind in kinds:
+                METRICS.print_entry(KIND_GROUP, kind)
+
+    return errors
+
+
+def execute_batches(plan: Plan) -> dict:
+    """
+    Executes a plan batch by batch (all the operations of a batch being
+    executed at once, cf. "execution_batches"), skipping the operations that
+    depend on an operation that failed, and records the metrics of every
+    batch.
+
+    Args:
+        plan (Plan): The plan to execute.
+
+    Returns:
+        errors (dict): Dict mapping the ids of the failed and skipped
+        operations to their errors.
+    """
+
+    # (Dict mapping the ids of the failed and skipped operations to their errors)
+    errors = {}
+    for kind, operations in execution_batches(plan):
+        skipped_operations = [op for op in operations if any(i in errors for i in op.depends_on)]
+        if len(skipped_operations) > 0:
+            errors.update((op.id, SKIPPED_ERROR) for op in skipped_operations)
+            METRICS.add_batch(kind, skipped_operations, 0, set(errors))
+            print(colored('⚠️  Warning!\n', 'red'),
+                  f'  {len(skipped_operations)} "{kind}" operation(s) skipped since an operation '
+                  'they depend on failed')
+        operations = [op for op in operations if op.id not in errors]
+        if len(operations) == 0:
+            continue
+        stages = ', '.join(sorted({op.stage for op in operations}))
+        print(f' {kind}: {len(operations)} operation(s) ({stages})')
+        operations_by_src = {op.src: op for op in operations}
+        # (Dict mapping the ids of the operations executed one by one to their duration)
+        op_seconds = None
+        start = time.perf_counter()
+        if kind in (CONVERT_PNG_KIND, CONVERT_MP3_KIND, REMUX_MP3_KIND):
+            convert = {CONVERT_PNG_KIND: convert_to_png, CONVERT_MP3_KIND: convert_to_mp3,
+                       REMUX_MP3_KIND: remux_to_mp3}[kind]
+            conversion_errors = [r for r in convert(op.src for op in operations) if not r.ok]
+            print_conversion_errors(conversion_errors)
+            errors.update((operations_by_src[r.src].id, r.error) for r in conversion_errors)
+        elif kind == MOVE_OP:
+            for move_result in move_files((op.src, op.dst) for op in operations):
+                if not move_result.ok:
+                    errors[operations_by_src[move_result.src].id] = move_result.error
+        else:
+            op_seconds = {}
+            with transaction(f'{kind} ({stages})'):
+                for op in operations:
+                    op_start = time.perf_counter()
+                    try:
+                        perform(kind, op.src, op.dst)
+                    except OSError as e:
+                        errors[op.id] = str(e)
+                        print(colored('⚠️  Warning!\n', 'red'),
+                              f'  [{op.stage}] "{kind}" of "{op.src}" failed: {e}')
+                    op_seconds[op.id] = time.perf_counter() - op_start
+        METRICS.add_batch(kind, operations, time.perf_counter() - start, set(errors), op_seconds)
+
+    return errors
+
+
+def record_outcomes(context: PlanningContext, plan: Plan, errors: dict):
+    """
+    Records in the catalog where the files of an executed plan ended up (or
+    why they did not), all at once.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+        plan (Plan): The executed plan.
+        errors (dict): Dict mapping the ids of the failed and skipped operations
+                       to their errors.
+    """
+
+    if CATALOG is None:
+        return
+
+    # Grouping the operations by original file (folder removals and links to
+    # library files excepted)
+    operations_by_origin = {}
+    for op in plan.operations:
+        if op.kind not in (RMDIR_OP, LINK_OP):
+            operations_by_origin.setdefault(op.origin, []).append(op)
+    entries = []
+    for origin, operations in operations_by_origin.items():
+        key = catalog_key(context, origin)
+        if key is None:
+            continue
+        failed_operations = [op for op in operations if op.id in errors]
+        last_operation = operations[-1]
+        if len(failed_operations) > 0:
+            entries.append((key, failed_operations[0].stage, None, FAILED_STATUS,
+                            errors[failed_operations[0].id]))
+        elif last_operation.kind == DELETE_OP:
+            entries.append((key, last_operation.stage, None, DELETED_STATUS, None))
+        else:
+            entries.append((key, last_operation.stage, last_operation.dst, DONE_STATUS, None))
+    CATALOG.record(entries)
+
+
+def save_metrics():
+    """
+    Prints the summary of the metrics of the run and saves their JSON report.
+    """
+
+    print('\nMetrics')
+    print('-------')
+    print(METRICS.summary())
+    report_path = METRICS.save(METRICS_PATH)
+    print(f'Metrics report saved to "{report_path}"')
+
+
+def plan_sources(root: Root, source_names: list, inventory_path: str, destination_names: NameIndex,
+                 duplicate_finder: DuplicateFinder = None, near_duplicate_finder: NearDuplicateFinder = None) -> tuple:
+    """
+    Plans the operations of sources (i.e., top-level folders of the directory
+    in which media files are synced) without touching the disk.
+
+    Args:
+        root (Root): The root of the sources.
+        source_names (list): List containing the names of the sources (cf.
+                             "SOURCE_PLANNERS").
+        inventory_path (str): Path of the folder to list (containing the
+                              folders of the sources).
+        destination_names (NameIndex): The index of the names of the
+                                       destination folders (shared by all the
+                                       sources of the run).
+        duplicate_finder (DuplicateFinder): The index of the content of the
+                                            "Camera Uploads" folder (if
+                                            duplicates are looked for).
+        near_duplicate_finder (NearDuplicateFinder): The index of the images of
+                                                     the "Camera Uploads"
+                                                     folder (if near duplicates
+                                                     are looked for).
+
+    Returns:
+        (context, plan) (tuple): The planning context of the sources (needed to
+        execute the plan, cf. "execute_plan") and the plan of their operations.
+    """
+
+    with METRICS.timed(PHASE_GROUP, 'inventory'):
+        inventory = Inventory(inventory_path)
+    # Dating the files from their metadata (EXIF, MP4 atoms), falling back to
+    # the stat results of the listing
+    capture_dates = CaptureDates(inventory.stat)
+    # Reading the audio codecs of the files to convert to ".mp3" (probes being
+    # kept in the catalog)
+    audio_probes = AudioProbes(inventory.stat, CATALOG)
+    # Planning all the operations before touching the disk (each section only
+    # plans its operations, which are executed all together afterwards)
+    builder = PlanBuilder(inventory.size)
+    context = PlanningContext(root, source_folders(root), inventory, capture_dates, audio_probes, builder,
+                              destination_names, duplicate_finder, near_duplicate_finder)
+    with METRICS.timed(PHASE_GROUP, 'planning'):
+        for source_name in source_names:
+            SOURCE_PLANNERS[source_name](context)
+        if duplicate_finder is not None:
+            duplicate_finder.save()
+        audio_probes.save()
+
+        return context, builder.build()
+
+
+def process_sources(root: Root, source_names: list, destination_names: NameIndex,
+                    duplicate_finder: DuplicateFinder = None,
+                    near_duplicate_finder: NearDuplicateFinder = None) -> tuple:
+    """
+    Processes sources of a root one after another: each source (i.e.,
+    top-level folder of the directory in which media files are synced) is
+    listed, planned and executed before the next one is listed, so that the
+    first files land in the "Camera Uploads" folder early and that only the
+    listing and plan of a single source are held in memory. In case of a dry
+    run, the plans are only printed. The sections (i.e., sources) are
+    checkpointed as they are done, and the sections completed by an
+    interrupted run are skipped when it is resumed (cf. "Checkpoints").
+
+    Args:
+        root (Root): The root (i.e., directory in which media files are synced).
+        source_names (list): List containing the names of the sources (cf.
+                             "SOURCE_PLANNERS").
+        destination_names (NameIndex): The index of the names of the
+                                       destination folders (shared by all the
+                                       roots of the run).
+        duplicate_finder (DuplicateFinder): The index of the content of the
+                                            destination folder of the root (if
+                                            duplicates are looked for).
+        near_duplicate_finder (NearDuplicateFinder): The index of the images of
+                                                     the destination folder of
+                                                     the root (if near
+                                                     duplicates are looked for).
+
+    Returns:
+        (nb_operations, nb_failed_operations, produced_paths) (tuple): Number
+        of executed operations, number of operations that failed or have been
+        skipped, and set containing the paths produced by the operations.
+    """
+
+    nb_operations, nb_failed_operations = 0, 0
+    produced_paths = set()
+    several_roots = ROOTS is not None and len(ROOTS) > 1
+    for source_name in source_names:
+        # (Naming the root along with the source if there are several roots)
+        name = f'{root.name}: {source_name}' if several_roots else source_name
+        source_path = os.path.join(root.path, source_name)
+        # Skipping the sections completed by the interrupted run (unless files
+        # arrived in them since)
+        if CHECKPOINTS is not None and CHECKPOINTS.is_done(root.path, source_name):
+            print(f'\n{name}: already processed by the interrupted run (checkpoint), skipped')
+            continue
+        with PLANNING_LOCK:
+            if several_roots:
+                print(f'\n[{root.name}]')
+            context, plan = plan_sources(root, [source_name], source_path, destination_names, duplicate_finder,
+                                         near_duplicate_finder)
+        if len(plan.operations) == 0:
+            if CHECKPOINTS is not None:
+                CHECKPOINTS.section_done(root.path, source_name)
+            continue
+        if DRY_RUN:
+            title = f'Plan ({name})'
+        else:
+            title = f'Executing the {len(plan.operations)} planned operation(s) ({name})'
+        print(f'\n{title}')
+        print('-' * len(title))
+        if DRY_RUN:
+            print(format_plan(plan))
+            continue
+        with METRICS.timed(PHASE_GROUP, 'execution'):
+            nb_failed = execute_plan(context, plan)
+        nb_failed_operations += nb_failed
+        # (Sections with failed operations being processed again on resume)
+        if CHECKPOINTS is not None and nb_failed == 0:
+            CHECKPOINTS.section_done(root.path, source_name)
+        nb_operations += len(plan.operations)
+        produced_paths.update(op.dst for op in plan.operations if op.dst is not None)
+
+    return nb_operations, nb_failed_operations, produced_paths
+
+
+def process_roots(sources_by_root: dict) -> tuple:
+    """
+    Processes roots (i.e., directories in which the media files of several
+    devices are synced) concurrently, one thread per root, so that the backlog
+    of a device does not hold up the others: the roots are planned one at a
+    time (their planning sharing the indexes of the destination folders and
+    the catalog), while their plans are executed at once, their conversions
+    sharing pools capped by the maximum number of conversion workers. The
+    roots are processed one after another in case of a dry run or with
+    "--sequential". This is the entry point of the programs embedding the
+    pipeline (the metrics of the run being started here unless "main" did).
+
+    Args:
+        sources_by_root (dict): Dict mapping the roots (Root) to the list of
+                                the names of their sources to process.
+
+    Returns:
+        (nb_operations, nb_failed_operations, produced_paths) (tuple): Number
+        of executed operations, number of operations that failed or have been
+        skipped, and set containing the paths produced by the operations.
+    """
+
+    global METRICS, CONVERSION_EXECUTORS
+
+    if METRICS is None:
+        METRICS = Metrics()
+    # Indexing the names of the destination folders (each listed once) for all
+    # the roots, so that no move overwrites an existing file (or a file moved
+    # from another root)
+    destination_names = NameIndex()
+    # Indexing the content of the destination folders once for all the roots
+    # and sources (hashes being kept in the catalog), so that incoming
+    # duplicates are not moved to them (the files planned into them being
+    # added to the indexes as the sources are planned)
+    duplicate_finders, near_duplicate_finders = {}, {}
+    with ExitStack() as stack:
+        # (Images being hashed and converted in a same pool, capped by the
+        # maximum number of conversion workers)
+        image_executor = stack.enter_context(ProcessPoolExecutor(MAX_CONVERSION_WORKERS))
+        with METRICS.timed(PHASE_GROUP, 'library index'):
+            for destination in dict.fromkeys(root.destination for root in sources_by_root):
+                if DUPLICATES_MODE != KEEP_MODE:
+                    duplicate_finders[destination] = DuplicateFinder(destination, CATALOG)
+                # (Hashing the new images of the destination folder once, if
+                # near duplicates are looked for)
+                if NEAR_DUPLICATES_MODE != OFF_MODE:
+                    near_duplicate_finders[destination] = NearDuplicateFinder(destination, CATALOG,
+                                                                              executor=image_executor)
+
+        def process(root: Root) -> tuple:
+            return process_sources(root, sources_by_root[root], destination_names,
+                                   duplicate_finders.get(root.destination),
+                                   near_duplicate_finders.get(root.destination))
+
+        if DRY_RUN or SEQUENTIAL:
+            results = [process(root) for root in sources_by_root]
+        else:
+            audio_executor = stack.enter_context(ThreadPoolExecutor(MAX_CONVERSION_WORKERS))
+            root_executor = stack.enter_context(ThreadPoolExecutor(max(len(sources_by_root), 1)))
+            CONVERSION_EXECUTORS = {CONVERT_PNG_KIND: image_executor, CONVERT_MP3_KIND: audio_executor,
+                                    REMUX_MP3_KIND: audio_executor}
+            try:
+                results = list(root_executor.map(process, sources_by_root))
+            finally:
+                CONVERSION_EXECUTORS = None
+
+    return (sum(result[0] for result in results), sum(result[1] for result in results),
+            set().union(*(result[2] for result in results)))
+
+
+def process_changes(changed_paths_by_root: dict) -> tuple:
+    """
+    Processes the files that arrived while watching the directories in which
+    media files are synced: only the sources (i.e., top-level folders) in
+    which files arrived are rescanned, planned and executed.
+
+    Args:
+        changed_paths_by_root (dict): Dict mapping the roots (Root) to the set
+                                      containing the paths of their arrived
+                                      files.
+
+    Returns:
+        (nb_operations, produced_paths) (tuple): Number of executed operations,
+        and set containing the paths produced by the operations (whose events
+        are not to be processed again).
+    """
+
+    sources_by_root = {}
+    for root, changed_paths in changed_paths_by_root.items():
+        source_names = [source_name for source_name in root.sources
+                        if source_name in changed_folders(changed_paths, root.path)]
+        if len(source_names) > 0:
+            sources_by_root[root] = source_names
+    nb_operations, _, produced_paths = process_roots(sources_by_root)
+
+    return nb_operations, produced_paths
+
+
+def watch_root(root: Root, watcher, changes: queue.Queue):
+    """
+    Queues the bursts of files arriving in a root (run in a thread per root).
+
+    Args:
+        root (Root): The root.
+        watcher (InotifyWatcher or PollingWatcher): The watcher of the root.
+        changes (Queue): Queue of the (root, set of the paths of the arrived
+                         files) tuples.
+    """
+
+    try:
+        for changed_paths in debounced_changes(watcher, WATCH_DEBOUNCE):
+            changes.put((root, changed_paths))
+    except (OSError, ValueError):
+        # (The watcher being closed)
+        pass
+
+
+# Main process
+def source_folders(root: Root) -> SourceFolders:
+    """
+    Returns the paths of the folders of the sources of a root (e.g. "WhatsApp
+    Audio") and of its destination folder.
+
+    Args:
+        root (Root): The root.
+
+    Returns:
+        folders (SourceFolders): The paths of the folders.
+    """
+
+    # 1) WhatsApp
+    # Targeted folder paths
+    whatsapp_path = os.path.join(root.path, 'WhatsApp')
+    whatsapp_animated_gifs_path = os.path.join(whatsapp_path, 'WhatsApp Animated Gifs', '')
+    whatsapp_audio_path = os.path.join(whatsapp_path, 'WhatsApp Audio', '')
+    whatsapp_images_path = os.path.join(whatsapp_path, 'WhatsApp Images', '')
+    whatsapp_stickers_path = os.path.join(whatsapp_path, 'WhatsApp Stickers', '')
+    whatsapp_videos_path = os.path.join(whatsapp_path, 'WhatsApp Video', '')
+    whatsapp_voice_notes_path = os.path.join(whatsapp_path, 'WhatsApp Voice Notes', '')
+    whatsapp_video_notes_path = os.path.join(whatsapp_path, 'WhatsApp Video Notes', '')
+    # Untargeted folder paths
+    untargeted_folders_list = [
+        os.path.join(whatsapp_path, 'MISC', ''),
+        os.path.join(whatsapp_path, 'WallPaper', ''),
+        os.path.join(whatsapp_path, 'WhatsApp Documents', ''),
+        os.path.join(whatsapp_path, 'WhatsApp Profile Photos', '')
+    ]
+
+    # 2) Telegram
+    telegram_path = os.path.join(root.path, 'Telegram', '')
+    telegram_images_path = os.path.join(telegram_path, 'Telegram Images', '')
+
+    # 3) Snapchat
+    snapchat_path = os.path.join(root.path, 'Snapchat', '')
+
+    # 4) MusicDownload
+    music_download_path = os.path.join(root.path, 'MusicDownload', '')
+
+    # 5) VidMate
+    vidmate_path = os.path.join(root.path, 'VidMate', '')
+    vidmate_download_path = os.path.join(vidmate_path, 'download', '')
+
+    # 6) Instander
+    instander_path = os.path.join(root.path, 'Instander', '')
+
+    # 7) Story Saver
+    storysaver_path = os.path.join(root.path, 'StorySaver', '')
+
+    return SourceFolders(root.destination, whatsapp_animated_gifs_path, whatsapp_audio_path, whatsapp_images_path,
+                         whatsapp_stickers_path, whatsapp_videos_path, whatsapp_voice_notes_path,
+                         whatsapp_video_notes_path, untargeted_folders_list, telegram_path, telegram_images_path,
+                         snapchat_path, music_download_path, vidmate_path, vidmate_download_path, instander_path,
+                         storysaver_path)
+
+
+# ------------------------------------------------------------------------------
+
+# ░██╗░░░░░░░██╗██╗░░██╗░█████╗░████████╗░██████╗░█████╗░██████╗░██████╗░
+# ░██║░░██╗░░██║██║░░██║██╔══██╗╚══██╔══╝██╔════╝██╔══██╗██╔══██╗██╔══██╗
+# ░╚██╗████╗██╔╝███████║███████║░░░██║░░░╚█████╗░███████║██████╔╝██████╔╝
+# ░░████╔═████║░██╔══██║██╔══██║░░░██║░░░░╚═══██╗██╔══██║██╔═══╝░██╔═══╝░
+# ░░╚██╔╝░╚██╔╝░██║░░██║██║░░██║░░░██║░░░██████╔╝██║░░██║██║░░░░░██║░░░░░
+# ░░░╚═╝░░░╚═╝░░╚═╝░░╚═╝╚═╝░░╚═╝░░░╚═╝░░░╚═════╝░╚═╝░░╚═╝╚═╝░░░░░╚═╝░░░░░
+# (Made with "BIG TEXT Letters Font Generator" (cf.: https://fsymbols.com/generators/tarty/))
+# 1) WhatsApp
+
+
+def plan_whatsapp(context: PlanningContext):
+    """
+    Plans the operations of the "WhatsApp" folders.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+    """
+
+    inventory = context.inventory
+    folders = context.folders
+
+    print('\n1) WhatsApp')
+    print('-----------')
+
+    # A) "WhatsApp Images"
+    if inventory.is_dir(folders.whatsapp_images):
+        # A.1) Renaming "WhatsApp Images" file names
+        list_of_img_paths = inventory.files(folders.whatsapp_images, ('.jpg', '.jpeg'))
+        renamed_list_of_img_paths = plan_renames(context, list_of_img_paths, WHATSAPP_TYPE, 'WhatsApp A.1')
+        # A.2) Emptying "Sent" folder
+        plan_empty_folder(context, os.path.join(folders.whatsapp_images, SENT_FOLDER), 'WhatsApp A.2')
+        # A.3) Emptying "Private" folder
+        plan_empty_folder(context, os.path.join(folders.whatsapp_images, PRIVATE_FOLDER), 'WhatsApp A.3')
+        # A.4) Moving the files to the "Camera Uploads" folder (near duplicates
+        # of its images excepted, if they are looked for)
+        renamed_list_of_img_paths = plan_near_duplicates(context, renamed_list_of_img_paths, 'WhatsApp A.4')
+        plan_moves(context, renamed_list_of_img_paths, folders.camera_uploads, 'WhatsApp A.4')
+
+    # B) "WhatsApp Video"
+    if inventory.is_dir(folders.whatsapp_videos):
+        # B.1) Renaming "WhatsApp Video" file names
+        list_of_vid_paths = inventory.files(folders.whatsapp_videos, ('.mp4',))
+        renamed_list_of_vid_paths = plan_renames(context, list_of_vid_paths, WHATSAPP_TYPE, 'WhatsApp B.1')
+        # B.2) Emptying "Sent" folder
+        plan_empty_folder(context, os.path.join(folders.whatsapp_videos, SENT_FOLDER), 'WhatsApp B.2')
+        # B.3) Emptying "Private" folder
+        plan_empty_folder(context, os.path.join(folders.whatsapp_videos, PRIVATE_FOLDER), 'WhatsApp B.3')
+        # B.4) Moving the files to the "Camera Uploads" folder
+        plan_moves(context, renamed_list_of_vid_paths, folders.camera_uploads, 'WhatsApp B.4')
+
+    # C) "WhatsApp Stickers"
+    if inventory.is_dir(folders.whatsapp_stickers):
+        # C.1) Converting stickers from ".webp" to ".png"
+        # C.2) Deleting ".webp" stickers
+        list_of_sticker_paths = inventory.files(folders.whatsapp_stickers, ('.webp',))
+        list_of_converted_paths = plan_conversions(context, list_of_sticker_paths, CONVERT_PNG_KIND, 'WhatsApp C.1')
+        # C.3) Renaming PNG "WhatsApp Stickers" file names
+        list_of_sticker_png_paths = inventory.files(folders.whatsapp_stickers, ('.png',)) + list_of_converted_paths
+        renamed_list_of_sticker_paths = plan_renames(context, list_of_sticker_png_paths, WHATSAPP_TYPE, 'WhatsApp C.3')
+        # C.4) Moving the files to the "Camera Uploads" folder
+        plan_moves(context, renamed_list_of_sticker_paths, folders.camera_uploads, 'WhatsApp C.4')
+
+    # D) "WhatsApp Audio"
+    if inventory.is_dir(folders.whatsapp_audio):
+        # D.1) Shifting all files from the "Sent" directory in the "WhatsApp Audio" directory
+        files_in_sent = inventory.files(os.path.join(folders.whatsapp_audio, SENT_FOLDER, ''), include_hidden=True)
+        files_moved_from_sent = plan_moves(context, files_in_sent, folders.whatsapp_audio, 'WhatsApp D.1')
+        # D.2) Getting all files in "WhatsApp Audio" directory (".opus", ".mp3", ".m4a", etc.)
+        # D.3) Removing hidden files from list of files to convert
+        # D.4) Listing all paths of audio files
+        list_of_audio_paths = inventory.files(folders.whatsapp_audio) + \
+            [f for f in files_moved_from_sent if not os.path.basename(f).startswith('.')]
+        # D.5) Renaming "WhatsApp Audio" file names
+        renamed_list_of_audio_paths = plan_renames(context, list_of_audio_paths, WHATSAPP_TYPE, 'WhatsApp D.5')
+        # D.6) Removing ".mp3" files from list of files to convert
+        list_of_audio_paths_already_mp3 = [
+            f for f in renamed_list_of_audio_paths if f.endswith('.mp3')]
+        list_of_audio_paths_no_mp3 = [
+            f for f in renamed_list_of_audio_paths if not f.endswith('.mp3')]
+        # D.7) Converting audio files to mp3 (unless they already hold MP3 audio)
+        list_of_audio_paths_mp3 = plan_audio_conversions(context, list_of_audio_paths_no_mp3, 'WhatsApp D.7')
+        list_of_audio_paths_mp3 += list_of_audio_paths_already_mp3
+        # D.8) Moving the files to the "Camera Uploads" folder
+        plan_moves(context, list_of_audio_paths_mp3, folders.camera_uploads, 'WhatsApp D.8')
+
+    # E) "WhatsApp Voice Notes"
+    if inventory.is_dir(folders.whatsapp_voice_notes):
+        # E.1) Gathering all (".opus") files of the different subfolders
+        folders_list = inventory.subdirs(folders.whatsapp_voice_notes)
+        list_of_files_in_subfolders = [file_path for folder_path in folders_list
+                                       for file_path in inventory.files(folder_path, recursive=True, include_hidden=True)]
+        # E.2) Moving all (".opus") files at the root of the "WhatsApp Voice Notes" folder
+        list_of_files_in_whatsapp_voice_notes = inventory.files(folders.whatsapp_voice_notes, include_hidden=True) + \
+            plan_moves(context, list_of_files_in_subfolders, folders.whatsapp_voice_notes, 'WhatsApp E.2')
+        # E.3) Deleting the emptied folders
+        plan_rmdirs(context, folders_list, 'WhatsApp E.3')
+        # E.4) Renaming "WhatsApp Voice Notes" file names
+        renamed_list_of_files = plan_renames(context, list_of_files_in_whatsapp_voice_notes, WHATSAPP_TYPE,
+                                             'WhatsApp E.4')
+        # E.5) Converting audio files to mp3
+        list_of_files_mp3 = plan_conversions(context, renamed_list_of_files, CONVERT_MP3_KIND, 'WhatsApp E.5')
+        # E.6) Moving the files to the "Camera Uploads" folder
+        plan_moves(context, list_of_files_mp3, folders.camera_uploads, 'WhatsApp E.6')
+
+    # F) "WhatsApp Animated Gifs"
+    if inventory.is_dir(folders.whatsapp_animated_gifs):
+        # F.1) Renaming "WhatsApp Animated Gifs" file names
+        list_of_anim_gifs_paths = inventory.files(folders.whatsapp_animated_gifs, ('.mp4',))
+        renamed_list_of_anim_gifs_paths = plan_renames(context, list_of_anim_gifs_paths, WHATSAPP_TYPE, 'WhatsApp F.1')
+        # F.2) Emptying "Sent" folder
+        plan_empty_folder(context, os.path.join(folders.whatsapp_animated_gifs, SENT_FOLDER), 'WhatsApp F.2')
+        # F.3) Emptying "Private" folder
+        plan_empty_folder(context, os.path.join(folders.whatsapp_animated_gifs, PRIVATE_FOLDER), 'WhatsApp F.3')
+        # F.4) Moving the files to the "Camera Uploads" folder
+        plan_moves(context, renamed_list_of_anim_gifs_paths, folders.camera_uploads, 'WhatsApp F.4')
+
+    # G) "WhatsApp Video Notes"
+    if inventory.is_dir(folders.whatsapp_video_notes):
+        # G.1) Gathering all (".mp4") files of the different subfolders
+        folders_list = inventory.subdirs(folders.whatsapp_video_notes)
+        list_of_files_in_subfolders = [file_path for folder_path in folders_list
+                                       for file_path in inventory.files(folder_path, recursive=True, include_hidden=True)]
+        # G.2) Moving all (".mp4") files at the root of the "WhatsApp Video Notes" folder
+        list_of_files_in_whatsapp_video_notes = inventory.files(folders.whatsapp_video_notes, include_hidden=True) + \
+            plan_moves(context, list_of_files_in_subfolders, folders.whatsapp_video_notes, 'WhatsApp G.2')
+        # G.3) Deleting the emptied folders
+        plan_rmdirs(context, folders_list, 'WhatsApp G.3')
+        # G.4) Renaming "WhatsApp Video Notes" file names
+        renamed_list_of_files = plan_renames(context, list_of_files_in_whatsapp_video_notes, WHATSAPP_TYPE,
+                                             'WhatsApp G.4')
+        # G.6) Moving the files to the "Camera Uploads" folder
+        plan_moves(context, renamed_list_of_files, folders.camera_uploads, 'WhatsApp G.6')
+
+    # H) Empty untargeted folders
+    for folder_path in folders.whatsapp_untargeted:
+        plan_empty_folder(context, folder_path, 'WhatsApp H')
+
+
+# ████████╗███████╗██╗░░░░░███████╗░██████╗░██████╗░░█████╗░███╗░░░███╗
+# ╚══██╔══╝██╔════╝██║░░░░░██╔════╝██╔════╝░██╔══██╗██╔══██╗████╗░████║
+# ░░░██║░░░█████╗░░██║░░░░░█████╗░░██║░░██╗░██████╔╝███████║██╔████╔██║
+# ░░░██║░░░██╔══╝░░██║░░░░░██╔══╝░░██║░░╚██╗██╔══██╗██╔══██║██║╚██╔╝██║
+# ░░░██║░░░███████╗███████╗███████╗╚██████╔╝██║░░██║██║░░██║██║░╚═╝░██║
+# ░░░╚═╝░░░╚══════╝╚══════╝╚══════╝░╚═════╝░╚═╝░░╚═╝╚═╝░░╚═╝╚═╝░░░░░╚═╝
+# 2) Telegram
+
+
+def plan_telegram(context: PlanningContext):
+    """
+    Plans the operations of the "Telegram" folder.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+    """
+
+    inventory = context.inventory
+    folders = context.folders
+
+    print('\n2) Telegram')
+    print('-----------')
+
+    # A) Emptying all folders apart from "Telegram Images"
+    for telegram_directory in inventory.subdirs(folders.telegram):
+        if os.path.join(telegram_directory, '') != folders.telegram_images:
+            plan_empty_folder(context, telegram_directory, 'Telegram A')
+
+    # B) "Telegram Images"
+    # B.1) Renaming "Telegram Images" file names
+    list_of_img_paths = inventory.files(folders.telegram_images, ('.jpg',))
+    renamed_list_of_img_paths = plan_renames(context, list_of_img_paths, TELEGRAM_TYPE, 'Telegram B.1')
+    # B.2) Moving the files to the "Camera Uploads" folder (near duplicates of
+    # its images excepted, if they are looked for)
+    renamed_list_of_img_paths = plan_near_duplicates(context, renamed_list_of_img_paths, 'Telegram B.2')
+    plan_moves(context, renamed_list_of_img_paths, folders.camera_uploads, 'Telegram B.2')
+
+
+# ░██████╗███╗░░██╗░█████╗░██████╗░░█████╗░██╗░░██╗░█████╗░████████╗
+# ██╔════╝████╗░██║██╔══██╗██╔══██╗██╔══██╗██║░░██║██╔══██╗╚══██╔══╝
+# ╚█████╗░██╔██╗██║███████║██████╔╝██║░░╚═╝███████║███████║░░░██║░░░
+# ░╚═══██╗██║╚████║██╔══██║██╔═══╝░██║░░██╗██╔══██║██╔══██║░░░██║░░░
+# ██████╔╝██║░╚███║██║░░██║██║░░░░░╚█████╔╝██║░░██║██║░░██║░░░██║░░░
+# ╚═════╝░╚═╝░░╚══╝╚═╝░░╚═╝╚═╝░░░░░░╚════╝░╚═╝░░╚═╝╚═╝░░╚═╝░░░╚═╝░░░
+# 3) Snapchat
+
+
+def plan_snapchat(context: PlanningContext):
+    """
+    Plans the operations of the "Snapchat" folder.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+    """
+
+    inventory = context.inventory
+    folders = context.folders
+
+    print('\n3) Snapchat')
+    print('-----------')
+
+    # A) Renaming "Snapchat" file names
+    list_of_file_paths = inventory.files(folders.snapchat, ('.JPG', '.jpg', '.mp4'))
+    renamed_list_of_file_paths = plan_renames(context, list_of_file_paths, SNAPCHAT_TYPE, 'Snapchat A')
+
+    # B) Moving the files to the "Camera Uploads" folder
+    plan_moves(context, renamed_list_of_file_paths, folders.camera_uploads, 'Snapchat B')
+
+
+# ███╗░░░███╗██╗░░░██╗░██████╗██╗░█████╗░██████╗░░█████╗░░██╗░░░░░░░██╗███╗░░██╗██╗░░░░░░█████╗░░█████╗░██████╗░
+# ████╗░████║██║░░░██║██╔════╝██║██╔══██╗██╔══██╗██╔══██╗░██║░░██╗░░██║████╗░██║██║░░░░░██╔══██╗██╔══██╗██╔══██╗
+# ██╔████╔██║██║░░░██║╚█████╗░██║██║░░╚═╝██║░░██║██║░░██║░╚██╗████╗██╔╝██╔██╗██║██║░░░░░██║░░██║███████║██║░░██║
+# ██║╚██╔╝██║██║░░░██║░╚═══██╗██║██║░░██╗██║░░██║██║░░██║░░████╔═████║░██║╚████║██║░░░░░██║░░██║██╔══██║██║░░██║
+# ██║░╚═╝░██║╚██████╔╝██████╔╝██║╚█████╔╝██████╔╝╚█████╔╝░░╚██╔╝░╚██╔╝░██║░╚███║███████╗╚█████╔╝██║░░██║██████╔╝
+# ╚═╝░░░░░╚═╝░╚═════╝░╚═════╝░╚═╝░╚════╝░╚═════╝░░╚════╝░░░░╚═╝░░░╚═╝░░╚═╝░░╚══╝╚══════╝░╚════╝░╚═╝░░╚═╝╚═════╝░
+# 4) MusicDownload
+# (YouTube video to mp3 converter Android app)
+
+
+def plan_music_download(context: PlanningContext):
+    """
+    Plans the operations of the "MusicDownload" folder.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+    """
+
+    inventory = context.inventory
+    folders = context.folders
+
+    print('\n4) MusicDownload')
+    print('--------------')
+
+    # A) Converting the audio files from ".m4a" to ".mp3" (unless they already hold MP3 audio)
+    list_of_audio_paths_m4a = inventory.files(folders.music_download, ('.m4a',))
+    list_of_files_mp3_converted = plan_audio_conversions(context, list_of_audio_paths_m4a, 'MusicDownload A')
+
+    # B) Making list of converted ".mp3" files and original ".mp3" files
+    list_of_files_mp3 = inventory.files(folders.music_download, ('.mp3',)) + list_of_files_mp3_converted
+
+    # C) Renaming the audio files
+    renamed_list_of_mp3_paths = plan_renames(context, list_of_files_mp3, MUSIC_DOWNLOAD_TYPE, 'MusicDownload C')
+
+    # C) Moving the files to the "Camera Uploads" folder
+    plan_moves(context, renamed_list_of_mp3_paths, folders.camera_uploads, 'MusicDownload D')
+
+
+# ██╗░░░██╗██╗██████╗░███╗░░░███╗░█████╗░████████╗███████╗
+# ██║░░░██║██║██╔══██╗████╗░████║██╔══██╗╚══██╔══╝██╔════╝
+# ╚██╗░██╔╝██║██║░░██║██╔████╔██║███████║░░░██║░░░█████╗░░
+# ░╚████╔╝░██║██║░░██║██║╚██╔╝██║██╔══██║░░░██║░░░██╔══╝░░
+# ░░╚██╔╝░░██║██████╔╝██║░╚═╝░██║██║░░██║░░░██║░░░███████╗
+# ░░░╚═╝░░░╚═╝╚═════╝░╚═╝░░░░░╚═╝╚═╝░░╚═╝░░░╚═╝░░░╚══════╝
+# 5) VidMate
+# (YouTube video downloader Android app)
+
+
+def plan_vidmate(context: PlanningContext):
+    """
+    Plans the operations of the "VidMate" folder.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+    """
+
+    inventory = context.inventory
+    folders = context.folders
+
+    print('\n5) VidMate')
+    print('----------')
+
+    # A) Emptying all folders apart from "download"
+    for vidmate_directory in inventory.subdirs(folders.vidmate):
+        if os.path.join(vidmate_directory, '') != folders.vidmate_download:
+            plan_empty_folder(context, vidmate_directory, 'VidMate A')
+
+    # B) "download"
+    # Checking if the "download" folder exists
+    if inventory.is_dir(folders.vidmate_download):
+        # B.1) Renaming "download" file names
+        list_of_paths = inventory.files(folders.vidmate_download, ('.mp4', '.mp3'))
+        renamed_list_of_paths = plan_renames(context, list_of_paths, VIDMATE_TYPE, 'VidMate B.1')
+        # B.2) Removing all the files with extension ".smi" and ".apk" from the "download" folder
+        plan_deletions(context, inventory.files(folders.vidmate_download, ('.smi', '.apk'), include_hidden=True),
+                       'VidMate B.2')
+        # B.3) Moving the files to the "Camera Uploads" folder
+        plan_moves(context, renamed_list_of_paths, folders.camera_uploads, 'VidMate B.3')
+
+
+# ██╗███╗░░██╗░██████╗████████╗░█████╗░███╗░░██╗██████╗░███████╗██████╗░
+# ██║████╗░██║██╔════╝╚══██╔══╝██╔══██╗████╗░██║██╔══██╗██╔════╝██╔══██╗
+# ██║██╔██╗██║╚█████╗░░░░██║░░░███████║██╔██╗██║██║░░██║█████╗░░██████╔╝
+# ██║██║╚████║░╚═══██╗░░░██║░░░██╔══██║██║╚████║██║░░██║██╔══╝░░██╔══██╗
+# ██║██║░╚███║██████╔╝░░░██║░░░██║░░██║██║░╚███║██████╔╝███████╗██║░░██║
+# ╚═╝╚═╝░░╚══╝╚═════╝░░░░╚═╝░░░╚═╝░░╚═╝╚═╝░░╚══╝╚═════╝░╚══════╝╚═╝░░╚═╝
+# 6) Instander
+# (Instagram clone and image/video downloader Android app)
+
+
+def plan_instander(context: PlanningContext):
+    """
+    Plans the operations of the "Instander" folder.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+    """
+
+    inventory = context.inventory
+    folders = context.folders
+
+    print('\n6) Instander')
+    print('------------')
+
+    # A) Visiting elements in "Instander" root folder
+    for elem_path in inventory.children(folders.instander, include_hidden=True):
+
+        if inventory.is_dir(elem_path):
+
+            # A.1) Navigating inside current subfolder
+            list_of_media_paths = inventory.files(elem_path)
+
+            # A.1.1) Converting any ".webp" files to ".png" files
+            list_of_webp_paths = [
+                media_path for media_path in list_of_media_paths if media_path[-5:] == '.webp']
+            list_of_media_paths = [
+                media_path for media_path in list_of_media_paths if media_path[-5:] != '.webp']
+            list_of_media_paths += plan_conversions(context, list_of_webp_paths, CONVERT_PNG_KIND, 'Instander A.1.1')
+
+            # A.1.2) Renaming media file names (image and video)
+            renamed_list_of_media_paths = plan_renames(context, list_of_media_paths, INSTANDER_TYPE, 'Instander A.1.2')
+
+            # A.1.3) Moving the files to the "Camera Uploads" folder (near
+            # duplicates of its images excepted, if they are looked for)
+            renamed_list_of_media_paths = plan_near_duplicates(context, renamed_list_of_media_paths, 'Instander A.1.3')
+            plan_moves(context, renamed_list_of_media_paths, folders.camera_uploads, 'Instander A.1.3')
+
+        else:
+            # A.2) Deleting image and video files at "Instander" folder root
+            # (Because those are the media I personally posted on Instagram)
+            # (Removing the file situated at "elem_path" since it is precisely a file
+            # (and hence NOT a subfolder))
+            plan_deletions(context, [elem_path], 'Instander A.2')
+
+
+# ░██████╗████████╗░█████╗░██████╗░██╗░░░██╗  ░██████╗░█████╗░██╗░░░██╗███████╗██████╗░
+# ██╔════╝╚══██╔══╝██╔══██╗██╔══██╗╚██╗░██╔╝  ██╔════╝██╔══██╗██║░░░██║██╔════╝██╔══██╗
+# ╚█████╗░░░░██║░░░██║░░██║██████╔╝░╚████╔╝░  ╚█████╗░███████║╚██╗░██╔╝█████╗░░██████╔╝
+# ░╚═══██╗░░░██║░░░██║░░██║██╔══██╗░░╚██╔╝░░  ░╚═══██╗██╔══██║░╚████╔╝░██╔══╝░░██╔══██╗
+# ██████╔╝░░░██║░░░╚█████╔╝██║░░██║░░░██║░░░  ██████╔╝██║░░██║░░╚██╔╝░░███████╗██║░░██║
+# ╚═════╝░░░░╚═╝░░░░╚════╝░╚═╝░░╚═╝░░░╚═╝░░░  ╚═════╝░╚═╝░░╚═╝░░░╚═╝░░░╚══════╝╚═╝░░╚═╝
+# 7) Story Saver
+# (Android app for downloading WhatsApp stories under the form of JPG and MP4 files)
+
+
+def plan_storysaver(context: PlanningContext):
+    """
+    Plans the operations of the "StorySaver" folder.
+
+    Args:
+        context (PlanningContext): The planning context of the source.
+    """
+
+    inventory = context.inventory
+    folders = context.folders
+
+    print('\n7) Story Saver')
+    print('------------')
+
+    # A) Visiting elements in "StorySaver" root folder
+    list_of_media_paths = inventory.files(folders.storysaver, ('.jpg', '.mp4'), recursive=True)
+
+    # A.1.1) Renaming media file names (image and video)
+    renamed_list_of_media_paths = plan_renames(context, list_of_media_paths, STORYSAVER_TYPE, 'StorySaver A.1.1')
+
+    # A.1.2) Moving the files to the "Camera Uploads" folder
+    plan_moves(context, renamed_list_of_media_paths, folders.camera_uploads, 'StorySaver A.1.2')
+
+
+# ------------------------------------------------------------------------------
+
+# Planning the operations of all the sources (by top-level folder name)
+SOURCE_PLANNERS: dict = {
+    'WhatsApp': plan_whatsapp,
+    'Telegram': plan_telegram,
+    'Snapchat': plan_snapchat,
+    'MusicDownload': plan_music_download,
+    'VidMate': plan_vidmate,
+    'Instander': plan_instander,
+    'StorySaver': plan_storysaver
+}
+
+
+def default_root(project_path: str) -> Root:
+    """
+    Returns the root processed unless a configuration file lists others (cf.
+    "CONFIG_PATH").
+
+    Args:
+        project_path (str): Path of the current working directory (whose
+                            "tests" folder is processed in debug mode).
+
+    Returns:
+        root (Root): The root.
+    """
+
+    if DEBUG_MODE_ON:
+        return Root('tests', os.path.join(project_path, 'tests'), os.path.join(project_path, 'tests', 'Camera Uploads'),
+                    tuple(SOURCE_PLANNERS))
+
+    return Root('DropsyncFiles', DROPSYNCFILES_DIRECTORY_PATH, CAMERA_UPLOADS_DIRECTORY_PATH, tuple(SOURCE_PLANNERS))
+
+
+def parse_arguments(argv: list = None):
+    """
+    Parses the command line arguments of the program.
+
+    Args:
+        argv (list): List containing the arguments (those of the command line
+                     if None).
+
+    Returns:
+        args (Namespace): The parsed arguments.
+    """
+
+    # Creating ArgumentParser
+    parser = ArgumentParser(description='"dropsync_shift_rename.py" is a Python\
+        program that automatically renames, moves and eventually converts any\
+        kind of files from the "DropsyncFiles" folder to the "Camera Uploads"\
+        folder.')
+    recovery_group = parser.add_mutually_exclusive_group()
+    recovery_group.add_argument('--undo', action='store_true',
+                                help='roll back the operations of the interrupted\
+                                transactions of the previous run, then exit')
+    recovery_group.add_argument('--resume', action='store_true',
+                                help='complete the operations of the interrupted\
+                                transactions of the previous run, then resume it from\
+                                its first incomplete section (the sections it completed\
+                                being skipped unless files arrived in them since)')
+    recovery_group.add_argument('--rebuild', metavar='WAL_PATH',
+                                help='rebuild the original layout of the "DropsyncFiles"\
+                                folder from the write-ahead log (and snapshot, if any)\
+                                of a previous run, then exit')
+    recovery_group.add_argument('--dry-run', action='store_true',
+                                help='print the planned operations (with their estimated\
+                                byte counts) without touching the disk, then exit')
+    recovery_group.add_argument('--where', metavar='NAME',
+                                help='print where the files whose source or destination\
+                                name contains NAME ended up (according to the catalog of\
+                                the handled files), then exit')
+    parser.add_argument('--config', metavar='PATH',
+                        help=f'TOML or YAML file listing the directories in which the media files of\
+                        several devices are synced (each one with its sources and destination folder),\
+                        which are processed concurrently (default: "{CONFIG_PATH}" if it exists, the\
+                        "DropsyncFiles" folder being processed alone otherwise)')
+    parser.add_argument('--max-conversion-workers', type=int, metavar='N',
+                        help=f'maximum number of conversions of each kind (images, audio files) running\
+                        at once for all the directories (default: the "max_conversion_workers" of the\
+                        configuration file, or {MAX_CONVERSION_WORKERS})')
+    parser.add_argument('--watch', action='store_true',
+                        help='after processing the "DropsyncFiles" folder, keep watching it\
+                        and process the files of the sources in which new files arrive\
+                        (until interrupted with Ctrl+C)')
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE, metavar='SECONDS',
+                        help=f'quiet period after which a burst of arrived files is processed\
+                        in watch mode (default: {WATCH_DEBOUNCE}[s])')
+    parser.add_argument('--poll-interval', type=float, default=WATCH_POLL_INTERVAL, metavar='SECONDS',
+                        help=f'interval between two scans of the "DropsyncFiles" folder in watch\
+                        mode where filesystem events are not available (default:\
+                        {WATCH_POLL_INTERVAL}[s])')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='also take a snapshot of the "DropsyncFiles" folder before\
+                        processing (not needed for crash safety, which is ensured by the\
+                        write-ahead log, but allows to "--rebuild" deleted files)')
+    parser.add_argument('--snapshot-mode', choices=SNAPSHOT_MODES, default='auto',
+                        help='how files are put in the snapshot ("auto" reflinks them\
+                        when the filesystem supports it and hardlinks them otherwise,\
+                        copying them only across devices)')
+    parser.add_argument('--cache-size', type=int, default=CONVERSION_CACHE_MAX_MB, metavar='MB',
+                        help=f'size of the cache of converted stickers and audio files kept in\
+                        "{CONVERSION_CACHE_PATH}" (default: {CONVERSION_CACHE_MAX_MB}[MB])')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='convert every sticker and audio file, without using the cache')
+    parser.add_argument('--ffmpeg-batch-size', type=int, default=FFMPEG_BATCH_SIZE, metavar='N',
+                        help=f'maximum number of audio files converted by a single ffmpeg process, so '
+                        'that short files (e.g. voice notes) do not each pay for the start of ffmpeg '
+                        f'(default: {FFMPEG_BATCH_SIZE}, 1 to run one ffmpeg process per file)')
+    parser.add_argument('--duplicates', choices=DUPLICATE_MODES, default=DUPLICATES_MODE,
+                        help=f'what to do with the files whose exact content is already in the\
+                        "Camera Uploads" folder: drop them, replace them by hardlinks to the\
+                        existing files, or keep them (default: {DUPLICATES_MODE})')
+    parser.add_argument('--near-duplicates', choices=NEAR_DUPLICATE_MODES, default=NEAR_DUPLICATES_MODE,
+                        help=f'look for near duplicates (e.g. recompressed copies) of the\
+                        incoming WhatsApp, Telegram and Instander images among the images of\
+                        the "Camera Uploads" folder with {default_algorithm()} perceptual hashes,\
+                        then report or drop them (default: {NEAR_DUPLICATES_MODE})')
+    parser.add_argument('--no-catalog', action='store_true',
+                        help=f'handle every file, even the unchanged files that the catalog\
+                        "{CATALOG_PATH}" records as already handled')
+    parser.add_argument('--metrics', default=METRICS_PATH, metavar='PATH',
+                        help=f'JSON file (or folder, in which a report is kept per run) in which\
+                        the duration, number of files, bytes and errors of every phase, section,\
+                        step and operation kind of the run are saved (default: "{METRICS_PATH}")')
+    parser.add_argument('--sequential', action='store_true',
+                        help='execute the plan batch by batch (e.g. all the conversions, then all\
+                        the moves) instead of as a pipeline in which the files that are ready\
+                        are moved while the next ones are still being converted')
+    parser.add_argument('--live-metrics', action='store_true',
+                        help='print the metrics of every step and batch of operations as soon as\
+                        they are recorded')
+    args = parser.parse_args(argv)
+    if args.watch and args.dry_run:
+        parser.error('argument --watch: not allowed with argument --dry-run')
+
+    return args
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs the program: renames, converts and moves the files of all the
+    sources, then keeps watching the directory in which media files are synced
+    (if asked to).
+
+    Args:
+        argv (list): List containing the command line arguments (those of the
+                     command line if None).
+
+    Returns:
+        exit_status (int): The exit status of the program.
+    """
+
+    global WATCH, WATCH_DEBOUNCE, WATCH_POLL_INTERVAL, DUPLICATES_MODE, NEAR_DUPLICATES_MODE, SEQUENTIAL, \
+        METRICS_PATH, METRICS, CATALOG, DRY_RUN, WAL, CONVERSION_CACHE, FFMPEG_BATCH_SIZE, ROOTS, \
+        MAX_CONVERSION_WORKERS, WAL_PATH, TRASH_PATH, CHECKPOINT_PATH, CHECKPOINTS
+
+    # Setting the current working directory automatically
+    project_path = os.getcwd()  # getting the path leading to the current working directory
+    # setting the current working directory based on the path leading to the current working directory
+    os.chdir(project_path)
+
+    ROOTS = [default_root(project_path)]
+    METRICS = Metrics()
+    # (List containing the paths of the snapshots of the roots)
+    snapshot_paths = []
+    if not DEBUG_MODE_ON:
+        args = parse_arguments(argv)
+        WATCH = args.watch
+        WATCH_DEBOUNCE = args.debounce
+        WATCH_POLL_INTERVAL = args.poll_interval
+        DUPLICATES_MODE = args.duplicates
+        NEAR_DUPLICATES_MODE = args.near_duplicates
+        SEQUENTIAL = args.sequential
+        FFMPEG_BATCH_SIZE = args.ffmpeg_batch_size
+        METRICS_PATH = args.metrics
+        METRICS = Metrics(args.live_metrics)
+        # Opening the catalog of the files handled by the previous runs
+        if not args.no_catalog or args.where:
+            CATALOG = Catalog(CATALOG_PATH)
+        if args.where:
+            rows = CATALOG.where(args.where)
+            for src, dst, status, error, updated in rows:
+                date = datetime.fromtimestamp(updated).strftime('%Y-%m-%d %H:%M:%S')
+                target = f' → {dst}' if dst is not None else ''
+                reason = f': {error}' if error is not None else ''
+                print(f'{src}{target} [{status}{reason}] ({date})')
+            print(f'{len(rows)} file(s) found in "{CATALOG_PATH}"')
+            CATALOG.close()
+            return 0
+        if args.rebuild:
+            try:
+                nb_reverted = rebuild_layout(args.rebuild)
+            except ValueError as e:
+                print(colored('⚠️  Warning!\n', 'red'), f'  The layout cannot be rebuilt: {e}')
+                return 1
+            print(f'{nb_reverted} operation(s) reverted from "{args.rebuild}"')
+            return 0
+        # Loading the roots to process (the write-ahead log, the trash and the
+        # checkpoints being kept next to the first one)
+        if args.config is not None or os.path.isfile(CONFIG_PATH):
+            config_path = args.config or CONFIG_PATH
+            try:
+                config = load_config(config_path, list(SOURCE_PLANNERS))
+            except (OSError, ValueError) as e:
+                print(colored('⚠️  Warning!\n', 'red'), f'  Invalid configuration file: {e}')
+                return 1
+            ROOTS = config.roots
+            if config.max_conversion_workers is not None:
+                MAX_CONVERSION_WORKERS = config.max_conversion_workers
+            WAL_PATH = ROOTS[0].path + '_WAL.jsonl'
+            TRASH_PATH = ROOTS[0].path + '_Trash'
+            CHECKPOINT_PATH = ROOTS[0].path + '_Checkpoints.json'
+        if args.max_conversion_workers is not None:
+            MAX_CONVERSION_WORKERS = max(args.max_conversion_workers, 1)
+        # Recovering from an interrupted previous run
+        if args.undo:
+            nb_reverted = undo_incomplete(WAL_PATH)
+            print(f'{nb_reverted} operation(s) rolled back from "{WAL_PATH}"')
+            return 0
+        DRY_RUN = args.dry_run
+        if args.resume:
+            nb_completed = resume_incomplete(WAL_PATH)
+            print(f'{nb_completed} operation(s) completed from "{WAL_PATH}"')
+        elif not DRY_RUN and len(incomplete_operations(WAL_PATH)) > 0:
+            print(colored('⚠️  Warning!\n', 'red'),
+                  f'  The previous run has been interrupted (cf. "{WAL_PATH}")! Run the\
+                  program with "--undo" or "--resume" first.')
+            return 1
+        if not DRY_RUN:
+            # Keeping the write-ahead log of the previous run (if any) for further investigations
+            if os.path.isfile(WAL_PATH):
+                wal_date = datetime.fromtimestamp(os.path.getmtime(WAL_PATH)).strftime("%Y-%m-%d_%H-%M-%S")
+                os.replace(WAL_PATH, WAL_PATH.replace('.jsonl', '_' + wal_date + '.jsonl'))
+            # Journaling every operation performed on the directory content (in order
+            # to be able to roll back or complete the operations of an interrupted run,
+            # and to identify where the error came from in the event that an error has
+            # occurred during the execution of the program below)
+            WAL = WriteAheadLog(WAL_PATH, TRASH_PATH)
+            # Checkpointing the sections as they are done (those of
+            # the interrupted run being kept when it is resumed)
+            if not args.resume and os.path.isfile(CHECKPOINT_PATH):
+                print(colored('⚠️  Warning!\n', 'red'),
+                      f'  The previous run has been interrupted before processing all the sources (cf.\
+                      "{CHECKPOINT_PATH}")! All of them are processed again (run the program with\
+                      "--resume" to skip those it completed).')
+            CHECKPOINTS = Checkpoints(CHECKPOINT_PATH, resume=args.resume)
+            # Snapshotting directory content (in order to keep all synchronised files intact)
+            if args.snapshot:
+                for root in ROOTS:
+                    snapshot_paths.append(snapshot_dir(root.path, args.snapshot_mode))
+                    WAL.plan(SNAPSHOT_OP, root.path, snapshot_paths[-1])
+            # Reusing the outputs of previous conversions of identical files
+            if not args.no_cache:
+                CONVERSION_CACHE = ConversionCache(CONVERSION_CACHE_PATH, args.cache_size * 1000000)
+
+    # Printing the plans of the sources without touching the disk (in case of
+    # a dry run)
+    if DRY_RUN:
+        process_roots({root: list(root.sources) for root in ROOTS})
+        save_metrics()
+        return 0
+
+    # Launching initial macOS X notification
+    notify(title='dropsync_shift_rename.py',
+           subtitle='Running dropsync_shift_rename.py script',
+           message='→ Renaming and moving process started...',
+           sound='Blow')
+
+    # Listing, planning and executing the sources one after another (the roots
+    # being processed concurrently)
+    _, nb_failed_operations, _ = process_roots({root: list(root.sources) for root in ROOTS})
+    if nb_failed_operations > 0:
+        print(colored('⚠️  Warning!\n', 'red'),
+              f'  {nb_failed_operations} operation(s) failed or have been skipped!')
+    # (The run not being interrupted anymore)
+    skipped_sources = set()
+    if CHECKPOINTS is not None:
+        skipped_sources = CHECKPOINTS.skipped_sources
+        CHECKPOINTS.remove()
+        CHECKPOINTS = None
+
+    # Evicting the least recently used conversion outputs from the cache
+    if CONVERSION_CACHE is not None:
+        CONVERSION_CACHE.evict()
+
+    # Listing the sources that had no file to handle (those completed by the
+    # resumed run excepted)
+    source_names = [source_name for source_name in SOURCE_PLANNERS
+                    if any(source_name in root.sources for root in ROOTS) and source_name not in skipped_sources]
+    idle_sources = METRICS.idle_sections(source_names)
+    if len(idle_sources) > 0:
+        print('\n⚠️ List of sources without files to handle:' + ''.join(f'\n • {source}' for source in idle_sources))
+    save_metrics()
+
+    # Launching final macOS X notification
+    if len(idle_sources) == len(source_names):
+        notify(title='dropsync_shift_rename.py',
+               subtitle='⚠️️ Process aborted!',
+               message='→ There are currently no files to move from DropsyncFiles to Camera Uploads!',
+               sound='Sosumi')
+    else:
+        notify(title='dropsync_shift_rename.py',
+               subtitle='🏆 Process successful!',
+               message='→ Files have been renamed and moved from DropsyncFiles to Camera Uploads!',
+               sound='Hero')
+
+    # Watching the directory in which media files are synced, and processing the
+    # sources in which new files arrive (until interrupted)
+    if WATCH:
+        root_paths = ', '.join(f'"{root.path}"' for root in ROOTS)
+        print(f'\nWatching {root_paths} for new files (press Ctrl+C to stop)...')
+        # (A thread per root queuing the bursts of arrived files, which are
+        # processed by the main thread)
+        changes = queue.Queue()
+        watchers = [open_watcher(root.path, WATCH_POLL_INTERVAL) for root in ROOTS]
+        for root, watcher in zip(ROOTS, watchers):
+            threading.Thread(target=watch_root, args=(root, watcher, changes), daemon=True).start()
+        produced_paths = set()
+        try:
+            while True:
+                root, changed_paths = changes.get()
+                changed_paths_by_root = {root: set(changed_paths)}
+                # (Taking the bursts of the other roots queued in the meantime along)
+                while not changes.empty():
+                    root, changed_paths = changes.get_nowait()
+                    changed_paths_by_root.setdefault(root, set()).update(changed_paths)
+                nb_operations, produced_paths = process_changes(
+                    {root: changed_paths - produced_paths for root, changed_paths in changed_paths_by_root.items()})
+                if nb_operations > 0:
+                    METRICS.save(METRICS_PATH)
+                    notify(title='dropsync_shift_rename.py',
+                           subtitle='🏆 New files processed!',
+                           message=f'→ {nb_operations} operation(s) performed on the new files of DropsyncFiles!',
+                           sound='Hero')
+        except KeyboardInterrupt:
+            print('\nStopped watching')
+        finally:
+            for watcher in watchers:
+                watcher.close()
+            if CONVERSION_CACHE is not None:
+                CONVERSION_CACHE.evict()
+
+    if CATALOG is not None:
+        CATALOG.close()
+
+    # Exiting the Terminal window (using AppleScript command) in case the program
+    # has been triggered by Alfred and the folder "/Users/anthony/Dropbox/DropsyncFiles/Media_UnidirectionalSync_AndroidToMac"
+    # (which path is stored in the variable "DROPSYNCFILES_DIRECTORY_PATH" and
+    # which corresonds to the directory in which media files are synced) has a size
+    # of less than 1[MB] (meaning that the program hence run successfully)
+    # Computing "Media_UnidirectionalSync_AndroidToMac" folder size
+    # (A new inventory is needed since the folder has been emptied in the meantime)
+    num_bytes = sum(Inventory(root.path).total_size() for root in ROOTS)
+    num_mega_bytes = round(num_bytes/1e6, 2)
+    # (Cf.: How do I close the Terminal in OSX from the command line? (https://superuser.com/questions/158375/how-do-i-close-the-terminal-in-osx-from-the-command-line/1385450))
+    if not DEBUG_MODE_ON:
+        if num_mega_bytes < 1:
+            run_applescript('tell application "iTerm2" to close first window')
+            # Removing write-ahead log (and snapshot) of directory in whch media
+            # files are synced only if the program run successfully (this way, if
+            # there was a problem in the execution of the program, the operations
+            # performed on the directory in which media files are synced remain
+            # recorded for further investigations)
+            WAL.close()
+            os.remove(WAL_PATH)
+            shutil.rmtree(TRASH_PATH, ignore_errors=True)
+            for snapshot_path in snapshot_paths:
+                shutil.rmtree(snapshot_path)
+        else:
+            warning_message = colored(
+                'WARNING!', 'red', attrs=['reverse', 'blink'])
+            print(f'{warning_message} Something may have gone wrong. The size of the \
+                    folder "Media_UnidirectionalSync_AndroidToMac" is not zero and amounts \
+                    to {num_mega_bytes}[MB]! Note that all the operations performed on \
+                    the directory in which media files are synced have been recorded in \
+                    "{WAL_PATH}" for further investigations (run the program with \
+                    "--rebuild" followed by this path to revert them).')
+            WAL.close()
+
+    return 0
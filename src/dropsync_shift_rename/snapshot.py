@@ -0,0 +1,129 @@
+# snapshot.py
+
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import platform
+import shutil
+from datetime import datetime
+
+# Initializations
+SNAPSHOT_MODES: tuple = ('auto', 'reflink', 'hardlink', 'copy')
+# (Linux "FICLONE" ioctl request number, cf. "ioctl_ficlone(2)")
+FICLONE: int = 0x40049409
+# (Errors meaning that linking/cloning is not possible between the two paths,
+# in which case the file is copied instead)
+LINK_FALLBACK_ERRNOS: tuple = (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP)
+
+
+def reflink_file(src_path: str, dst_path: str):
+    """
+    Creates a copy-on-write clone of a file (APFS "clonefile" on macOS,
+    "FICLONE" ioctl on Linux filesystems such as Btrfs or XFS).
+
+    Args:
+        src_path (str): Path of the file to clone.
+        dst_path (str): Path of the clone to create.
+
+    Raises:
+        OSError: If the filesystem does not support reflinks.
+    """
+
+    if platform.system() == 'Darwin':
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if libc.clonefile(os.fsencode(src_path), os.fsencode(dst_path), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), dst_path)
+        return
+
+    import fcntl
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            # Not leaving an empty file behind
+            dst.close()
+            os.remove(dst_path)
+            raise
+    shutil.copystat(src_path, dst_path)
+
+
+def snapshot_file(src_path: str, dst_path: str, mode: str = 'auto', device_modes: dict = None) -> str:
+    """
+    Puts a single file in the snapshot tree without duplicating its content
+    whenever possible (reflink, then hardlink), falling back to a plain copy
+    only when the two paths cannot share their data blocks (e.g. across devices).
+
+    Args:
+        src_path (str): Path of the file to snapshot.
+        dst_path (str): Path of the file in the snapshot tree.
+        mode (str): One of "auto", "reflink", "hardlink" or "copy".
+        device_modes (dict): Dict mapping the devices of the files snapshotted
+                             so far to the first mode they support, updated
+                             by the function so that a mode that a device
+                             does not support (e.g. reflinks on ext4) is only
+                             tried once per device (every mode being tried for
+                             every file if None).
+
+    Returns:
+        used_mode (str): The mode that has actually been used for this file.
+    """
+
+    device = None
+    if device_modes is not None:
+        device = os.lstat(src_path).st_dev
+        mode = device_modes.get(device, mode)
+    if mode in ('auto', 'reflink'):
+        try:
+            reflink_file(src_path, dst_path)
+            return 'reflink'
+        except (OSError, AttributeError):
+            # Reflinks not supported by the filesystem (or by the platform)
+            if device_modes is not None:
+                device_modes[device] = 'hardlink'
+    if mode in ('auto', 'reflink', 'hardlink'):
+        try:
+            os.link(src_path, dst_path, follow_symlinks=False)
+            return 'hardlink'
+        except OSError as e:
+            if e.errno not in LINK_FALLBACK_ERRNOS:
+                raise
+            # (Hardlinks not supported, unless the file only has too many of
+            # them already)
+            if device_modes is not None and e.errno != errno.EMLINK:
+                device_modes[device] = 'copy'
+    shutil.copy2(src_path, dst_path)
+    return 'copy'
+
+
+def snapshot_dir(dir_path: str, mode: str = 'auto') -> str:
+    """
+    Creates a snapshot of the directory in which media files are synced using
+    Dropsync Ultimate Android app. The tree structure is recreated but the
+    files are reflinked or hardlinked into it, so that the cost of the snapshot
+    is proportional to the number of files instead of their total size.
+
+    Args:
+        dir_path (str): Source directory path in which media files are synced.
+        mode (str): One of "auto", "reflink", "hardlink" or "copy".
+
+    Returns:
+        dir_path_dst (str): Destination directory path (i.e., directory holding
+                            the snapshot of the source directory).
+    """
+
+    # Computing current date
+    now = datetime.now()
+    dt_string = now.strftime("%Y-%m-%d_%H-%M-%S")
+    # Defining source and destination directories
+    dir_path_src = dir_path
+    dir_path_dst = dir_path_src + '_Snapshot_' + dt_string
+    # Snapshotting source directory (and its entire content, including hidden files) to destination directory
+    # (the modes supported by each device being probed on its first file only)
+    device_modes = {}
+    shutil.copytree(dir_path_src, dir_path_dst, symlinks=False,
+                    copy_function=lambda src, dst: snapshot_file(src, dst, mode, device_modes))
+
+    return dir_path_dst
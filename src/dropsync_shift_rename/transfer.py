@@ -0,0 +1,360 @@
+# transfer.py
+
+
+import errno
+import os
+import platform
+import shutil
+import time
+from typing import NamedTuple
+
+# Initializations
+RENAMED_STATUS: str = 'renamed'
+COPIED_STATUS: str = 'copied'
+FAILED_STATUS: str = 'failed'
+# (Chunk size of the kernel-side copies used to transfer a file to another device)
+COPY_CHUNK_SIZE: int = 64 * 1024 * 1024
+# (A batch of cross-device transfers is made durable, and its sources removed,
+# once it reaches either of these sizes)
+TRANSFER_BATCH_FILES: int = 256
+TRANSFER_BATCH_BYTES: int = 2 * 1024 * 1024 * 1024
+# (Errors meaning that a kernel-side copy primitive cannot be used for a pair of files)
+KERNEL_COPY_FALLBACK_ERRNOS: tuple = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP,
+                                      errno.EOPNOTSUPP, errno.ENOTSOCK, errno.EBADF)
+
+
+class MoveResult(NamedTuple):
+    """
+    Status of a single file move.
+    """
+
+    src: str
+    dst: str
+    status: str
+    error: str = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status != FAILED_STATUS
+
+
+class TransferStats(NamedTuple):
+    """
+    Throughput of a set of cross-device transfers.
+    """
+
+    nb_files: int
+    nb_bytes: int
+    seconds: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.nb_bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return f'{self.nb_files} file(s), {self.nb_bytes / 1e6:.1f}[MB] transferred ' \
+               f'in {self.seconds:.2f}[s] ({self.bytes_per_second / 1e6:.1f}[MB/s])'
+
+
+def copy_file_contents(src_path: str, dst_path: str) -> int:
+    """
+    Copies the content of a file using kernel-side copies in large chunks
+    ("copy_file_range", then "sendfile"), so that the data never goes through
+    userspace buffers, falling back to "shutil.copyfile" (which itself uses
+    "fcopyfile" on macOS) when neither is supported.
+
+    Args:
+        src_path (str): Path of the file to copy.
+        dst_path (str): Path of the copy (truncated if it exists).
+
+    Returns:
+        nb_bytes (int): Number of bytes copied.
+    """
+
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        size = os.fstat(src.fileno()).st_size
+        for copy_function in ('copy_file_range', 'sendfile'):
+            if not hasattr(os, copy_function):
+                continue
+            offset = 0
+            try:
+                while offset < size:
+                    if copy_function == 'copy_file_range':
+                        nb_copied = os.copy_file_range(src.fileno(), dst.fileno(), COPY_CHUNK_SIZE,
+                                                       offset, offset)
+                    else:
+                        nb_copied = os.sendfile(dst.fileno(), src.fileno(), offset, COPY_CHUNK_SIZE)
+                    if nb_copied == 0:
+                        break
+                    offset += nb_copied
+                return offset
+            except OSError as e:
+                if e.errno not in KERNEL_COPY_FALLBACK_ERRNOS or offset > 0:
+                    raise
+    shutil.copyfile(src_path, dst_path)
+
+    return size
+
+
+def full_fsync(fd: int):
+    """
+    Flushes a file (or folder) to the storage device. On macOS, "fsync" only
+    hands the data to the drive, which may keep it in its cache, so the
+    "F_FULLFSYNC" control is used instead (falling back to "fsync" where the
+    filesystem does not support it).
+
+    Args:
+        fd (int): File descriptor of the file.
+    """
+
+    if platform.system() == 'Darwin':
+        import fcntl
+        try:
+            fcntl.fcntl(fd, fcntl.F_FULLFSYNC)
+            return
+        except OSError:
+            pass
+    os.fsync(fd)
+
+
+def sync_batch(file_paths: list, dir_paths: set):
+    """
+    Makes a batch of written files durable: each file is flushed to the
+    storage device (cf. "full_fsync"), then the folders holding them so that
+    their entries are durable too.
+
+    Args:
+        file_paths (list): List containing the paths of the written files.
+        dir_paths (set): Set containing the paths of the folders holding them.
+    """
+
+    for file_path in file_paths:
+        with open(file_path, 'rb') as f:
+            full_fsync(f.fileno())
+    for dir_path in dir_paths:
+        try:
+            fd = os.open(dir_path, os.O_RDONLY)
+        except OSError:
+            # (Folders cannot be opened on Windows)
+            continue
+        try:
+            full_fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def temporary_path(dst_path: str) -> str:
+    """
+    Returns the path of the hidden temporary file in which a file is
+    transferred before being atomically renamed to its destination path.
+
+    Args:
+        dst_path (str): Path of the destination file.
+
+    Returns:
+        temp_path (str): Path of the temporary file.
+    """
+
+    return os.path.join(os.path.dirname(dst_path), '.' + os.path.basename(dst_path) + '.part')
+
+
+def copy_then_remove(src_path: str, dst_path: str) -> int:
+    """
+    Moves a file to another device by copying its content to a temporary
+    file next to the destination, making it durable, atomically renaming it
+    once complete and then, once the rename is durable too, removing the
+    source file.
+
+    Args:
+        src_path (str): Path of the file to move.
+        dst_path (str): Path of the destination file.
+
+    Returns:
+        nb_bytes (int): Number of bytes transferred.
+    """
+
+    temp_path = temporary_path(dst_path)
+    try:
+        nb_bytes = copy_file_contents(src_path, temp_path)
+        shutil.copystat(src_path, temp_path)
+        sync_batch([temp_path], set())
+        os.replace(temp_path, dst_path)
+    except BaseException:
+        # Not leaving a partial file behind
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        raise
+    sync_batch([], {os.path.dirname(dst_path)})
+    os.remove(src_path)
+
+    return nb_bytes
+
+
+def move_file(src_path: str, dst_path: str, dst_device: int = None) -> MoveResult:
+    """
+    Moves a file in-process: renames it when the source and the destination
+    are on the same device and copies it (cf. "copy_then_remove") otherwise.
+
+    Args:
+        src_path (str): Path of the file to move.
+        dst_path (str): Path of the destination file (replaced if it exists).
+        dst_device (int): Device of the destination folder (computed if not
+                          given, which costs a stat per file).
+
+    Returns:
+        result (MoveResult): The status of the move.
+    """
+
+    try:
+        if dst_device is None:
+            dst_device = os.stat(os.path.dirname(dst_path)).st_dev
+        if os.lstat(src_path).st_dev == dst_device:
+            os.replace(src_path, dst_path)
+            return MoveResult(src_path, dst_path, RENAMED_STATUS)
+        copy_then_remove(src_path, dst_path)
+        return MoveResult(src_path, dst_path, COPIED_STATUS)
+    except OSError as e:
+        return MoveResult(src_path, dst_path, FAILED_STATUS, str(e))
+
+
+def _discard(file_path: str):
+    """
+    Removes a file if it exists, ignoring errors (used to roll transfers back).
+
+    Args:
+        file_path (str): Path of the file.
+    """
+
+    try:
+        if os.path.lexists(file_path):
+            os.remove(file_path)
+    except OSError:
+        pass
+
+
+def _commit_batch(batch: list):
+    """
+    Makes a batch of files copied to their temporary files durable, renames
+    them to their destination paths and removes their sources. Every file is
+    reported on its own: a file whose rename or source removal fails is rolled
+    back (its copy removed, its source kept) without failing the others.
+
+    Args:
+        batch (list): List containing the (source path, destination path,
+                      number of bytes) tuples of the copied files.
+
+    Yields:
+        (move_result, nb_bytes) (tuple): The status (MoveResult) of each
+        transfer and its number of transferred bytes.
+    """
+
+    temp_paths = [temporary_path(dst_path) for _, dst_path, _ in batch]
+    try:
+        sync_batch(temp_paths, set())
+    except OSError as e:
+        for (src_path, dst_path, _), temp_path in zip(batch, temp_paths):
+            _discard(temp_path)
+            yield MoveResult(src_path, dst_path, FAILED_STATUS, str(e)), 0
+        return
+    # (List containing the tuples of the files renamed to their destination paths)
+    renamed = []
+    for (src_path, dst_path, nb_bytes), temp_path in zip(batch, temp_paths):
+        try:
+            os.replace(temp_path, dst_path)
+        except OSError as e:
+            _discard(temp_path)
+            yield MoveResult(src_path, dst_path, FAILED_STATUS, str(e)), 0
+            continue
+        renamed.append((src_path, dst_path, nb_bytes))
+    try:
+        sync_batch([], {os.path.dirname(dst_path) for _, dst_path, _ in renamed})
+    except OSError as e:
+        # Rolling the renamed files back, their sources being kept
+        for src_path, dst_path, _ in renamed:
+            _discard(dst_path)
+            yield MoveResult(src_path, dst_path, FAILED_STATUS, str(e)), 0
+        return
+    # Removing the sources only once their copies are durable
+    for src_path, dst_path, nb_bytes in renamed:
+        try:
+            os.remove(src_path)
+        except OSError as e:
+            # Rolling the copy back, so that the next run does not transfer
+            # the file a second time
+            _discard(dst_path)
+            yield MoveResult(src_path, dst_path, FAILED_STATUS, str(e)), 0
+            continue
+        yield MoveResult(src_path, dst_path, COPIED_STATUS), nb_bytes
+
+
+def iter_transfers(file_pairs):
+    """
+    Moves files to another device in batches: the files of a batch are copied
+    with kernel-side copies to temporary files, the whole batch is then made
+    durable at once, the temporary files are atomically renamed to their
+    destination paths and only then are the source files removed (cf.
+    "_commit_batch"). The file pairs are consumed lazily and the status of the
+    files of every batch is yielded as soon as the batch is durable, so that
+    only one batch is held in memory.
+
+    Args:
+        file_pairs (iterable): Iterable of the (source path, destination path)
+                               tuples of the files to transfer.
+
+    Yields:
+        (move_result, nb_bytes) (tuple): The status (MoveResult) of each
+        transfer and its number of transferred bytes.
+    """
+
+    # (List containing the (source path, destination path, number of bytes)
+    # tuples of the files copied but not made durable yet)
+    batch = []
+    batch_nb_bytes = 0
+    file_pairs = iter(file_pairs)
+    while True:
+        file_pair = next(file_pairs, None)
+        if file_pair is not None:
+            src_path, dst_path = file_pair
+            temp_path = temporary_path(dst_path)
+            try:
+                nb_copied = copy_file_contents(src_path, temp_path)
+                shutil.copystat(src_path, temp_path)
+                batch.append((src_path, dst_path, nb_copied))
+                batch_nb_bytes += nb_copied
+            except OSError as e:
+                _discard(temp_path)
+                yield MoveResult(src_path, dst_path, FAILED_STATUS, str(e)), 0
+            if len(batch) < TRANSFER_BATCH_FILES and batch_nb_bytes < TRANSFER_BATCH_BYTES:
+                continue
+        if len(batch) > 0:
+            yield from _commit_batch(batch)
+            batch, batch_nb_bytes = [], 0
+        if file_pair is None:
+            return
+
+
+def transfer_files(file_pairs) -> tuple:
+    """
+    Moves files to another device in durable batches (cf. "iter_transfers").
+
+    Args:
+        file_pairs (iterable): Iterable of the (source path, destination path)
+                               tuples of the files to transfer.
+
+    Returns:
+        (move_results, transfer_stats) (tuple): List containing the status
+        (MoveResult) of each transfer, and the throughput (TransferStats) of
+        the successful ones.
+    """
+
+    move_results = []
+    nb_files, nb_bytes = 0, 0
+    start = time.perf_counter()
+    for move_result, nb_transferred in iter_transfers(file_pairs):
+        move_results.append(move_result)
+        if move_result.ok:
+            nb_files += 1
+            nb_bytes += nb_transferred
+    transfer_stats = TransferStats(nb_files, nb_bytes, time.perf_counter() - start)
+
+    return move_results, transfer_stats
@@ -0,0 +1,258 @@
+# watch.py
+
+
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import struct
+import time
+
+# Initializations
+# (inotify event masks, cf. "/usr/include/linux/inotify.h")
+IN_CLOSE_WRITE: int = 0x00000008
+IN_MOVED_TO: int = 0x00000080
+IN_CREATE: int = 0x00000100
+IN_DELETE_SELF: int = 0x00000400
+IN_Q_OVERFLOW: int = 0x00004000
+IN_IGNORED: int = 0x00008000
+IN_ONLYDIR: int = 0x01000000
+IN_ISDIR: int = 0x40000000
+IN_CLOEXEC: int = 0o2000000
+# (Events meaning that a file has arrived: written and closed, or moved in
+# (e.g. renamed from a temporary name once completely synced))
+WATCH_MASK: int = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct('iIII')
+EVENT_BUFFER_SIZE: int = 64 * 1024
+# (Default quiet period in [s] closing a burst of events, and maximum delay in
+# [s] after which a burst is closed anyway, so that a continuous stream of
+# arrivals is still processed)
+DEBOUNCE_DELAY: float = 2.0
+MAX_BURST_DURATION: float = 30.0
+# (Default interval in [s] between two scans of the polling watcher)
+POLL_INTERVAL: float = 5.0
+
+
+class InotifyWatcher:
+    """
+    Watches a directory tree for arriving files with inotify (Linux only),
+    through ctypes since the standard library has no binding for it. Every
+    folder of the tree is watched, including the folders created afterwards.
+    """
+
+    def __init__(self, root_path: str):
+        """
+        Args:
+            root_path (str): Path of the directory tree to watch.
+        """
+
+        self.root_path = os.path.normpath(root_path)
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        # (Dict mapping every watch descriptor to the path of the watched folder)
+        self._watches = {}
+        self._watch_tree(self.root_path)
+
+    def _watch_tree(self, dir_path: str) -> list:
+        """
+        Watches a folder and its subfolders.
+
+        Returns:
+            file_paths (list): List containing the paths of the files already in
+            the folders (which may have arrived before they were watched).
+        """
+
+        file_paths = []
+        for folder_path, _, file_names in os.walk(dir_path):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder_path), WATCH_MASK)
+            if wd < 0:
+                # (The folder may have been removed in the meantime)
+                continue
+            self._watches[wd] = folder_path
+            file_paths += [os.path.join(folder_path, file_name) for file_name in file_names]
+
+        return file_paths
+
+    def read(self, timeout: float = None) -> list:
+        """
+        Waits for files to arrive.
+
+        Args:
+            timeout (float): Maximum duration in [s] of the wait (forever if None).
+
+        Returns:
+            changed_paths (list): List containing the paths of the arrived files
+            (empty if none arrived before the timeout). The root path is returned
+            when events have been lost, meaning that the whole tree may have
+            changed.
+        """
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if len(readable) == 0:
+            return []
+        buffer = os.read(self._fd, EVENT_BUFFER_SIZE)
+        changed_paths = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + name_length].rstrip(b'\0'))
+            offset += name_length
+            if mask & IN_Q_OVERFLOW:
+                changed_paths.append(self.root_path)
+                continue
+            if mask & IN_IGNORED or wd not in self._watches:
+                self._watches.pop(wd, None)
+                continue
+            path = os.path.join(self._watches[wd], name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed_paths += self._watch_tree(path)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changed_paths.append(path)
+
+        return changed_paths
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """
+    Watches a directory tree for arriving files by scanning it at regular
+    intervals (on platforms without inotify), reporting the files that are new
+    or whose size or modification date changed since the previous scan.
+    """
+
+    def __init__(self, root_path: str, interval: float = POLL_INTERVAL):
+        """
+        Args:
+            root_path (str): Path of the directory tree to watch.
+            interval (float): Interval in [s] between two scans.
+        """
+
+        self.root_path = os.path.normpath(root_path)
+        self.interval = interval
+        self._state = self._scan()
+
+    def _scan(self) -> dict:
+        state = {}
+        folders_to_scan = [self.root_path]
+        while len(folders_to_scan) > 0:
+            try:
+                with os.scandir(folders_to_scan.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders_to_scan.append(entry.path)
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        state[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+        return state
+
+    def read(self, timeout: float = None) -> list:
+        """
+        Waits for files to arrive (cf. "InotifyWatcher.read").
+
+        Args:
+            timeout (float): Maximum duration in [s] of the wait (forever if None).
+
+        Returns:
+            changed_paths (list): List containing the paths of the arrived files.
+        """
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            delay = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            time.sleep(max(delay, 0))
+            state = self._scan()
+            changed_paths = [path for path, signature in state.items() if self._state.get(path) != signature]
+            self._state = state
+            if len(changed_paths) > 0 or (deadline is not None and time.monotonic() >= deadline):
+                return changed_paths
+
+    def close(self):
+        pass
+
+
+def open_watcher(root_path: str, poll_interval: float = POLL_INTERVAL):
+    """
+    Opens an inotify watcher on Linux, falling back to a polling watcher
+    elsewhere or if inotify cannot be used (e.g. too many watches).
+
+    Args:
+        root_path (str): Path of the directory tree to watch.
+        poll_interval (float): Interval in [s] between two scans of the polling
+                               watcher.
+
+    Returns:
+        watcher (InotifyWatcher or PollingWatcher): The watcher.
+    """
+
+    if platform.system() == 'Linux':
+        try:
+            return InotifyWatcher(root_path)
+        except (OSError, AttributeError):
+            pass
+
+    return PollingWatcher(root_path, poll_interval)
+
+
+def debounced_changes(watcher, debounce: float = DEBOUNCE_DELAY, max_burst_duration: float = MAX_BURST_DURATION):
+    """
+    Groups the files arriving in bursts (e.g. a whole WhatsApp conversation
+    being synced), yielding the paths of a burst once no file arrived for the
+    debounce delay. Hidden files (e.g. temporary files of the sync app) are
+    ignored.
+
+    Args:
+        watcher (InotifyWatcher or PollingWatcher): The watcher.
+        debounce (float): Quiet period in [s] closing a burst.
+        max_burst_duration (float): Maximum duration in [s] of a burst.
+
+    Yields:
+        changed_paths (set): Set containing the paths of the files of a burst.
+    """
+
+    while True:
+        changed_paths = set(watcher.read())
+        burst_end = time.monotonic() + max_burst_duration
+        while time.monotonic() < burst_end:
+            paths = watcher.read(debounce)
+            if len(paths) == 0:
+                break
+            changed_paths.update(paths)
+        changed_paths = {path for path in changed_paths if not os.path.basename(path).startswith('.')}
+        if len(changed_paths) > 0:
+            yield changed_paths
+
+
+def changed_folders(changed_paths: set, root_path: str) -> set:
+    """
+    Returns the names of the top-level folders of a tree in which files changed.
+
+    Args:
+        changed_paths (set): Set containing the paths of the changed files.
+        root_path (str): Path of the tree.
+
+    Returns:
+        folder_names (set): Set containing the names of the top-level folders
+        (all of them if the root path itself is among the changed paths).
+    """
+
+    root_path = os.path.normpath(root_path)
+    folder_names = set()
+    for path in changed_paths:
+        relative_path = os.path.relpath(path, root_path)
+        if relative_path == '.':
+            return {entry.name for entry in os.scandir(root_path) if entry.is_dir()}
+        if not relative_path.startswith('..') and os.sep in relative_path:
+            folder_names.add(relative_path.split(os.sep)[0])
+
+    return folder_names
@@ -0,0 +1,128 @@
+# test_checkpoint.py
+
+
+import json
+import os
+
+import pytest
+
+from dropsync_shift_rename.checkpoint import (Checkpoints, folder_dates, folders_unchanged,
+                                              read_checkpoints)
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / 'root'
+    (root / 'WhatsApp' / 'WhatsApp Images').mkdir(parents=True)
+    (root / 'WhatsApp' / 'WhatsApp Images' / 'IMG-20210501-WA0001.jpg').write_bytes(b'')
+    (root / 'Telegram').mkdir()
+    # (Dating the folders in the past, so that any change made by a test
+    # changes their modification dates whatever the resolution of the
+    # filesystem)
+    for folder_path in (root / 'WhatsApp', root / 'WhatsApp' / 'WhatsApp Images', root / 'Telegram'):
+        os.utime(folder_path, ns=(0, 0))
+
+    return root
+
+
+def test_unchanged_tree_is_detected(root):
+    dates = folder_dates(str(root / 'WhatsApp'))
+
+    assert set(dates) == {'.', 'WhatsApp Images'}
+    assert folders_unchanged(str(root / 'WhatsApp'), dates)
+
+
+@pytest.mark.parametrize('change', ['add_file', 'add_folder', 'remove_folder'])
+def test_changes_in_any_folder_are_detected(root, change):
+    dates = folder_dates(str(root / 'WhatsApp'))
+    if change == 'add_file':
+        (root / 'WhatsApp' / 'WhatsApp Images' / 'IMG-20210501-WA0002.jpg').write_bytes(b'')
+    elif change == 'add_folder':
+        (root / 'WhatsApp' / 'WhatsApp Video').mkdir()
+    else:
+        os.remove(root / 'WhatsApp' / 'WhatsApp Images' / 'IMG-20210501-WA0001.jpg')
+        os.rmdir(root / 'WhatsApp' / 'WhatsApp Images')
+
+    assert not folders_unchanged(str(root / 'WhatsApp'), dates)
+
+
+def test_missing_folder_is_unchanged_while_missing(root):
+    dates = folder_dates(str(root / 'Snapchat'))
+
+    assert dates == {'.': None} and folders_unchanged(str(root / 'Snapchat'), dates)
+    (root / 'Snapchat').mkdir()
+    assert not folders_unchanged(str(root / 'Snapchat'), dates)
+
+
+def test_resumed_run_skips_unchanged_sections_only(tmp_path, root):
+    checkpoint_path = str(tmp_path / 'checkpoints.json')
+    checkpoints = Checkpoints(checkpoint_path)
+    checkpoints.section_done(str(root), 'WhatsApp')
+    checkpoints.section_done(str(root), 'Telegram')
+    # (The run being interrupted, then files arriving in one of the sections)
+    (root / 'Telegram' / '5012345678_123456.jpg').write_bytes(b'')
+
+    checkpoints = Checkpoints(checkpoint_path, resume=True)
+
+    assert checkpoints.is_done(str(root), 'WhatsApp')
+    assert not checkpoints.is_done(str(root), 'Telegram')
+    assert not checkpoints.is_done(str(root), 'Snapchat')
+    assert checkpoints.skipped_sources == {'WhatsApp'}
+    # (The skipped section being kept for a next resume)
+    assert list(read_checkpoints(checkpoint_path)['sections']) == [f'{root}|WhatsApp']
+
+
+def test_new_run_ignores_previous_checkpoints(tmp_path, root):
+    checkpoint_path = str(tmp_path / 'checkpoints.json')
+    Checkpoints(checkpoint_path).section_done(str(root), 'WhatsApp')
+
+    checkpoints = Checkpoints(checkpoint_path)
+
+    assert not checkpoints.is_done(str(root), 'WhatsApp')
+    assert read_checkpoints(checkpoint_path) == {'sections': {}}
+
+
+def test_completed_run_removes_its_checkpoints(tmp_path, root):
+    checkpoint_path = str(tmp_path / 'checkpoints.json')
+    checkpoints = Checkpoints(checkpoint_path)
+    checkpoints.section_done(str(root), 'WhatsApp')
+    checkpoints.remove()
+
+    assert not os.path.exists(checkpoint_path)
+    assert not Checkpoints(checkpoint_path, resume=True).is_done(str(root), 'WhatsApp')
+
+
+@pytest.mark.parametrize('content', ['{"sections": {"', '[]', json.dumps({'sections': {'x|y': {'done': 1}}})])
+def test_unreadable_checkpoints_are_ignored(tmp_path, root, content):
+    checkpoint_path = tmp_path / 'checkpoints.json'
+    checkpoint_path.write_text(content, encoding='utf-8')
+
+    assert not Checkpoints(str(checkpoint_path), resume=True).is_done('x', 'y')
+
+
+def test_resumed_processing_skips_completed_sections(tmp_path, root, monkeypatch):
+    # (The warnings of the planning being colored)
+    pytest.importorskip('termcolor')
+    from dropsync_shift_rename import shift_rename
+    from dropsync_shift_rename.config import Root
+    from dropsync_shift_rename.metrics import Metrics
+    from dropsync_shift_rename.names import NameIndex
+
+    monkeypatch.setattr(shift_rename, 'METRICS', Metrics())
+    checkpoint_path = str(tmp_path / 'checkpoints.json')
+    test_root = Root('test', str(root), str(tmp_path / 'Camera Uploads'), ('Telegram',))
+    # (The section having nothing to do, it is done once planned)
+    monkeypatch.setattr(shift_rename, 'CHECKPOINTS', Checkpoints(checkpoint_path))
+    shift_rename.process_sources(test_root, ['Telegram'], NameIndex())
+    planned_sources = []
+    plan_sources = shift_rename.plan_sources
+
+    def recording_plan_sources(root, source_names, *args):
+        planned_sources.extend(source_names)
+        return plan_sources(root, source_names, *args)
+
+    monkeypatch.setattr(shift_rename, 'plan_sources', recording_plan_sources)
+    monkeypatch.setattr(shift_rename, 'CHECKPOINTS', Checkpoints(checkpoint_path, resume=True))
+
+    assert shift_rename.process_sources(test_root, ['Telegram'], NameIndex()) == (0, 0, set())
+    assert planned_sources == []
@@ -0,0 +1,88 @@
+# test_config.py
+
+
+import importlib.util
+import os
+
+import pytest
+
+from dropsync_shift_rename.config import Root, load_config
+
+# Initializations
+SOURCE_NAMES: list = ['WhatsApp', 'Telegram', 'Snapchat']
+
+
+@pytest.fixture(autouse=True)
+def toml_reader():
+    # (Part of the standard library from Python 3.11 on)
+    if importlib.util.find_spec('tomllib') is None:
+        pytest.importorskip('tomli')
+
+
+def write_config(tmp_path, content: str, name: str = 'config.toml') -> str:
+    config_path = tmp_path / name
+    config_path.write_text(content, encoding='utf-8')
+
+    return str(config_path)
+
+
+def test_roots_are_loaded_with_their_sources(tmp_path):
+    config_path = write_config(tmp_path, f"""
+max_conversion_workers = 2
+
+[[roots]]
+name = "Pixel"
+path = "{tmp_path}/Pixel/"
+destination = "{tmp_path}/Camera Uploads"
+
+[[roots]]
+path = "{tmp_path}/Galaxy"
+destination = "{tmp_path}/Camera Uploads"
+sources = ["Telegram"]
+""")
+
+    config = load_config(config_path, SOURCE_NAMES)
+
+    destination = os.path.join(str(tmp_path), 'Camera Uploads')
+    assert config.roots == [Root('Pixel', os.path.join(str(tmp_path), 'Pixel'), destination, tuple(SOURCE_NAMES)),
+                            Root('Galaxy', os.path.join(str(tmp_path), 'Galaxy'), destination, ('Telegram',))]
+    assert config.max_conversion_workers == 2
+
+
+def test_home_folder_is_expanded(tmp_path):
+    config_path = write_config(tmp_path, """
+[[roots]]
+path = "~/Dropbox/DropsyncFiles"
+destination = "~/Dropbox/Camera Uploads"
+""")
+
+    root = load_config(config_path, SOURCE_NAMES).roots[0]
+
+    assert root.path == os.path.expanduser(os.path.join('~', 'Dropbox', 'DropsyncFiles'))
+    assert root.name == 'DropsyncFiles'
+
+
+@pytest.mark.parametrize('content, message', [
+    ('max_conversion_workers = 2', 'lists no roots'),
+    ('roots = []', 'lists no roots'),
+    ('[[roots]]\npath = "/a"', 'has no "path" or no "destination"'),
+    ('[[roots]]\npath = "/a"\ndestination = "/c"\nsources = ["Signal"]', "unknown source(s) 'Signal'"),
+    ('[[roots]]\npath = "/a"\ndestination = "/c"\n[[roots]]\npath = "/a/"\ndestination = "/d"',
+     'lists a same root several times'),
+    ('max_conversion_workers = 0\n[[roots]]\npath = "/a"\ndestination = "/c"', 'is not a positive integer'),
+    ('max_conversion_workers = "4"\n[[roots]]\npath = "/a"\ndestination = "/c"', 'is not a positive integer'),
+    ('[[roots]\npath = "/a"', 'is not valid TOML'),
+])
+def test_invalid_configurations_are_rejected(tmp_path, content, message):
+    config_path = write_config(tmp_path, content)
+
+    with pytest.raises(ValueError) as e:
+        load_config(config_path, SOURCE_NAMES)
+    assert message in str(e.value)
+
+
+def test_unknown_file_types_are_rejected(tmp_path):
+    config_path = write_config(tmp_path, '{}', name='config.json')
+
+    with pytest.raises(ValueError, match='neither a TOML nor a YAML file'):
+        load_config(config_path, SOURCE_NAMES)
@@ -0,0 +1,85 @@
+# test_conversion.py
+
+
+import os
+import subprocess
+
+import pytest
+
+from dropsync_shift_rename import conversion
+from dropsync_shift_rename.conversion import audio_batch_to_mp3, batches
+from dropsync_shift_rename.transfer import temporary_path
+
+
+@pytest.fixture
+def ffmpeg_runs(monkeypatch):
+    """
+    Replaces ffmpeg with a fake one, failing on the inputs whose name contains
+    "corrupt" and writing its outputs otherwise.
+
+    Returns:
+        ffmpeg_runs (list): List containing the lists of the inputs of every
+        ffmpeg run.
+    """
+
+    ffmpeg_runs = []
+
+    def fake_run(command, **kwargs):
+        inputs = [command[i + 1] for i, arg in enumerate(command) if arg == '-i']
+        outputs = [command[i + 2] for i, arg in enumerate(command) if arg == '-f']
+        ffmpeg_runs.append(inputs)
+        if any('corrupt' in input_path for input_path in inputs):
+            return subprocess.CompletedProcess(command, 1, stderr=b'corrupt.opus: Invalid data found\n')
+        for output_path in outputs:
+            with open(output_path, 'wb') as f:
+                f.write(b'mp3')
+        return subprocess.CompletedProcess(command, 0, stderr=b'')
+
+    monkeypatch.setattr(conversion.subprocess, 'run', fake_run)
+
+    return ffmpeg_runs
+
+
+def audio_pairs(tmp_path, names: list) -> list:
+    file_pairs = []
+    for name in names:
+        (tmp_path / name).write_bytes(b'opus')
+        file_pairs.append((str(tmp_path / name), str(tmp_path / name.replace('.opus', '.mp3'))))
+
+    return file_pairs
+
+
+def test_batch_is_converted_by_a_single_process(tmp_path, ffmpeg_runs):
+    file_pairs = audio_pairs(tmp_path, ['a.opus', 'b.opus', 'c.opus'])
+
+    results = audio_batch_to_mp3(file_pairs)
+
+    assert [result.ok for result in results] == [True] * 3
+    assert ffmpeg_runs == [[src_path for src_path, _ in file_pairs]]
+    for _, dst_path in file_pairs:
+        assert os.path.isfile(dst_path) and not os.path.exists(temporary_path(dst_path))
+
+
+def test_failed_batch_is_converted_again_file_by_file(tmp_path, ffmpeg_runs):
+    file_pairs = audio_pairs(tmp_path, ['a.opus', 'corrupt.opus', 'c.opus'])
+
+    results = audio_batch_to_mp3(file_pairs)
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error == 'ffmpeg exited with code 1 (corrupt.opus: Invalid data found)'
+    assert ffmpeg_runs[1:] == [[src_path] for src_path, _ in file_pairs]
+    # (No output of the failed batch being left behind)
+    assert sorted(os.listdir(tmp_path)) == ['a.mp3', 'a.opus', 'c.mp3', 'c.opus', 'corrupt.opus']
+
+
+@pytest.mark.parametrize('nb_items, batch_size, nb_batches, sizes', [
+    (10, 4, 1, [4, 4, 2]),
+    # (Too few items to fill the batches of every worker, hence smaller ones)
+    (5, 4, 3, [2, 2, 1]),
+    (0, 4, 2, []),
+])
+def test_items_are_spread_over_the_batches(nb_items, batch_size, nb_batches, sizes):
+    grouped_items = list(batches(range(nb_items), batch_size, nb_batches))
+
+    assert [len(batch) for batch in grouped_items] == sizes
+    assert [item for batch in grouped_items for item in batch] == list(range(nb_items))
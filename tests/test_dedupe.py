@@ -0,0 +1,117 @@
+# test_dedupe.py
+
+
+import os
+
+import pytest
+
+from dropsync_shift_rename.dedupe import PARTIAL_BLOCK_SIZE, DuplicateFinder
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = tmp_path / 'Camera Uploads'
+    library.mkdir()
+    # (Files of the same size, differing in their middle only)
+    content = b'a' * PARTIAL_BLOCK_SIZE * 3
+    (library / 'photo.jpg').write_bytes(content)
+    (library / 'other.jpg').write_bytes(content[:PARTIAL_BLOCK_SIZE] + b'b' * PARTIAL_BLOCK_SIZE
+                                        + content[2 * PARTIAL_BLOCK_SIZE:])
+    (library / '.hidden.jpg').write_bytes(content)
+
+    return library
+
+
+def incoming_file(tmp_path, name: str, content: bytes) -> str:
+    file_path = tmp_path / name
+    file_path.write_bytes(content)
+
+    return str(file_path)
+
+
+def test_identical_content_is_found(tmp_path, library):
+    file_path = incoming_file(tmp_path, 'incoming.jpg', (library / 'photo.jpg').read_bytes())
+
+    duplicate_path = DuplicateFinder(str(library)).find(file_path, os.path.getsize(file_path))
+
+    assert duplicate_path == str(library / 'photo.jpg')
+
+
+def test_same_size_and_blocks_but_different_content_is_not_a_duplicate(tmp_path, library):
+    content = (library / 'photo.jpg').read_bytes()
+    file_path = incoming_file(tmp_path, 'incoming.jpg', content[:PARTIAL_BLOCK_SIZE] + b'c' * PARTIAL_BLOCK_SIZE
+                              + content[2 * PARTIAL_BLOCK_SIZE:])
+
+    assert DuplicateFinder(str(library)).find(file_path, os.path.getsize(file_path)) is None
+
+
+def test_files_planned_into_the_library_are_found(tmp_path, library):
+    first_path = incoming_file(tmp_path, 'first.jpg', b'new content')
+    second_path = incoming_file(tmp_path, 'second.jpg', b'new content')
+    duplicate_finder = DuplicateFinder(str(library))
+    assert duplicate_finder.find(first_path, 11) is None
+    duplicate_finder.add(str(library / 'first.jpg'), 11, first_path)
+
+    assert duplicate_finder.find(second_path, 11) == str(library / 'first.jpg')
+
+
+def test_files_planned_into_the_library_are_read_there_once_moved(tmp_path, library):
+    first_path = incoming_file(tmp_path, 'first.jpg', b'new content')
+    second_path = incoming_file(tmp_path, 'second.jpg', b'new content')
+    duplicate_finder = DuplicateFinder(str(library))
+    duplicate_finder.add(str(library / 'first.jpg'), 11, first_path)
+    os.replace(first_path, str(library / 'first.jpg'))
+
+    assert duplicate_finder.find(second_path, 11) == str(library / 'first.jpg')
+
+
+def test_duplicates_are_dropped_by_planning(tmp_path, library, monkeypatch):
+    # (The warnings listing the dropped files being colored)
+    pytest.importorskip('termcolor')
+    from dropsync_shift_rename import shift_rename
+    from dropsync_shift_rename.config import Root
+    from dropsync_shift_rename.journal import DELETE_OP, MOVE_OP
+    from dropsync_shift_rename.metrics import Metrics
+    from dropsync_shift_rename.names import NameIndex
+
+    monkeypatch.setattr(shift_rename, 'METRICS', Metrics())
+    monkeypatch.setattr(shift_rename, 'DUPLICATES_MODE', 'drop')
+    root = Root('test', str(tmp_path / 'root'), str(library), ('Snapchat',))
+    snapchat = tmp_path / 'root' / 'Snapchat'
+    snapchat.mkdir(parents=True)
+    (snapchat / 'Snapchat-000000001.jpg').write_bytes((library / 'photo.jpg').read_bytes())
+    (snapchat / 'Snapchat-000000002.jpg').write_bytes(b'new content')
+    (snapchat / 'Snapchat-000000003.jpg').write_bytes(b'new content')
+
+    _, plan = shift_rename.plan_sources(root, ['Snapchat'], root.path, NameIndex(),
+                                        DuplicateFinder(str(library)))
+
+    origins_by_kind = {}
+    for op in plan.operations:
+        origins_by_kind.setdefault(op.kind, set()).add(os.path.basename(op.origin))
+    # (The copy of a library file, and one of two identical incoming files,
+    # being dropped while the other one is moved)
+    assert len(origins_by_kind[DELETE_OP]) == 2 and len(origins_by_kind[MOVE_OP]) == 1
+    assert 'Snapchat-000000001.jpg' in origins_by_kind[DELETE_OP]
+    assert origins_by_kind[DELETE_OP] | origins_by_kind[MOVE_OP] == {
+        'Snapchat-000000001.jpg', 'Snapchat-000000002.jpg', 'Snapchat-000000003.jpg'}
+
+
+def test_hashes_of_other_libraries_are_kept_in_the_catalog(tmp_path, library):
+    from dropsync_shift_rename.catalog import Catalog
+
+    other_library = tmp_path / 'Other Camera Uploads'
+    other_library.mkdir()
+    (other_library / 'photo.jpg').write_bytes((library / 'photo.jpg').read_bytes())
+    catalog = Catalog(str(tmp_path / 'catalog.sqlite3'))
+    file_path = incoming_file(tmp_path, 'incoming.jpg', (library / 'photo.jpg').read_bytes())
+    for library_path in (library, other_library):
+        duplicate_finder = DuplicateFinder(str(library_path), catalog)
+        assert duplicate_finder.find(file_path, os.path.getsize(file_path)) == str(library_path / 'photo.jpg')
+        duplicate_finder.save()
+
+    # (Building the finder of a library not removing the hashes of the other)
+    DuplicateFinder(str(library), catalog).save()
+    assert set(catalog.hashes(str(other_library))) == {str(other_library / 'photo.jpg')}
+    assert str(library / 'photo.jpg') in catalog.hashes(str(library))
+    catalog.close()
@@ -0,0 +1,240 @@
+# test_journal.py
+
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dropsync_shift_rename.journal import (CREATE_OP, DELETE_OP, RENAME_OP, SNAPSHOT_OP, WriteAheadLog,
+                                           incomplete_operations, rebuild_layout, resume_incomplete,
+                                           undo_incomplete)
+
+
+def write_file(file_path: str, content: bytes = b'content'):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as f:
+        f.write(content)
+
+
+@pytest.fixture
+def wal(tmp_path):
+    wal = WriteAheadLog(str(tmp_path / 'wal.jsonl'), str(tmp_path / 'trash'))
+    yield wal
+    if not wal._file.closed:
+        wal.close()
+
+
+def interrupted_transaction(wal: WriteAheadLog, operations):
+    """
+    Runs operations in a transaction that is interrupted before its commit
+    (as if the program had been killed).
+
+    Args:
+        wal (WriteAheadLog): The log.
+        operations (callable): Function performing the operations.
+    """
+
+    with pytest.raises(KeyboardInterrupt):
+        with wal.transaction('interrupted'):
+            operations()
+            raise KeyboardInterrupt
+    wal.close()
+
+
+def test_undo_reverts_done_operations_of_uncommitted_transaction(tmp_path, wal):
+    a, b, c = str(tmp_path / 'src' / 'a.jpg'), str(tmp_path / 'src' / 'b.jpg'), str(tmp_path / 'src' / 'c.jpg')
+    write_file(a, b'a')
+    write_file(c, b'c')
+
+    def operations():
+        wal.execute(RENAME_OP, a, b)
+        wal.execute(DELETE_OP, c)
+
+    interrupted_transaction(wal, operations)
+    assert not os.path.exists(a) and not os.path.exists(c)
+
+    assert undo_incomplete(wal.log_path) == 2
+    assert os.path.isfile(a) and not os.path.exists(b)
+    with open(c, 'rb') as f:
+        assert f.read() == b'c'
+    # (Undoing again is a no-op)
+    assert undo_incomplete(wal.log_path) == 0
+
+
+def test_undo_ignores_planned_but_not_performed_operations(tmp_path, wal):
+    a, b = str(tmp_path / 'a.jpg'), str(tmp_path / 'b.jpg')
+    write_file(a)
+
+    interrupted_transaction(wal, lambda: wal.plan(RENAME_OP, a, b))
+
+    assert undo_incomplete(wal.log_path) == 0
+    assert os.path.isfile(a) and not os.path.exists(b)
+
+
+def test_committed_transactions_are_not_incomplete(tmp_path, wal):
+    a, b = str(tmp_path / 'a.jpg'), str(tmp_path / 'b.jpg')
+    write_file(a)
+    with wal.transaction('committed'):
+        wal.execute(RENAME_OP, a, b)
+    wal.close()
+
+    assert incomplete_operations(wal.log_path) == []
+    assert undo_incomplete(wal.log_path) == 0
+    assert os.path.isfile(b)
+
+
+def test_resume_completes_only_operations_not_done(tmp_path, wal):
+    a, b = str(tmp_path / 'a.jpg'), str(tmp_path / 'b.jpg')
+    c, d = str(tmp_path / 'c.jpg'), str(tmp_path / 'd.jpg')
+    write_file(a)
+    write_file(c)
+
+    def operations():
+        wal.execute(RENAME_OP, a, b)
+        wal.plan(RENAME_OP, c, d)
+
+    interrupted_transaction(wal, operations)
+
+    assert [r['done'] for r in incomplete_operations(wal.log_path)] == [True, False]
+    assert resume_incomplete(wal.log_path) == 1
+    assert os.path.isfile(b) and os.path.isfile(d)
+    assert not os.path.exists(a) and not os.path.exists(c)
+    # (Resuming again is a no-op, the destination existing)
+    assert resume_incomplete(wal.log_path) == 0
+
+
+def test_truncated_last_record_is_ignored(tmp_path, wal):
+    a, b = str(tmp_path / 'a.jpg'), str(tmp_path / 'b.jpg')
+    write_file(a)
+    interrupted_transaction(wal, lambda: wal.execute(RENAME_OP, a, b))
+    with open(wal.log_path, 'a', encoding='utf-8') as f:
+        f.write('{"seq": 3, "phase": "pl')
+
+    assert undo_incomplete(wal.log_path) == 1
+    assert os.path.isfile(a)
+
+
+def test_rebuild_restores_committed_deletions_from_snapshot(tmp_path, wal):
+    root, snapshot = str(tmp_path / 'root'), str(tmp_path / 'snapshot')
+    a, b = os.path.join(root, 'a.jpg'), os.path.join(root, 'b.jpg')
+    kept, moved = os.path.join(root, 'kept.jpg'), str(tmp_path / 'Camera Uploads' / 'kept.jpg')
+    write_file(a, b'a')
+    write_file(kept, b'kept')
+    write_file(os.path.join(snapshot, 'a.jpg'), b'a')
+    write_file(os.path.join(snapshot, 'kept.jpg'), b'kept')
+    wal.plan(SNAPSHOT_OP, root, snapshot)
+    # (The file is renamed then deleted, its trash being purged on commit)
+    with wal.transaction('committed'):
+        wal.execute(RENAME_OP, a, b)
+        wal.execute(DELETE_OP, b)
+        wal.execute(RENAME_OP, kept, moved)
+    wal.close()
+    assert not os.path.exists(a) and os.listdir(wal.trash_path) == []
+
+    assert rebuild_layout(wal.log_path) == 3
+    with open(a, 'rb') as f:
+        assert f.read() == b'a'
+    assert os.path.isfile(kept) and not os.path.exists(moved) and not os.path.exists(b)
+
+
+def test_failed_transaction_does_not_swallow_the_next_ones(tmp_path, wal):
+    a, b = str(tmp_path / 'a.jpg'), str(tmp_path / 'b.jpg')
+    c, d = str(tmp_path / 'c.jpg'), str(tmp_path / 'd.jpg')
+    write_file(a)
+    write_file(c)
+    with pytest.raises(OSError):
+        with wal.transaction('failed'):
+            wal.execute(RENAME_OP, a, b)
+            raise OSError('disk full')
+    with wal.transaction('next'):
+        wal.execute(RENAME_OP, c, d)
+    wal.close()
+
+    # (Only the failed transaction being left uncommitted)
+    assert [(r['src'], r['dst']) for r in incomplete_operations(wal.log_path)] == [(a, b)]
+    assert undo_incomplete(wal.log_path) == 1
+    assert os.path.isfile(a) and os.path.isfile(d)
+
+
+def test_operations_of_worker_threads_join_the_transaction(tmp_path, wal):
+    a, b = str(tmp_path / 'a.jpg'), str(tmp_path / 'b.jpg')
+    write_file(a)
+
+    def rename(txn: int):
+        with wal.joined(txn):
+            wal.execute(RENAME_OP, a, b)
+
+    def operations():
+        with ThreadPoolExecutor(1) as executor:
+            executor.submit(rename, wal.current_transaction).result()
+
+    interrupted_transaction(wal, operations)
+
+    # (The rename being part of the uncommitted transaction, hence undone)
+    assert [(r['src'], r['dst']) for r in incomplete_operations(wal.log_path)] == [(a, b)]
+    assert undo_incomplete(wal.log_path) == 1
+    assert os.path.isfile(a) and not os.path.exists(b)
+
+
+def convert(wal: WriteAheadLog, src: str, dst: str):
+    """
+    Journals a conversion as the program does: the output is created, then its
+    source deleted.
+
+    Args:
+        wal (WriteAheadLog): The log.
+        src (str): Path of the converted file.
+        dst (str): Path of the output.
+    """
+
+    seq = wal.plan(CREATE_OP, dst)
+    write_file(dst, b'converted')
+    wal.done(seq)
+    wal.execute(DELETE_OP, src)
+
+
+def test_rebuild_without_snapshot_is_refused_past_committed_deletions(tmp_path, wal):
+    webp, png = str(tmp_path / 'root' / 'sticker.webp'), str(tmp_path / 'root' / 'sticker.png')
+    write_file(webp, b'webp')
+    with wal.transaction('committed'):
+        convert(wal, webp, png)
+    wal.close()
+
+    with pytest.raises(ValueError):
+        rebuild_layout(wal.log_path)
+    # (The output being kept, the original being lost)
+    assert os.path.isfile(png)
+
+
+def test_rebuild_restores_converted_files_from_snapshot(tmp_path, wal):
+    root, snapshot = str(tmp_path / 'root'), str(tmp_path / 'snapshot')
+    webp, png = os.path.join(root, 'sticker.webp'), os.path.join(root, 'sticker.png')
+    write_file(webp, b'webp')
+    write_file(os.path.join(snapshot, 'sticker.webp'), b'webp')
+    wal.plan(SNAPSHOT_OP, root, snapshot)
+    with wal.transaction('committed'):
+        convert(wal, webp, png)
+    wal.close()
+
+    assert rebuild_layout(wal.log_path) == 2
+    with open(webp, 'rb') as f:
+        assert f.read() == b'webp'
+    assert not os.path.exists(png)
+
+
+def test_rebuild_restores_deletions_from_the_snapshot_of_their_root(tmp_path, wal):
+    for root_name in ('PhoneA', 'PhoneB'):
+        root, snapshot = str(tmp_path / root_name), str(tmp_path / f'{root_name}_Snapshot')
+        write_file(os.path.join(root, 'a.jpg'), root_name.encode())
+        write_file(os.path.join(snapshot, 'a.jpg'), root_name.encode())
+        wal.plan(SNAPSHOT_OP, root, snapshot)
+    with wal.transaction('committed'):
+        for root_name in ('PhoneA', 'PhoneB'):
+            wal.execute(DELETE_OP, str(tmp_path / root_name / 'a.jpg'))
+    wal.close()
+
+    assert rebuild_layout(wal.log_path) == 2
+    for root_name in ('PhoneA', 'PhoneB'):
+        with open(tmp_path / root_name / 'a.jpg', 'rb') as f:
+            assert f.read() == root_name.encode()
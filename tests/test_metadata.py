@@ -0,0 +1,193 @@
+# test_metadata.py
+
+
+import os
+import struct
+from datetime import datetime
+
+import pytest
+
+from dropsync_shift_rename.metadata import (EXIF_DATE_TIME_ORIGINAL_TAG, EXIF_DATE_TIME_TAG, EXIF_IFD_POINTER_TAG,
+                                            EXIF_SUB_SEC_TIME_ORIGINAL_TAG, MP4_EPOCH_OFFSET, CaptureDates,
+                                            exif_timestamp, format_timestamp, jpeg_timestamp, metadata_timestamp,
+                                            mp4_timestamp)
+
+# Initializations
+EXIF_LONG_TYPE: int = 4
+# (Capture date, in the local time of the camera)
+DATE: datetime = datetime(2021, 5, 1, 12, 30, 45)
+
+
+def ifd(byte_order: str, offset: int, entries: list, next_offset: int = 0) -> bytes:
+    """
+    Builds an image file directory whose values that do not fit in 4 bytes are
+    stored right after it.
+
+    Args:
+        byte_order (str): The byte order ("<" or ">").
+        offset (int): Offset of the IFD in the TIFF structure.
+        entries (list): List containing the (tag, type, value) tuples of the
+                        entries (values being bytes, or int for the LONG ones).
+        next_offset (int): Offset of the next IFD.
+
+    Returns:
+        ifd (bytes): The IFD, followed by its values.
+    """
+
+    data_offset = offset + 2 + 12 * len(entries) + 4
+    header, data = struct.pack(byte_order + 'H', len(entries)), b''
+    for tag, type, value in entries:
+        if isinstance(value, int):
+            raw_value, count = struct.pack(byte_order + 'I', value), 1
+        elif len(value) <= 4:
+            raw_value, count = value.ljust(4, b'\0'), len(value)
+        else:
+            raw_value, count = struct.pack(byte_order + 'I', data_offset + len(data)), len(value)
+            data += value
+        header += struct.pack(byte_order + 'HHI', tag, type, count) + raw_value
+
+    return header + struct.pack(byte_order + 'I', next_offset) + data
+
+
+def ascii_entry(tag: int, value: str) -> tuple:
+    return tag, 2, value.encode('ascii') + b'\0'
+
+
+def tiff(byte_order: str, ifd0_entries: list = (), exif_entries: list = None) -> bytes:
+    """
+    Builds EXIF data: an IFD0 holding the given entries and, if any, a pointer
+    to an EXIF IFD holding the other given entries.
+    """
+
+    signature = b'II' if byte_order == '<' else b'MM'
+    header = signature + struct.pack(byte_order + 'HI', 42, 8)
+    ifd0_entries = list(ifd0_entries)
+    if exif_entries is None:
+        return header + ifd(byte_order, 8, ifd0_entries)
+    ifd0_entries.append((EXIF_IFD_POINTER_TAG, EXIF_LONG_TYPE, 0))
+    exif_offset = 8 + len(ifd(byte_order, 8, ifd0_entries))
+    ifd0_entries[-1] = (EXIF_IFD_POINTER_TAG, EXIF_LONG_TYPE, exif_offset)
+
+    return header + ifd(byte_order, 8, ifd0_entries) + ifd(byte_order, exif_offset, exif_entries)
+
+
+def jpeg(exif: bytes) -> bytes:
+    # (A JFIF segment first, then the EXIF one, then the image data)
+    jfif = b'JFIF\0\1\1\0\0\1\0\1\0\0'
+    segments = b'\xff\xe0' + struct.pack('>H', len(jfif) + 2) + jfif
+    segments += b'\xff\xe1' + struct.pack('>H', len(exif) + 8) + b'Exif\0\0' + exif
+
+    return b'\xff\xd8' + segments + b'\xff\xda\0\2' + bytes(64) + b'\xff\xd9'
+
+
+def atom(type: bytes, content: bytes) -> bytes:
+    return struct.pack('>I4s', len(content) + 8, type) + content
+
+
+def mp4(creation_time: int, version: int = 0, with_moov: bool = True) -> bytes:
+    # (A media data atom with a 64-bit size first, the "moov" atom being last)
+    mdat = struct.pack('>I4sQ', 1, b'mdat', 16 + 32) + bytes(32)
+    if version == 1:
+        mvhd = bytes([1, 0, 0, 0]) + struct.pack('>QQIQ', creation_time, creation_time, 1000, 0)
+    else:
+        mvhd = bytes(4) + struct.pack('>IIII', creation_time, creation_time, 1000, 0)
+    moov = atom(b'moov', atom(b'mvhd', mvhd)) if with_moov else b''
+
+    return atom(b'ftyp', b'isom\0\0\2\0isomiso2') + mdat + moov
+
+
+def formatted(timestamp: float) -> str:
+    # (Baseline format of the names: "str(datetime)" without spaces and colons)
+    return str(datetime.fromtimestamp(timestamp)).replace(' ', '_').replace(':', '-')
+
+
+@pytest.mark.parametrize('byte_order', ['<', '>'])
+def test_original_date_and_sub_seconds_are_read_in_both_byte_orders(byte_order):
+    exif = tiff(byte_order, [ascii_entry(EXIF_DATE_TIME_TAG, '2022:01:01 00:00:00')],
+                [ascii_entry(EXIF_DATE_TIME_ORIGINAL_TAG, '2021:05:01 12:30:45'),
+                 ascii_entry(EXIF_SUB_SEC_TIME_ORIGINAL_TAG, '25')])
+
+    assert exif_timestamp(exif) == DATE.replace(microsecond=250000).timestamp()
+
+
+def test_date_time_is_a_fallback_for_the_original_date():
+    exif = tiff('<', [ascii_entry(EXIF_DATE_TIME_TAG, '2021:05:01 12:30:45')])
+
+    assert exif_timestamp(exif) == DATE.timestamp()
+
+
+@pytest.mark.parametrize('date', ['0000:00:00 00:00:00', '    :  :     :  :  ', ''])
+def test_invalid_dates_are_ignored(date):
+    assert exif_timestamp(tiff('>', exif_entries=[ascii_entry(EXIF_DATE_TIME_ORIGINAL_TAG, date)])) is None
+
+
+def test_jpeg_timestamp_is_read_from_the_exif_segment(tmp_path):
+    file_path = tmp_path / 'IMG_0001.jpg'
+    file_path.write_bytes(jpeg(tiff('>', exif_entries=[ascii_entry(EXIF_DATE_TIME_ORIGINAL_TAG,
+                                                                   '2021:05:01 12:30:45')])))
+
+    assert jpeg_timestamp(str(file_path)) == DATE.timestamp()
+
+
+def test_jpeg_without_exif_has_no_timestamp(tmp_path):
+    file_path = tmp_path / 'IMG_0001.jpg'
+    file_path.write_bytes(b'\xff\xd8\xff\xda\0\2' + bytes(64) + b'\xff\xd9')
+
+    assert jpeg_timestamp(str(file_path)) is None
+
+
+@pytest.mark.parametrize('version', [0, 1])
+def test_mp4_creation_time_is_read_from_the_movie_header(tmp_path, version):
+    file_path = tmp_path / 'VID_0001.mp4'
+    file_path.write_bytes(mp4(MP4_EPOCH_OFFSET + 1619872245, version))
+
+    assert mp4_timestamp(str(file_path)) == 1619872245
+
+
+def test_mp4_without_movie_atom_has_no_timestamp(tmp_path):
+    file_path = tmp_path / 'VID_0001.mp4'
+    file_path.write_bytes(mp4(MP4_EPOCH_OFFSET + 1619872245, with_moov=False))
+
+    assert mp4_timestamp(str(file_path)) is None
+
+
+def test_mp4_with_unknown_creation_time_has_no_timestamp(tmp_path):
+    file_path = tmp_path / 'VID_0001.mp4'
+    file_path.write_bytes(mp4(0))
+
+    assert mp4_timestamp(str(file_path)) is None
+
+
+# (Files cut in the middle of the IFD0 of their EXIF data, or of their movie
+# header)
+@pytest.mark.parametrize('name, content, nb_bytes', [
+    ('IMG_0001.jpg', jpeg(tiff('<', exif_entries=[ascii_entry(EXIF_DATE_TIME_ORIGINAL_TAG, '2021:05:01 12:30:45')])),
+     50),
+    ('VID_0001.mp4', mp4(MP4_EPOCH_OFFSET + 1619872245, version=1), 90),
+])
+def test_truncated_files_have_no_timestamp(tmp_path, name, content, nb_bytes):
+    file_path = tmp_path / name
+    file_path.write_bytes(content[:nb_bytes])
+
+    assert metadata_timestamp(str(file_path)) is None
+
+
+@pytest.mark.parametrize('timestamp', [1619872245, 1619872245.25, 1619872245.000001, 1619872245.9999996])
+def test_formatted_timestamps_match_the_baseline_names(timestamp):
+    assert format_timestamp(timestamp) == formatted(timestamp)
+
+
+def test_capture_dates_fall_back_to_the_file_dates(tmp_path):
+    jpeg_path, mp4_path, other_path = tmp_path / 'IMG_0001.jpg', tmp_path / 'VID_0001.mp4', tmp_path / 'AUD_0001.opus'
+    exif_entries = [ascii_entry(EXIF_DATE_TIME_ORIGINAL_TAG, '2021:05:01 12:30:45'),
+                    ascii_entry(EXIF_SUB_SEC_TIME_ORIGINAL_TAG, '123')]
+    jpeg_path.write_bytes(jpeg(tiff('>', exif_entries=exif_entries)))
+    mp4_path.write_bytes(mp4(MP4_EPOCH_OFFSET + 1619872245))
+    other_path.write_bytes(b'')
+    os.utime(other_path, (1600000000, 1600000000))
+    capture_dates = CaptureDates(lambda file_path: None)
+    capture_dates.prefetch([str(jpeg_path), str(mp4_path), str(other_path)])
+
+    assert capture_dates.formatted(str(jpeg_path)) == '2021-05-01_12-30-45.123000'
+    assert capture_dates.formatted(str(mp4_path)) == formatted(1619872245)
+    assert capture_dates.formatted(str(other_path)) == formatted(os.stat(other_path).st_mtime)
@@ -0,0 +1,36 @@
+# test_names.py
+
+
+import os
+
+from dropsync_shift_rename.names import NameIndex
+
+
+def test_existing_and_claimed_names_are_suffixed(tmp_path):
+    (tmp_path / 'photo.jpg').write_bytes(b'')
+    (tmp_path / 'photo_1.jpg').write_bytes(b'')
+    names = NameIndex()
+
+    assert names.claim(str(tmp_path), 'photo.jpg') == 'photo_2.jpg'
+    assert names.claim(str(tmp_path), 'photo.jpg') == 'photo_3.jpg'
+    assert names.claim(str(tmp_path), 'video.mp4') == 'video.mp4'
+    assert names.claim(str(tmp_path), 'video.mp4') == 'video_1.mp4'
+
+
+def test_names_are_compared_case_insensitively(tmp_path):
+    (tmp_path / 'Photo.JPG').write_bytes(b'')
+
+    assert NameIndex().claim(str(tmp_path), 'photo.jpg') == 'photo_1.jpg'
+
+
+def test_folders_are_listed_once(tmp_path):
+    names = NameIndex()
+    names.claim(str(tmp_path), 'a.jpg')
+    # (Files added afterwards are not seen, the folder being indexed already)
+    (tmp_path / 'b.jpg').write_bytes(b'')
+
+    assert names.claim(os.path.join(str(tmp_path), ''), 'b.jpg') == 'b.jpg'
+
+
+def test_missing_folders_are_empty(tmp_path):
+    assert NameIndex().claim(str(tmp_path / 'missing'), 'a.jpg') == 'a.jpg'
@@ -0,0 +1,100 @@
+# test_perceptual.py
+
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dropsync_shift_rename import perceptual
+from dropsync_shift_rename.perceptual import (DHASH_ALGORITHM, MAX_DISTANCE, PHASH_ALGORITHM, MultiIndex,
+                                              hash_images)
+
+# (Hash whose bits are spread over every chunk of the multi-index)
+HASH: int = 0x0123456789abcdef
+
+
+def flip_bits(value: int, bits) -> int:
+    for bit in bits:
+        value ^= 1 << bit
+
+    return value
+
+
+@pytest.fixture
+def index():
+    index = MultiIndex()
+    index.add(HASH, 'library.jpg')
+
+    return index
+
+
+def test_identical_hash_is_found(index):
+    assert index.search(HASH) == [(0, 'library.jpg')]
+
+
+def test_hash_at_distance_one_is_found(index):
+    assert index.search(flip_bits(HASH, [63])) == [(1, 'library.jpg')]
+
+
+def test_hash_at_maximum_distance_is_found(index):
+    # (One flipped bit in all the chunks but one)
+    value = flip_bits(HASH, range(0, 64, 13)[:MAX_DISTANCE])
+
+    assert index.search(value) == [(MAX_DISTANCE, 'library.jpg')]
+
+
+def test_hash_beyond_maximum_distance_is_not_found(index):
+    # (Some chunk being still shared with the indexed hash)
+    value = flip_bits(HASH, list(range(0, 64, 13))[:MAX_DISTANCE] + [1])
+
+    assert index.search(value) == []
+
+
+def test_closest_hash_is_returned_first(index):
+    index.add(flip_bits(HASH, [3, 40]), 'other.jpg')
+
+    assert index.search(flip_bits(HASH, [3])) == [(1, 'library.jpg'), (1, 'other.jpg')]
+    assert index.search(flip_bits(HASH, [3, 40, 41])) == [(1, 'other.jpg'), (3, 'library.jpg')]
+
+
+def test_images_are_hashed_in_the_given_executor(monkeypatch):
+    hashed_paths = []
+
+    def recording_hash_image(file_path, algorithm):
+        hashed_paths.append(file_path)
+        return file_path, len(file_path)
+
+    monkeypatch.setattr(perceptual, 'hash_image', recording_hash_image)
+    monkeypatch.setattr(perceptual, 'run_in_pool', None)
+    with ThreadPoolExecutor(1) as executor:
+        assert hash_images(['a.jpg', 'bb.jpg', 'a.jpg'], DHASH_ALGORITHM, executor) == [5, 6, 5]
+    # (Each image being hashed once)
+    assert hashed_paths == ['a.jpg', 'bb.jpg']
+
+
+def draw_image(file_path, shift: int = 0):
+    Image = pytest.importorskip('PIL.Image')
+    im = Image.new('L', (256, 192))
+    # (Smooth gradients and blocks, so that the thumbnails have contrast, and
+    # brightening does not saturate any pixel)
+    im.putdata([16 + (x + 2 * y) % 224 if (x // 64 + y // 48) % 2 else 239 - x * 7 // 8
+                for y in range(192) for x in range(256)])
+    if shift:
+        im = im.point(lambda value: value + shift)
+    im.save(file_path, quality=90)
+
+
+@pytest.mark.parametrize('algorithm', [DHASH_ALGORITHM, PHASH_ALGORITHM])
+def test_slightly_altered_copy_is_a_near_duplicate(tmp_path, algorithm):
+    if algorithm == PHASH_ALGORITHM:
+        pytest.importorskip('numpy')
+    original_path, copy_path = str(tmp_path / 'original.jpg'), str(tmp_path / 'copy.jpg')
+    draw_image(original_path)
+    # (Brightened, and recompressed at a different quality)
+    draw_image(copy_path, shift=6)
+
+    original_hash, copy_hash = hash_images([original_path, copy_path], algorithm)
+
+    # (Hashes being stable from one run to another)
+    assert hash_images([original_path], algorithm) == [original_hash]
+    assert bin(original_hash ^ copy_hash).count('1') <= MAX_DISTANCE
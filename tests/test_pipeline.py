@@ -0,0 +1,107 @@
+# test_pipeline.py
+
+
+import asyncio
+import threading
+from typing import NamedTuple
+
+from dropsync_shift_rename import pipeline
+from dropsync_shift_rename.pipeline import SKIPPED_ERROR, run_pipeline
+
+
+class Operation(NamedTuple):
+    """
+    Operation of the tests (cf. "plan.Operation").
+    """
+
+    id: int
+    kind: str
+    depends_on: tuple = ()
+
+
+def recording_handlers(events: list, failing_ids: set = frozenset(), nb_ticks: dict = None) -> dict:
+    async def run(op) -> str:
+        events.append(('start', op.id))
+        # (Letting the other workers run meanwhile, for a number of iterations
+        # of the event loop depending on the kind)
+        for _ in range((nb_ticks or {}).get(op.kind, 1)):
+            await asyncio.sleep(0)
+        events.append(('end', op.id))
+        if op.id in failing_ids:
+            return 'failed'
+
+    async def run_batch(operations: list) -> dict:
+        events.append(('batch', [op.id for op in operations]))
+        await asyncio.sleep(0)
+        return {op.id: 'failed' for op in operations if op.id in failing_ids}
+
+    return {'convert': run, 'rename': run, 'move': run_batch}
+
+
+def test_operations_start_once_their_dependencies_are_done():
+    operations = [Operation(1, 'convert'), Operation(2, 'convert'), Operation(3, 'rename', (1,)),
+                  Operation(4, 'rename', (2, 3)), Operation(5, 'convert', (4,))]
+    events = []
+
+    errors = run_pipeline(operations, recording_handlers(events), {'convert': 2})
+
+    assert errors == {}
+    for op in operations:
+        for i in op.depends_on:
+            assert events.index(('end', i)) < events.index(('start', op.id))
+    # (Independent operations overlapping)
+    assert events.index(('start', 2)) < events.index(('end', 1))
+
+
+def test_dependents_of_failed_operations_are_skipped():
+    operations = [Operation(1, 'convert'), Operation(2, 'convert'), Operation(3, 'rename', (1,)),
+                  Operation(4, 'convert', (3,)), Operation(5, 'rename', (2,))]
+    events = []
+    finished = []
+
+    errors = run_pipeline(operations, recording_handlers(events, {1}), {'convert': 2},
+                          lambda op, seconds, error: finished.append((op.id, error)))
+
+    assert errors == {1: 'failed', 3: SKIPPED_ERROR, 4: SKIPPED_ERROR}
+    assert ('start', 3) not in events and ('start', 4) not in events and ('end', 5) in events
+    assert sorted(finished) == [(1, 'failed'), (2, None), (3, SKIPPED_ERROR), (4, SKIPPED_ERROR), (5, None)]
+
+
+def test_ready_operations_are_executed_in_batches():
+    operations = [Operation(i, 'move') for i in range(5)] + [Operation(5, 'move', (0,))]
+    events = []
+
+    errors = run_pipeline(operations, recording_handlers(events, {2}), batch_sizes={'move': 4})
+
+    assert errors == {2: 'failed'}
+    assert events == [('batch', [0, 1, 2, 3]), ('batch', [4, 5])]
+
+
+def test_workers_wait_for_room_in_the_queues_of_their_dependents(monkeypatch):
+    monkeypatch.setattr(pipeline, 'QUEUE_SIZE_PER_WORKER', 1)
+    operations = [Operation(i, 'convert') for i in range(6)]
+    operations += [Operation(10 + i, 'rename', (i,)) for i in range(6)]
+    events = []
+
+    assert run_pipeline(operations, recording_handlers(events, nb_ticks={'rename': 20})) == {}
+    # (While the first rename is executed, one rename waiting in its queue and
+    # the conversion making the next one ready waiting for room)
+    assert events.index(('end', 10)) < events.index(('start', 3))
+
+
+def test_cycles_between_kinds_do_not_deadlock(monkeypatch):
+    monkeypatch.setattr(pipeline, 'QUEUE_SIZE_PER_WORKER', 1)
+    # (Conversions depending on renames, depending on other conversions)
+    operations = [Operation(i, 'rename') for i in range(6)]
+    operations += [Operation(10 + i, 'convert', (i,)) for i in range(6)]
+    operations += [Operation(20 + i, 'rename', (10 + i,)) for i in range(6)]
+    events = []
+    errors = []
+    # (Run in a thread, so that a deadlock fails the test instead of hanging it)
+    thread = threading.Thread(target=lambda: errors.append(run_pipeline(operations, recording_handlers(
+        events, nb_ticks={'convert': 20}))), daemon=True)
+    thread.start()
+    thread.join(10)
+
+    assert errors == [{}]
+    assert len([event for event in events if event[0] == 'end']) == len(operations)
@@ -0,0 +1,60 @@
+# test_plan.py
+
+
+from dropsync_shift_rename.journal import DELETE_OP, MOVE_OP, RENAME_OP, RMDIR_OP
+from dropsync_shift_rename.plan import CONVERT_PNG_KIND, PlanBuilder, execution_batches, format_plan
+
+# Initializations
+SIZES: dict = {'a.webp': 100, 'b.jpg': 200, 'c.jpg': 300}
+
+
+def size_function(path: str) -> int:
+    return SIZES.get(path, 0)
+
+
+def test_operations_depend_on_the_operation_producing_their_source():
+    builder = PlanBuilder(size_function)
+    rename = builder.add(RENAME_OP, 'a.webp', 'A.webp', 'Test A')
+    conversion = builder.add(CONVERT_PNG_KIND, 'A.webp', 'A.png', 'Test B')
+    move = builder.add(MOVE_OP, 'A.png', 'cu/A.png', 'Test C')
+    plan = builder.build()
+
+    assert plan.operations == (rename, conversion, move)
+    assert (conversion.depends_on, move.depends_on) == ((rename.id,), (conversion.id,))
+    # (Planned paths keep the original path, hence the size, of their file)
+    assert move.origin == 'a.webp' and move.nb_bytes == 100
+    assert builder.origin('cu/A.png') == 'a.webp'
+    assert builder.converted('cu/A.png') and not builder.converted('A.webp')
+
+
+def test_batches_follow_dependencies_then_kind_order():
+    builder = PlanBuilder(size_function)
+    move_b = builder.add(MOVE_OP, 'b.jpg', 'cu/b.jpg', 'Test')
+    delete_c = builder.add(DELETE_OP, 'c.jpg', stage='Test')
+    rename_a = builder.add(RENAME_OP, 'a.webp', 'A.webp', 'Test')
+    move_a = builder.add(MOVE_OP, 'A.webp', 'cu/A.webp', 'Test')
+    rmdir = builder.add(RMDIR_OP, 'folder', stage='Test', depends_on=builder.consumers('folder'))
+    plan = builder.build()
+
+    # (Bytes being counted per operation, the file "a.webp" being renamed then moved)
+    assert plan.nb_bytes == 700
+    assert execution_batches(plan) == [(DELETE_OP, [delete_c]), (RENAME_OP, [rename_a]), (MOVE_OP, [move_b]),
+                                       (RMDIR_OP, [rmdir]), (MOVE_OP, [move_a])]
+
+
+def test_folder_removal_waits_for_the_operations_on_its_content():
+    builder = PlanBuilder(size_function)
+    move = builder.add(MOVE_OP, 'folder/b.jpg', 'cu/b.jpg', 'Test')
+    builder.add(MOVE_OP, 'other/c.jpg', 'cu/c.jpg', 'Test')
+
+    assert builder.consumers('folder') == (move.id,)
+
+
+def test_dry_run_plan_lists_every_operation():
+    builder = PlanBuilder(size_function)
+    builder.add(MOVE_OP, 'b.jpg', 'cu/b.jpg', 'Test A')
+    builder.add(DELETE_OP, 'c.jpg', stage='Test B')
+    text = format_plan(builder.build())
+
+    assert ' [Test A] move b.jpg → cu/b.jpg (0.00[MB])' in text.splitlines()
+    assert '2 operation(s) planned, 0.00[MB] in total:' in text
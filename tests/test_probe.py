@@ -0,0 +1,90 @@
+# test_probe.py
+
+
+import json
+import subprocess
+
+import pytest
+
+from dropsync_shift_rename import probe
+from dropsync_shift_rename.probe import MP3_CODEC, MP3_CONTAINER, AudioProbes, probe_audio
+
+# Initializations
+# (Container and audio codec of the test files, depending on their name)
+PROBES: dict = {'voice.opus': ('ogg', 'opus'), 'misnamed.opus': (MP3_CONTAINER, MP3_CODEC),
+                'memo.m4a': ('mov,mp4,m4a,3gp,3g2,mj2', MP3_CODEC)}
+
+
+@pytest.fixture
+def ffprobe_runs(monkeypatch):
+    """
+    Replaces ffprobe with a fake one, describing the files of "PROBES" (and a
+    cover art stream before their audio stream).
+
+    Returns:
+        ffprobe_runs (list): List containing the path of the file of every
+        ffprobe run.
+    """
+
+    ffprobe_runs = []
+
+    def fake_run(command, **kwargs):
+        file_path = command[-1]
+        ffprobe_runs.append(file_path)
+        name = file_path.rsplit('/', 1)[-1]
+        if name not in PROBES:
+            return subprocess.CompletedProcess(command, 1, stdout=b'')
+        container, codec = PROBES[name]
+        info = {'streams': [{'codec_type': 'video', 'codec_name': 'mjpeg'},
+                            {'codec_type': 'audio', 'codec_name': codec}],
+                'format': {'format_name': container}}
+        return subprocess.CompletedProcess(command, 0, stdout=json.dumps(info).encode())
+
+    monkeypatch.setattr(probe.subprocess, 'run', fake_run)
+
+    return ffprobe_runs
+
+
+def test_container_and_audio_codec_are_read(ffprobe_runs):
+    assert probe_audio('/sync/memo.m4a') == PROBES['memo.m4a']
+    # (Unreadable files having neither)
+    assert probe_audio('/sync/corrupt.opus') == (None, None)
+
+
+def test_unchanged_files_are_probed_once(tmp_path, ffprobe_runs):
+    file_path = tmp_path / 'voice.opus'
+    file_path.write_bytes(b'opus')
+    audio_probes = AudioProbes(lambda path: None)
+    audio_probes.available = True
+    audio_probes.prefetch([str(file_path)])
+
+    assert audio_probes.probe(str(file_path)) == PROBES['voice.opus']
+    assert ffprobe_runs == [str(file_path)]
+    # (A changed file being probed again)
+    file_path.write_bytes(b'longer opus')
+    audio_probes.probe(str(file_path))
+    assert ffprobe_runs == [str(file_path)] * 2
+
+
+def test_audio_files_are_renamed_remuxed_or_converted_by_codec(tmp_path, ffprobe_runs, monkeypatch):
+    # (The warnings of the planning being colored)
+    pytest.importorskip('termcolor')
+    from dropsync_shift_rename import shift_rename
+    from dropsync_shift_rename.journal import RENAME_OP
+    from dropsync_shift_rename.metrics import Metrics
+    from dropsync_shift_rename.plan import CONVERT_MP3_KIND, REMUX_MP3_KIND, PlanBuilder
+
+    monkeypatch.setattr(shift_rename, 'METRICS', Metrics())
+    file_paths = []
+    for name in PROBES:
+        (tmp_path / name).write_bytes(b'audio')
+        file_paths.append(str(tmp_path / name))
+    audio_probes = AudioProbes(lambda path: None)
+    audio_probes.available = True
+    builder = PlanBuilder(lambda path: 0)
+    context = shift_rename.PlanningContext(None, None, None, None, audio_probes, builder, None)
+
+    mp3_paths = shift_rename.plan_audio_conversions(context, file_paths, 'Test')
+
+    assert mp3_paths == [str(tmp_path / name) for name in ('voice.mp3', 'misnamed.mp3', 'memo.mp3')]
+    assert [op.kind for op in builder.build().operations] == [CONVERT_MP3_KIND, RENAME_OP, REMUX_MP3_KIND]
@@ -0,0 +1,57 @@
+# test_rules.py
+
+
+import os
+
+import pytest
+
+from dropsync_shift_rename.rules import RENAME_RULES, RenameRule
+
+# Initializations
+DATE: str = '2021-05-01_12-30-45.123456'
+
+
+def date_function(file_path: str) -> str:
+    return DATE
+
+
+@pytest.mark.parametrize('source, file_path, new_file_path', [
+    ('WhatsApp', 'WhatsApp Images/IMG-20210501-WA0001.jpg',
+     f'WhatsApp Images/{DATE}_WhatsApp_IMG_0001.jpg'),
+    ('WhatsApp', 'WhatsApp Video/VID-20210501-WA0012.mp4', f'WhatsApp Video/{DATE}_WhatsApp_VID_0012.mp4'),
+    ('Telegram', 'Telegram Images/5012345678_123456.jpg', f'Telegram Images/{DATE}_Telegram_123456.jpg'),
+    ('Snapchat', 'Snapchat/Snapchat-123456789.jpg', f'Snapchat/{DATE}_Snapchat_6789.jpg'),
+    ('MusicDownload', 'MusicDownload/Song.mp3', 'MusicDownload/2021-05-01_12-30-45_Song.mp3'),
+    ('VidMate', 'VidMate/Clip.mp4', 'VidMate/2021-05-01_12-30-45_Clip.mp4'),
+    ('Instander', 'Instander/account/account-1.jpg', 'Instander/account/2021-05-01_account_1.jpg'),
+    ('StorySaver', 'StorySaver/account/Story.mp4', 'StorySaver/account/2021-05-01_account_Story.mp4'),
+])
+def test_rules_rename_as_the_apps_name_files(source, file_path, new_file_path):
+    file_path, new_file_path = os.path.normpath(file_path), os.path.normpath(new_file_path)
+    rename_plan = RENAME_RULES[source].plan([file_path], date_function)
+
+    assert rename_plan.renames == [(file_path, new_file_path)]
+    assert rename_plan.skipped == [] and rename_plan.rejected == []
+
+
+def test_renamed_whatsapp_files_are_skipped():
+    file_path = f'{DATE}_WhatsApp_IMG_0001.jpg'
+    rename_plan = RENAME_RULES['WhatsApp'].plan([file_path], date_function)
+
+    assert rename_plan.skipped == [file_path] and rename_plan.renames == []
+
+
+def test_unmatched_files_are_rejected():
+    rename_plan = RENAME_RULES['WhatsApp'].plan(['notes.txt'], date_function)
+
+    assert rename_plan.rejected == ['notes.txt'] and rename_plan.renames == []
+
+
+def test_dates_are_only_computed_when_the_template_uses_them():
+    def failing_date_function(file_path: str) -> str:
+        raise AssertionError('date computed')
+
+    rule = RenameRule('Test', r'(?P<number>\d+)\.jpg', '{folder}_{number}.jpg')
+    rename_plan = rule.plan([os.path.join('folder', '42.jpg')], failing_date_function)
+
+    assert rename_plan.renames == [(os.path.join('folder', '42.jpg'), os.path.join('folder', 'folder_42.jpg'))]
@@ -0,0 +1,26 @@
+# test_snapshot.py
+
+
+import os
+
+from dropsync_shift_rename import snapshot
+from dropsync_shift_rename.snapshot import snapshot_dir
+
+
+def test_unsupported_reflinks_are_only_tried_once_per_device(tmp_path, monkeypatch):
+    root = tmp_path / 'DropsyncFiles'
+    (root / 'WhatsApp').mkdir(parents=True)
+    for i in range(5):
+        (root / 'WhatsApp' / f'{i}.jpg').write_bytes(bytes([i]))
+    reflinked_paths = []
+
+    def unsupported_reflink_file(src_path: str, dst_path: str):
+        reflinked_paths.append(src_path)
+        raise OSError('reflinks not supported')
+
+    monkeypatch.setattr(snapshot, 'reflink_file', unsupported_reflink_file)
+    snapshot_path = snapshot_dir(str(root))
+
+    assert len(reflinked_paths) == 1
+    for i in range(5):
+        assert os.path.samefile(root / 'WhatsApp' / f'{i}.jpg', os.path.join(snapshot_path, 'WhatsApp', f'{i}.jpg'))
@@ -0,0 +1,165 @@
+# test_transfer.py
+
+
+import os
+
+import pytest
+
+from dropsync_shift_rename import transfer
+from dropsync_shift_rename.transfer import (COPIED_STATUS, FAILED_STATUS, RENAMED_STATUS, copy_then_remove,
+                                            move_file, sync_batch, temporary_path, transfer_files)
+
+
+@pytest.fixture
+def file_pairs(tmp_path):
+    src_folder, dst_folder = tmp_path / 'src', tmp_path / 'dst'
+    src_folder.mkdir()
+    dst_folder.mkdir()
+    file_pairs = []
+    for i in range(3):
+        src_path = src_folder / f'{i}.jpg'
+        src_path.write_bytes(bytes([i]) * (i + 1) * 1000)
+        file_pairs.append((str(src_path), str(dst_folder / f'{i}.jpg')))
+
+    return file_pairs
+
+
+def statuses(move_results, file_pairs) -> list:
+    # (Results being yielded as soon as known, failures before successes)
+    status_by_src = {result.src: result.status for result in move_results}
+
+    return [status_by_src[src_path] for src_path, _ in file_pairs]
+
+
+def no_temporary_files(file_pairs) -> bool:
+    return not any(os.path.lexists(temporary_path(dst_path)) for _, dst_path in file_pairs)
+
+
+def test_transfer_moves_every_file(file_pairs, monkeypatch):
+    # (Two batches, the last one incomplete)
+    monkeypatch.setattr(transfer, 'TRANSFER_BATCH_FILES', 2)
+    move_results, transfer_stats = transfer_files(file_pairs)
+
+    assert [result.status for result in move_results] == [COPIED_STATUS] * 3
+    assert (transfer_stats.nb_files, transfer_stats.nb_bytes) == (3, 6000)
+    for i, (src_path, dst_path) in enumerate(file_pairs):
+        assert not os.path.exists(src_path)
+        with open(dst_path, 'rb') as f:
+            assert f.read() == bytes([i]) * (i + 1) * 1000
+    assert no_temporary_files(file_pairs)
+
+
+def test_failed_rename_only_fails_its_file(file_pairs, monkeypatch):
+    failing_dst_path = file_pairs[1][1]
+    replace = os.replace
+
+    def failing_replace(src, dst):
+        if dst == failing_dst_path:
+            raise OSError('rename failed')
+        replace(src, dst)
+
+    monkeypatch.setattr(transfer.os, 'replace', failing_replace)
+    move_results, transfer_stats = transfer_files(file_pairs)
+
+    assert statuses(move_results, file_pairs) == [COPIED_STATUS, FAILED_STATUS, COPIED_STATUS]
+    assert [result.error for result in move_results if not result.ok] == ['rename failed']
+    assert (transfer_stats.nb_files, transfer_stats.nb_bytes) == (2, 4000)
+    # (The source of the failed file is kept, and no partial file is left behind)
+    assert os.path.isfile(file_pairs[1][0]) and not os.path.exists(failing_dst_path)
+    assert not os.path.exists(file_pairs[0][0]) and os.path.isfile(file_pairs[0][1])
+    assert no_temporary_files(file_pairs)
+
+
+def test_failed_source_removal_rolls_the_copy_back(file_pairs, monkeypatch):
+    failing_src_path = file_pairs[0][0]
+    remove = os.remove
+
+    def failing_remove(path):
+        if path == failing_src_path:
+            raise PermissionError('read-only source')
+        remove(path)
+
+    monkeypatch.setattr(transfer.os, 'remove', failing_remove)
+    move_results, _ = transfer_files(file_pairs)
+
+    assert statuses(move_results, file_pairs) == [FAILED_STATUS, COPIED_STATUS, COPIED_STATUS]
+    # (The file is only kept at its source, so that it is not transferred twice)
+    assert os.path.isfile(failing_src_path) and not os.path.exists(file_pairs[0][1])
+
+
+def test_failed_sync_fails_the_whole_batch(file_pairs, monkeypatch):
+    def failing_sync_batch(file_paths, dir_paths):
+        raise OSError('sync failed')
+
+    monkeypatch.setattr(transfer, 'sync_batch', failing_sync_batch)
+    move_results, transfer_stats = transfer_files(file_pairs)
+
+    assert [result.status for result in move_results] == [FAILED_STATUS] * 3
+    assert transfer_stats.nb_files == 0
+    for src_path, dst_path in file_pairs:
+        assert os.path.isfile(src_path) and not os.path.exists(dst_path)
+    assert no_temporary_files(file_pairs)
+
+
+def test_failed_copy_is_reported_and_the_others_transferred(file_pairs):
+    os.remove(file_pairs[2][0])
+    move_results, _ = transfer_files(file_pairs)
+
+    assert statuses(move_results, file_pairs) == [COPIED_STATUS, COPIED_STATUS, FAILED_STATUS]
+    assert no_temporary_files(file_pairs)
+
+
+def test_move_file_renames_on_the_same_device(file_pairs):
+    src_path, dst_path = file_pairs[0]
+    result = move_file(src_path, dst_path)
+
+    assert result.status == RENAMED_STATUS and result.ok
+    assert not os.path.exists(src_path) and os.path.isfile(dst_path)
+
+
+def test_every_file_and_folder_of_a_batch_is_flushed(file_pairs, monkeypatch):
+    flushed_inodes = []
+    monkeypatch.setattr(transfer, 'full_fsync', lambda fd: flushed_inodes.append(os.fstat(fd).st_ino))
+    src_paths = [src_path for src_path, _ in file_pairs]
+    sync_batch(src_paths, {os.path.dirname(src_paths[0])})
+
+    assert flushed_inodes == [os.stat(path).st_ino for path in src_paths + [os.path.dirname(src_paths[0])]]
+
+
+def test_source_is_removed_once_the_rename_is_durable(file_pairs, monkeypatch):
+    src_path, dst_path = file_pairs[0]
+    events = []
+    monkeypatch.setattr(transfer, 'full_fsync', lambda fd: events.append(('fsync', os.fstat(fd).st_ino)))
+    remove = os.remove
+
+    def recording_remove(path):
+        events.append(('remove', path))
+        remove(path)
+
+    monkeypatch.setattr(transfer.os, 'remove', recording_remove)
+    copy_then_remove(src_path, dst_path)
+
+    assert events[-2:] == [('fsync', os.stat(os.path.dirname(dst_path)).st_ino), ('remove', src_path)]
+    assert os.path.isfile(dst_path) and not os.path.exists(src_path)
+
+
+def test_moves_are_streamed_and_fail_one_by_one(file_pairs, monkeypatch):
+    # (The warnings of the moves being colored)
+    pytest.importorskip('termcolor')
+    from dropsync_shift_rename import shift_rename
+
+    monkeypatch.setattr(shift_rename, 'WAL', None)
+    os.remove(file_pairs[1][0])
+    consumed_pairs = []
+
+    def pairs():
+        for file_pair in file_pairs:
+            consumed_pairs.append(file_pair)
+            yield file_pair
+
+    move_results = shift_rename.move_files(pairs())
+
+    # (Each file being moved as soon as its pair is consumed)
+    assert next(move_results).ok and consumed_pairs == file_pairs[:1]
+    assert [result.status for result in move_results] == [FAILED_STATUS, RENAMED_STATUS]
+    assert os.path.isfile(file_pairs[2][1])